@@ -1,33 +1,59 @@
 # Flask needs sessions to remember “this user is logged in”.
 # done by ageelan
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+import startup  # First, so import times are measured from here (see startup.py)
+from flask import (
+    Flask, Response, render_template, request, jsonify, redirect, url_for, session, flash,
+    stream_with_context, g, before_render_template, template_rendered, send_from_directory, abort
+)
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from dotenv import load_dotenv
-import requests
 import os
+import csv
+import io
+import json
 import logging
 import re
+import threading
+import time
+from concurrent.futures import Future, wait
+
+import assets
+import health
+import images
+import logconfig
+import metrics
+import profiler
+import projection
+import tasks
+import tmdbcache
+import tracing
 
 # Import database functions
 from database import (
-    init_db, get_user, create_user, check_user_exists,
+    init_db, ensure_schema, get_user, create_user,
     add_to_watchlist as db_add_to_watchlist,
     remove_from_watchlist as db_remove_from_watchlist,
-    get_user_watchlist, is_in_watchlist, check_password
+    get_user_watchlist_page, iter_user_watchlist,
+    is_in_watchlist, check_password, WATCHLIST_PAGE_SIZE,
+    calibrate_password_hashing, PasswordPoolSaturated,
+    DB_REPLICA_HOSTS, read_your_writes_until, set_read_your_writes_until
 )
 
+# requests costs ~100ms to import and is only needed once we call TMDB
+requests = startup.lazy_module("requests")
+
+startup.mark("imports done")
+
 # Load environment variables from .env file
 load_dotenv()
 
 # ============================================================
 # LOGGING CONFIGURATION - DevOps best practice for monitoring
 # ============================================================
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)-8s %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# JSON lines written by a background thread, with per-event sampling (see logconfig.py).
+# trace_id is the request's X-Request-ID (see tracing.py), "-" outside requests
+logconfig.configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
@@ -46,10 +72,12 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'  # CSRF protection
 app.config['SESSION_COOKIE_SECURE'] = bool(IS_PRODUCTION)  # HTTPS only in production ( man in the middle attack prevents the hacker intercepting cookie on public wifi )
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour session timeout  ( the cookie expire after 1hour ) 
 
-logger.info(f"Cookie security: HTTPS-only={bool(IS_PRODUCTION)} (Production={bool(IS_PRODUCTION)})")
+logger.info("Cookie security: HTTPS-only=%s (Production=%s)", bool(IS_PRODUCTION), bool(IS_PRODUCTION))
 
 # Rate Limiting - Prevents API abuse and spam attacks
 # High limits for classroom demo with 30+ students on same WiFi
+# RATELIMIT_ENABLED=false turns limits off (load tests drive everything from one IP)
+app.config["RATELIMIT_ENABLED"] = os.environ.get("RATELIMIT_ENABLED", "true").lower() != "false"
 limiter = Limiter(
     get_remote_address,
     app=app,
@@ -60,69 +88,463 @@ limiter = Limiter(
 # TMDB API Configuration
 # API key loaded from environment variable with fallback for team development
 TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "c98a3689e4042e45c726454885e21739")
-TMDB_BASE_URL = "https://api.themoviedb.org/3"
-TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/w500"
+# Overridable so load tests can point at a local stand-in (benchmarks/tmdb_stub.py)
+TMDB_BASE_URL = os.environ.get("TMDB_BASE_URL", "https://api.themoviedb.org/3").rstrip("/")
+# Images go through the /img proxy (see images.py); JSON responses keep a w500 base for API clients
+TMDB_IMAGE_BASE = f"{images.IMAGE_ROOT}/w500"
 
+WATCHLIST_MAX_PAGE_SIZE = 200  # Upper bound for ?limit= on /watchlist
+BATCH_MAX_IDS = 50  # Movie + TV ids per /api/batch request
+WATCHLIST_MEDIA_TYPES = ("movie", "tv")
 
 
 # ============================================================
 # DATABASE INITIALIZATION
 # ============================================================
-# Initialize database on app startup
-init_db()
-logger.info("Database initialized successfully")
+# Nothing runs at import: every gunicorn worker and test process used to repeat the
+# migrations check, admin seed and a bcrypt timing run. Instead:
+# - gunicorn runs initialize() once in the master before forking (gunicorn.conf.py)
+# - `flask --app app init-db` applies migrations as a separate deploy step
+# - otherwise the first query in a process does it (database.ensure_schema)
+def initialize():
+    """One-time startup work before serving: schema + admin seed, bcrypt calibration."""
+    ensure_schema()
+    # Measure bcrypt once so the cost factor fits our login latency budget
+    with startup.phase("bcrypt calibration"):
+        calibrate_password_hashing()
 
-@app.route("/health")
-def health_check():
-    """Simple health check for Kubernetes probes"""
-    return jsonify({"status": "healthy"}), 200
 
-def fetch_trending_movies():  # this fucntion ensures homepage always show fresh content without us havvng to update it manually or hardcoded into the code itself by hitting external api 
-    """Fetch trending movies of the week from TMDB API"""
-    url = f"{TMDB_BASE_URL}/trending/movie/week"
-    params = {"api_key": TMDB_API_KEY}
+@app.cli.command("init-db")
+def init_db_command():
+    """Apply pending migrations and seed the admin user, then exit."""
+    init_db()
+
+
+@app.before_request
+def report_startup():
+    startup.first_request()
+
+
+# ============================================================
+# READ-YOUR-WRITES FOR READ REPLICAS
+# ============================================================
+# After a user writes, database.py sends their reads to the primary for a few seconds.
+# The deadline is kept in the session so it holds on whichever pod serves the next request.
+if DB_REPLICA_HOSTS:
+    @app.before_request
+    def load_read_your_writes():
+        set_read_your_writes_until(session.get("db_primary_until", 0.0))
+
+    @app.after_request
+    def save_read_your_writes(response):
+        until = read_your_writes_until()
+        if until > session.get("db_primary_until", 0.0):
+            session["db_primary_until"] = until
+        return response
+
+
+# ============================================================
+# TRACING - trace ID per request, timing spans, one summary line (see tracing.py)
+# ============================================================
+@app.before_request
+def start_trace():
+    tracing.start_trace(request.headers.get("X-Request-ID"))
+
+
+@app.after_request
+def tag_trace(response):
+    trace = tracing.current()
+    if trace is not None:
+        trace.status = response.status_code
+        response.headers["X-Request-ID"] = trace.id
+    return response
+
+
+@app.teardown_request
+def finish_trace(error=None):
+    # Runs after streamed bodies finish too (stream_with_context keeps the request alive)
+    trace = tracing.current()
+    if trace is not None:
+        if trace.status is None:
+            trace.status = 500 if error else "-"
+        logger.info(trace.summary(request.method, request.path), extra={"event": "request"})
+        tracing.end_trace()
+
+
+@before_render_template.connect_via(app)
+def _render_started(sender, template, context, **extra):
+    trace = tracing.current()
+    if trace is not None:
+        trace.render_started = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def _render_finished(sender, template, context, **extra):
+    trace = tracing.current()
+    if trace is not None and trace.render_started is not None:
+        tracing.record("render", template.name, time.perf_counter() - trace.render_started)
+        trace.render_started = None
+
+
+# ============================================================
+# METRICS - Prometheus instrumentation (see metrics.py)
+# ============================================================
+@app.before_request
+def start_request_metrics():
+    request.environ["devopsflix.start"] = time.perf_counter()
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    metrics.saturation.request_started()
+
+
+@app.after_request
+def record_request_metrics(response):
+    start = request.environ.get("devopsflix.start")
+    if start is not None:
+        # Label by URL rule, not path, so /movie/<id> is one series
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.REQUEST_LATENCY.labels(route, request.method, response.status_code).observe(
+            time.perf_counter() - start
+        )
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if request.environ.pop("devopsflix.start", None) is not None:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        metrics.saturation.request_finished()
+
+
+# ============================================================
+# PROFILING - opt-in per-request sampling profiler (see profiler.py)
+# ============================================================
+@app.before_request
+def start_profiling():
+    # Only touch the session when asked: reading it adds "Vary: Cookie" to every response
+    user = session.get("user") if profiler.PROFILE_PARAM in request.args else None
+    reason = profiler.profile_reason(request.headers, request.args, user, app.secret_key)
+    if reason:
+        g.profiler = profiler.start(reason)
+
+
+@app.after_request
+def finish_profiling(response):
+    active = g.pop("profiler", None)
+    if active is not None:
+        path, breakdown = profiler.finish(active, f"{request.method} {request.path}")
+        response.headers["Server-Timing"] = profiler.server_timing(breakdown)
+        response.headers["X-Profile-File"] = os.path.basename(path)
+    return response
+
+
+@app.teardown_request
+def abandon_profiling(error=None):
+    # after_request is skipped when a request dies mid-way; still release the sampler
+    active = g.pop("profiler", None)
+    if active is not None:
+        profiler.finish(active, f"{request.method} {request.path} (failed)")
+
+
+# ============================================================
+# STATIC ASSETS - minified, content-hashed, precompressed (see assets.py)
+# ============================================================
+@app.template_global()
+def asset_url(name):
+    """URL for a static asset: its hashed build once `python assets.py build` has run."""
+    return url_for("static", filename=assets.resolve(name))
+
+
+@app.route("/static/dist/<path:filename>")
+@limiter.exempt
+def hashed_asset(filename):
+    """A hashed file never changes: browsers keep it for a year and never revalidate."""
+    if filename.endswith((".gz", ".br")):
+        abort(404)  # Variants are only served through Accept-Encoding
+    dist_dir = os.path.join(assets.STATIC_DIR, assets.DIST_NAME)
+    accepted = {encoding for encoding, quality in request.accept_encodings if quality > 0}
+    served, encoding = assets.pick_variant(dist_dir, filename, accepted)
+    response = send_from_directory(
+        dist_dir, served, mimetype=assets.content_type(filename), max_age=assets.IMMUTABLE_MAX_AGE
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Cache-Control"] = f"public, max-age={assets.IMMUTABLE_MAX_AGE}, immutable"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# ============================================================
+# IMAGES - sized, disk-cached TMDB images (see images.py)
+# ============================================================
+app.add_template_global(images.image_url)
+app.add_template_global(images.image_attrs)
+app.jinja_env.globals["image_root"] = images.IMAGE_ROOT
+app.jinja_env.globals["backdrop_width"] = images.BACKDROP_WIDTH
+
+
+@app.route("/img/w<int:width>/<name>")
+@limiter.exempt
+def image_proxy(width, name):
+    """A TMDB image at one of its published widths; the content behind a path never changes."""
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json().get("results", [])
-    except requests.RequestException:
-        return []
+        data, content_type = images.fetch(width, name)
+    except images.ImageNotFound:
+        abort(404)
+    except images.UpstreamError as e:
+        logger.warning("IMAGE UPSTREAM ERROR: %s", e)
+        abort(502)
+    response = Response(data, mimetype=content_type)
+    response.headers["Cache-Control"] = f"public, max-age={images.IMAGE_MAX_AGE}, immutable"
+    response.set_etag(f"w{width}-{name}")
+    return response.make_conditional(request)
 
 
-def fetch_top_rated_movies():  # it fetches top rated movies like classic movies . it uses the same endpoint but uses different endpoints to categorize the content for the usetr 
-    """Fetch top rated movies from TMDB API"""
-    url = f"{TMDB_BASE_URL}/movie/top_rated"
-    params = {"api_key": TMDB_API_KEY}
+# ============================================================
+# STREAMED RENDERING - send a page block by block as its data arrives
+# ============================================================
+# STREAM_HOMEPAGE=true sends the homepage in chunks; otherwise it is rendered in one piece
+# (same HTML, same concurrent lookups). Off by default: Flask's test client can't keep
+# contexts straight when a test follows a redirect to, or never reads, a streamed body
+STREAM_HOMEPAGE = os.environ.get("STREAM_HOMEPAGE", "false").lower() == "true"
+
+
+def resolve_block_data(pending):
+    """
+    Template variables for one block: {name: Future, callable or value} with results filled in.
+    A callable is called here, on the request thread, so it may wait on fan-out Futures itself.
+    A tuple of names unpacks a tuple result, e.g. ("watchlist", "watchlist_next_cursor").
+    """
+    values = {}
+    for names, value in pending.items():
+        if isinstance(value, Future):
+            value = value.result()
+        elif callable(value):
+            value = value()
+        if isinstance(names, tuple):
+            values.update(zip(names, value))
+        else:
+            values[names] = value
+    return values
+
+
+def stream_blocks(template_name, blocks):
+    """
+    Stream a template that is split into top-level blocks, one chunk per block, in order.
+    blocks: [(block name, {variable: Future or value})] - a block is sent as soon as its
+    own lookups have finished. They were all started before the first byte, so a slow one
+    holds back its block (and the ones below it) but not the page shell.
+    """
+    template = app.jinja_env.get_or_select_template(template_name)
+    context = {}
+    app.update_template_context(context)  # session, request, g, config and context processors
+
+    def generate():
+        for name, pending in blocks:
+            context.update(resolve_block_data(pending))
+            start = time.perf_counter()
+            chunk = "".join(template.blocks[name](template.new_context(context)))
+            tracing.record("render", f"{template_name}#{name}", time.perf_counter() - start)
+            yield chunk
+
+    response = Response(stream_with_context(generate()), mimetype="text/html")
+    response.headers["X-Accel-Buffering"] = "no"  # Proxies (nginx ingress) pass chunks on unbuffered
+    return response
+
+
+@app.route("/metrics")
+@limiter.exempt
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE_LATEST)
+
+
+def tmdb_get(fetcher, url, params):
+    """GET a TMDB endpoint for the named fetcher, recording latency, errors and a trace span. Raises RequestException."""
+    start = time.perf_counter()
+    response = error = None
     try:
         response = requests.get(url, params=params, timeout=10)
         response.raise_for_status()
-        return response.json().get("results", [])
-    except requests.RequestException:
-        return []
+        return response
+    except requests.RequestException as e:
+        error = type(e).__name__
+        metrics.UPSTREAM_ERRORS.labels(fetcher, error).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.UPSTREAM_LATENCY.labels(fetcher).observe(elapsed)
+        metrics.saturation.observe_upstream(elapsed)
+        tracing.record(
+            "upstream", tracing.endpoint_shape(url[len(TMDB_BASE_URL):]), elapsed,
+            fetcher=fetcher, params=",".join(sorted(k for k in params if k != "api_key")) or None,
+            status=getattr(response, "status_code", None), error=error, cache=tmdbcache.load_status(),
+            bytes=len(response.content) if response is not None else None
+        )
+
+
+@app.route("/health")
+def health_check():
+    """Simple health check (kept for Render and older manifests; see /livez and /readyz)"""
+    return jsonify({"status": "healthy"}), 200
+
+
+@app.route("/livez")
+@limiter.exempt
+def liveness_check():
+    """Liveness probe: the process is serving requests. Never checks dependencies."""
+    return jsonify({"status": "alive"}), 200
+
+
+@app.route("/readyz")
+@limiter.exempt
+def readiness_check():
+    """Readiness probe: database, background workers and password pool can take traffic (cached ~2s)"""
+    ready, checks = health.readiness()
+    return jsonify({"status": "ready" if ready else "not ready", "checks": checks}), 200 if ready else 503
+
+
+# ============================================================
+# CATALOG LISTS - paged TMDB lists, cached (see tmdbcache.py) and prefetched
+# ============================================================
+# (media type, list) -> (TMDB path, fetcher name for metrics and traces)
+CATALOG_LISTS = {
+    ("movie", "trending"): ("/trending/movie/week", "fetch_trending_movies"),
+    ("movie", "top_rated"): ("/movie/top_rated", "fetch_top_rated_movies"),
+    ("tv", "trending"): ("/trending/tv/week", "fetch_trending_tv"),
+    ("tv", "top_rated"): ("/tv/top_rated", "fetch_top_rated_tv"),
+}
+CATALOG_MAX_PAGE = 500  # TMDB refuses pages past 500
+CATALOG_PREFETCH_PAGES = int(os.environ.get("CATALOG_PREFETCH_PAGES", 2))  # Pages fetched ahead of the reader
+CATALOG_PREFETCH_WORKERS = int(os.environ.get("CATALOG_PREFETCH_WORKERS", 2))
+CATALOG_PREFETCH_QUEUE = int(os.environ.get("CATALOG_PREFETCH_QUEUE", 32))
+
+# Prefetches are only a head start, so they get a small queue of their own rather than the
+# background queue: a burst of scrolling can't hold back password upgrades and the like, and
+# can't fail the readiness check (it only watches tasks.background). When the queue is full
+# a prefetch is dropped and the page is fetched when it's asked for. No retries either.
+prefetch_queue = tasks.TaskQueue("prefetch", workers=CATALOG_PREFETCH_WORKERS,
+                                 maxsize=CATALOG_PREFETCH_QUEUE, max_retries=0)
+# Pages queued but not started yet; tmdbcache.is_cached only sees them once they're loading
+_prefetch_queued = set()
+_prefetch_lock = threading.Lock()
+
+
+def catalog_url(media_type, list_name):
+    return f"{TMDB_BASE_URL}{CATALOG_LISTS[(media_type, list_name)][0]}"
+
+
+def fetch_catalog_page(media_type, list_name, page=1, prefetch=False):
+    """
+    One page of a TMDB list, through the shared TMDB cache.
+    prefetch=True also queues the following pages on the prefetch queue, so they are
+    usually cached by the time the user scrolls to them.
+    Returns:
+        {"results": [...], "page": N, "total_pages": M}, or None if TMDB failed
+    """
+    url = catalog_url(media_type, list_name)
+    fetcher = CATALOG_LISTS[(media_type, list_name)][1]
+
+    def load():
+        try:
+            data = tmdb_get(fetcher, url, {"api_key": TMDB_API_KEY, "page": page}).json()
+        except requests.RequestException:
+            return None
+        return {
+            "results": projection.compact_results(data.get("results", []), media_type),
+            "page": page,
+            "total_pages": min(data.get("total_pages") or 1, CATALOG_MAX_PAGE),
+        }
+
+    result = tmdbcache.get_or_load("tmdb_list", f"{url}?page={page}", load)
+    if prefetch and result is not None:
+        last_page = min(page + CATALOG_PREFETCH_PAGES, result["total_pages"])
+        for next_page in range(page + 1, last_page + 1):
+            prefetch_catalog_page(media_type, list_name, next_page)
+    return result
+
+
+def prefetch_catalog_page(media_type, list_name, page):
+    """Queue one catalog page on the prefetch queue, unless it's cached, loading or already queued."""
+    key = f"{catalog_url(media_type, list_name)}?page={page}"
+    with _prefetch_lock:
+        if key in _prefetch_queued or tmdbcache.is_cached("tmdb_list", key):
+            return
+        _prefetch_queued.add(key)
+
+    def run():
+        try:
+            fetch_catalog_page(media_type, list_name, page)
+        finally:
+            with _prefetch_lock:
+                _prefetch_queued.discard(key)
+
+    if not prefetch_queue.submit(run, name="prefetch_catalog_page"):
+        with _prefetch_lock:
+            _prefetch_queued.discard(key)
+
+
+def fetch_trending_movies(prefetch=False):  # this fucntion ensures homepage always show fresh content without us havvng to update it manually or hardcoded into the code itself by hitting external api 
+    """Fetch trending movies of the week from TMDB API (page 1)"""
+    page = fetch_catalog_page("movie", "trending", prefetch=prefetch)
+    return page["results"] if page else []
+
+
+def fetch_top_rated_movies(prefetch=False):  # it fetches top rated movies like classic movies . it uses the same endpoint but uses different endpoints to categorize the content for the usetr 
+    """Fetch top rated movies from TMDB API (page 1)"""
+    page = fetch_catalog_page("movie", "top_rated", prefetch=prefetch)
+    return page["results"] if page else []
+
+
+HOMEPAGE_LISTS = (("movie", "trending"), ("movie", "top_rated"))  # The lists the homepage waits on
+
+
+def check_homepage_cache():
+    """
+    Readiness: the homepage's TMDB lists are cached (or loading), so the next homepage
+    doesn't wait on TMDB. Non-critical: a cold pod still serves, just slower, and taking it
+    out of the Service would stop it from ever warming up.
+    """
+    cold = [
+        f"{media_type}/{list_name}" for media_type, list_name in HOMEPAGE_LISTS
+        if not tmdbcache.is_cached("tmdb_list", f"{catalog_url(media_type, list_name)}?page=1")
+    ]
+    if cold:
+        raise health.CheckFailed("homepage lists not in the TMDB cache", {"cold": cold})
+    return {"cold": []}
+
+
+health.register_check("tmdb_cache", check_homepage_cache, critical=False)
 
 
 def search_multi(query):  # takes a user search and only return movies and tv series removing actors or other random data . 
-    """Search movies and TV series by query from TMDB API (multi-search)"""
+    """Search movies and TV series by query from TMDB API (multi-search), compact and cached"""
     url = f"{TMDB_BASE_URL}/search/multi"
     params = {"api_key": TMDB_API_KEY, "query": query}
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+
+    def load():
+        try:
+            response = tmdb_get("search_multi", url, params)
+        except requests.RequestException:
+            return None  # Not cached, so the next keystroke retries
         results = response.json().get("results", [])
         # Filter to only movies and TV series, exclude people
-        filtered = [r for r in results if r.get("media_type") in ("movie", "tv")]
-        return filtered
-    except requests.RequestException:
-        return []
+        return projection.compact_results(r for r in results if r.get("media_type") in ("movie", "tv"))
+
+    return tmdbcache.get_or_load("tmdb_search", f"{url}?query={query}", load) or []
 
 
+def detail_cache_key(media_type, media_id):
+    """TMDB cache key of a movie's or TV series' details"""
+    return f"{TMDB_BASE_URL}/{media_type}/{media_id}"
+
+
+@tmdbcache.cached("tmdb_details", lambda tv_id: detail_cache_key("tv", tv_id))
 def fetch_tv_details(tv_id): # gets the huge details for a tv show , cast season , episode anf the youtbe trailer that allows us tp embed the trailer into the detaoil page 
     """Fetch detailed TV series info including cast and crew"""
     url = f"{TMDB_BASE_URL}/tv/{tv_id}"
     params = {"api_key": TMDB_API_KEY, "append_to_response": "credits,videos"}
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        response = tmdb_get("fetch_tv_details", url, params)
         data = response.json()
         
         # Extract relevant info
@@ -172,14 +594,14 @@ def fetch_tv_details(tv_id): # gets the huge details for a tv show , cast season
         return None
 
 
+@tmdbcache.cached("tmdb_details", lambda movie_id: detail_cache_key("movie", movie_id))
 def fetch_movie_details(movie_id): # same as above but for movies
     """Fetch detailed movie info including cast and crew"""
     # Get movie details
     url = f"{TMDB_BASE_URL}/movie/{movie_id}"
     params = {"api_key": TMDB_API_KEY, "append_to_response": "credits,videos"}
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        response = tmdb_get("fetch_movie_details", url, params)
         data = response.json()
         
         # Extract relevant info
@@ -234,8 +656,7 @@ def fetch_watch_providers(media_type, media_id, title):
     url = f"{TMDB_BASE_URL}/{media_type}/{media_id}/watch/providers"
     params = {"api_key": TMDB_API_KEY}
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        response = tmdb_get("fetch_watch_providers", url, params)
         data = response.json().get("results", {})
         
         country_code = "SG" # Singapore
@@ -270,6 +691,61 @@ def fetch_watch_providers(media_type, media_id, title):
     except requests.RequestException:
         return None
 
+
+# ============================================================
+# WATCHLIST ENRICHMENT - rating, year and runtime on watchlist cards
+# ============================================================
+# The watchlist table only stores id, type, title and poster. The rest comes from the title
+# details in the TMDB cache (the same entries the detail page and modal use). Titles that
+# aren't cached are looked up side by side on a pool of their own, so a big cold watchlist
+# can't hold back other requests' fan-out lookups. A request waits at most
+# WATCHLIST_ENRICH_BUDGET_MS: titles that aren't back by then get a plain card, lookups
+# already running finish and warm the cache, and the ones still queued are cancelled.
+# WATCHLIST_ENRICH_BUDGET_MS=0 turns enrichment off.
+WATCHLIST_ENRICH_BUDGET_MS = float(os.environ.get("WATCHLIST_ENRICH_BUDGET_MS", 300))
+WATCHLIST_ENRICH_WORKERS = int(os.environ.get("WATCHLIST_ENRICH_WORKERS", 8))
+enrich_pool = tasks.FanOutPool("enrich", WATCHLIST_ENRICH_WORKERS)
+
+
+def enrich_watchlist(movies, limit=WATCHLIST_MAX_PAGE_SIZE, budget_ms=None):
+    """
+    Watchlist items with vote_average, year and runtime added where the details arrived in time.
+    Only the first `limit` items are enriched. Returns new dicts (the list may come from the
+    watchlist cache).
+    """
+    budget_ms = WATCHLIST_ENRICH_BUDGET_MS if budget_ms is None else budget_ms
+    movies = list(movies)
+    if not movies or budget_ms <= 0:
+        return movies
+
+    start = time.perf_counter()
+    fetchers = {"movie": fetch_movie_details, "tv": fetch_tv_details}
+    details, pending = {}, {}
+    for index, movie in enumerate(movies[:limit]):
+        media_type = movie.get("media_type", "movie")
+        cached = tmdbcache.peek("tmdb_details", detail_cache_key(media_type, movie["id"]))
+        if cached is not None:
+            details[index] = cached
+        else:
+            pending[index] = enrich_pool.submit(fetchers[media_type], movie["id"])
+
+    if pending:
+        wait(pending.values(), timeout=budget_ms / 1000)
+    for index, future in pending.items():
+        if not future.done():
+            future.cancel()  # Still queued: don't keep the pool busy after we've answered
+        elif future.exception() is None and future.result():
+            details[index] = future.result()
+
+    for index, found in details.items():
+        movies[index] = dict(movies[index], **projection.card_meta(found))
+    tracing.record(
+        "enrich", "watchlist", time.perf_counter() - start,
+        items=len(movies), enriched=len(details), fetched=len(pending)
+    )
+    return movies
+
+
 @app.route("/login", methods=["GET", "POST"])
 @limiter.limit("100 per minute")  # High limit for classroom demo
 def login():
@@ -280,7 +756,7 @@ def login():
 
         # Input validation: Check for empty fields first
         if not username or not password:
-            logger.warning(f"LOGIN FAILED: Empty credentials from {request.remote_addr}")
+            logger.warning("LOGIN FAILED: Empty credentials from %s", request.remote_addr, extra={"event": "login"})
             return render_template("login.html", error="Username and password are required")
 
         # Use secure password checking (supports both hashed and legacy plain text)
@@ -289,11 +765,17 @@ def login():
             db_user = get_user(username)
             session["user"] = username
             session["user_id"] = db_user["id"]  # Store user_id for watchlist
-            logger.info(f"LOGIN SUCCESS: User '{username}' (ID: {db_user['id']}) logged in from {request.remote_addr}")
+            logger.info(
+                "LOGIN SUCCESS: User '%s' (ID: %s) logged in from %s", username, db_user["id"], request.remote_addr,
+                extra={"event": "login"}
+            )
             return redirect(url_for("index"))
         
         # If login fails, reload login page with error message
-        logger.warning(f"LOGIN FAILED: Invalid credentials for user '{username}' from {request.remote_addr}")
+        logger.warning(
+            "LOGIN FAILED: Invalid credentials for user '%s' from %s", username, request.remote_addr,
+            extra={"event": "login"}
+        )
         return render_template("login.html", error="Invalid credentials")
     
     # Render login page on GET request
@@ -333,22 +815,18 @@ def signup():
         if len(password) < 4:
             return render_template("signup.html", error="Password must be at least 4 characters")
         
-        # Check if user exists in database
-        if check_user_exists(username):
-            return render_template("signup.html", error="Username already exists")
-        
-        # Create user in database
+        # Create user in database - a single INSERT that reports a taken username as None
         user_id = create_user(username, email, password)
         
         if user_id:
-            logger.info(f"SIGNUP SUCCESS: User '{username}' created with ID {user_id}")
+            logger.info("SIGNUP SUCCESS: User '%s' created with ID %s", username, user_id, extra={"event": "signup"})
             
             # Redirect to login page with success message
             flash("Account created successfully! Please log in.")
             return redirect(url_for("login"))
         else:
-            logger.error(f"SIGNUP FAILED: Error creating user '{username}'")
-            return render_template("signup.html", error="Error creating account. Please try again.")
+            logger.warning("SIGNUP FAILED: Username '%s' already exists", username, extra={"event": "signup"})
+            return render_template("signup.html", error="Username already exists")
     
     # Render signup page on GET request
     return render_template("signup.html")
@@ -357,24 +835,38 @@ def signup():
 @app.route("/") # it gets the trending and top rated dats and also picks the #1 movie for the hero banner image at the top of the homepage anfd sends it all to index.htm; 
 def index():
     """Main page with trending, top rated movies and watchlist"""
-    trending = fetch_trending_movies()
-    top_rated = fetch_top_rated_movies()
-    
-    # Select a featured movie for the hero banner (first trending movie)
-    hero_movie = trending[0] if trending else None
+    # Both TMDB lists and the watchlist query start now and run side by side
+    # (prefetch: pages 2-3 are fetched in the background for the carousels' infinite scroll)
+    trending = tasks.fan_out(fetch_trending_movies, prefetch=True)
+    top_rated = tasks.fan_out(fetch_top_rated_movies, prefetch=True)
     
-    # Get watchlist for logged-in user
+    # Get the first page of the watchlist for logged-in user ("Load more" fetches the rest)
     user_id = session.get("user_id")
-    user_watchlist = get_user_watchlist(user_id) if user_id else []
+    watchlist_page = tasks.fan_out(get_user_watchlist_page, user_id) if user_id else None
+
+    def watchlist_row():
+        # Runs when the row is reached, on the request thread
+        if watchlist_page is None:
+            return [], None
+        movies, next_cursor = watchlist_page.result()
+        return enrich_watchlist(movies), next_cursor
     
-    return render_template(
-        "index.html",
-        trending=trending,
-        top_rated=top_rated,
-        watchlist=user_watchlist,
-        hero_movie=hero_movie,
-        image_base=TMDB_IMAGE_BASE
-    )
+    # The shell (nav, modal) goes out at once; the hero and each carousel follow as their data
+    # arrives. The hero banner and Top 10 show the trending list, so they come with it
+    blocks = [
+        ("shell", {}),
+        ("trending_rows", {"trending": trending}),
+        ("top_rated_row", {"top_rated": top_rated}),
+        ("watchlist_row", {("watchlist", "watchlist_next_cursor"): watchlist_row}),
+        ("footer", {}),
+    ]
+    if STREAM_HOMEPAGE:
+        return stream_blocks("index.html", blocks)
+
+    context = {}
+    for _, pending in blocks:
+        context.update(resolve_block_data(pending))
+    return render_template("index.html", **context)
 
 
 @app.route("/search")  # simopl l0ads the dedicatedn search page
@@ -398,15 +890,35 @@ def search():
         return jsonify({"results": []})
     
     if len(query) > 100:
-        logger.warning(f"SEARCH REJECTED: Query too long ({len(query)} chars) from {request.remote_addr}")
+        logger.warning(
+            "SEARCH REJECTED: Query too long (%d chars) from %s", len(query), request.remote_addr,
+            extra={"event": "search"}
+        )
         return jsonify({"error": "Search query too long (max 100 characters)"}), 400
     
-    logger.info(f"SEARCH: User searched for '{query}' from {request.remote_addr}")
+    logger.info("SEARCH: User searched for '%s' from %s", query, request.remote_addr, extra={"event": "search"})
     
     results = search_multi(query)
     return jsonify({"results": results, "image_base": TMDB_IMAGE_BASE})
 
 
+@app.route("/api/<any(trending, top_rated):list_name>", defaults={"media_type": "movie"})
+@app.route("/api/tv/<any(trending, top_rated):list_name>", defaults={"media_type": "tv"})
+@limiter.limit("500 per minute")
+def catalog_page_api(list_name, media_type):
+    """One page of a catalog list as JSON (?page=N) for infinite scroll; the next pages are prefetched"""
+    page = request.args.get("page", "1")
+    if not page.isdigit() or not 1 <= int(page) <= CATALOG_MAX_PAGE:
+        return jsonify({"error": f"page must be a number from 1 to {CATALOG_MAX_PAGE}"}), 400
+
+    data = fetch_catalog_page(media_type, list_name, int(page), prefetch=True)
+    if data is None:
+        return jsonify({"error": "Could not load this page from TMDB, try again"}), 502
+
+    next_page = data["page"] + 1 if data["page"] < data["total_pages"] else None
+    return jsonify(dict(data, next_page=next_page, image_base=TMDB_IMAGE_BASE))
+
+
 @app.route("/movie/<int:movie_id>")
 def get_movie_details(movie_id):
     """Render full movie detail page with Streaming Providers"""
@@ -486,22 +998,80 @@ def watch_tv(tv_id, season, episode):
 
 @app.route("/api/movie/<int:movie_id>") # provide raw json detail so user can see deytauks quicly wihtut lewving the home page
 def get_movie_details_api(movie_id):
-    """API endpoint for movie details (JSON)"""
+    """API endpoint for movie details (JSON); ?fields=title,vote_average returns only those"""
+    try:
+        fields = projection.parse_fields(request.args.get("fields"), projection.DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     details = fetch_movie_details(movie_id)
     if details:
-        return jsonify({"success": True, "movie": details, "image_base": TMDB_IMAGE_BASE})
+        return jsonify({"success": True, "movie": projection.project(details, fields), "image_base": TMDB_IMAGE_BASE})
     return jsonify({"success": False, "message": "Movie not found"}), 404
 
 
 @app.route("/api/tv/<int:tv_id>")  # provide raw json data to show tv show detail
 def get_tv_details_api(tv_id):
-    """API endpoint for TV series details (JSON)"""
+    """API endpoint for TV series details (JSON); ?fields=title,vote_average returns only those"""
+    try:
+        fields = projection.parse_fields(request.args.get("fields"), projection.DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     details = fetch_tv_details(tv_id)
     if details:
-        return jsonify({"success": True, "movie": details, "image_base": TMDB_IMAGE_BASE})
+        return jsonify({"success": True, "movie": projection.project(details, fields), "image_base": TMDB_IMAGE_BASE})
     return jsonify({"success": False, "message": "TV series not found"}), 404
 
 
+def parse_id_list(raw):
+    """ "550,13, 550" -> [550, 13] (order kept, duplicates dropped). Raises ValueError."""
+    ids = []
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if part:
+            media_id = int(part)
+            if media_id not in ids:
+                ids.append(media_id)
+    return ids
+
+
+@app.route("/api/batch")  # many movie/tv details in one round trip: ?movie=1,2&tv=3&fields=title,vote_average
+@limiter.limit("200 per minute")
+def batch_details_api():
+    """Details for many movies and TV series at once, fetched concurrently through the TMDB cache"""
+    try:
+        fields = projection.parse_fields(request.args.get("fields"), projection.DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    try:
+        wanted = [("movie", i) for i in parse_id_list(request.args.get("movie"))]
+        wanted += [("tv", i) for i in parse_id_list(request.args.get("tv"))]
+    except ValueError:
+        return jsonify({"success": False, "message": "movie and tv must be comma-separated ids"}), 400
+    if len(wanted) > BATCH_MAX_IDS:
+        return jsonify({"success": False, "message": f"At most {BATCH_MAX_IDS} ids per request"}), 400
+
+    # Every id is looked up side by side; cached ones return without calling TMDB
+    fetchers = {"movie": fetch_movie_details, "tv": fetch_tv_details}
+    pending = [(media_type, media_id, tasks.fan_out(fetchers[media_type], media_id)) for media_type, media_id in wanted]
+    results, missing = [], []
+    for media_type, media_id, future in pending:
+        details = future.result()
+        if details:
+            results.append(dict(projection.project(details, fields), media_type=media_type))
+        else:
+            missing.append({"id": media_id, "media_type": media_type})
+    return jsonify({"success": True, "results": results, "missing": missing, "image_base": TMDB_IMAGE_BASE})
+
+
+def watchlist_first_page(user_id):
+    """
+    The first watchlist page after an add or remove, as the homepage renders it: the page
+    replaces the row on screen and next_cursor keeps "Load more" working from there.
+    """
+    movies, next_cursor = get_user_watchlist_page(user_id, WATCHLIST_PAGE_SIZE)
+    return {"watchlist": enrich_watchlist(movies), "next_cursor": next_cursor}
+
+
 @app.route("/watchlist/add", methods=["POST"])   # validation logic here to prevent duplicate entry . returns 400 error if aalready in the list 
 @limiter.limit("200 per minute")  # High limit for classroom demo
 def add_to_watchlist():
@@ -514,22 +1084,27 @@ def add_to_watchlist():
     movie_id = data.get("id")
     title = data.get("title")
     poster_path = data.get("poster_path")
+    media_type = data.get("media_type") or "movie"
     
     if not all([movie_id, title]):
         return jsonify({"success": False, "message": "Missing required fields"}), 400
+    if media_type not in WATCHLIST_MEDIA_TYPES:
+        return jsonify({"success": False, "message": "media_type must be 'movie' or 'tv'"}), 400
     
     # Get user_id from session (set during database login)
     user_id = session.get("user_id")
     
     if user_id:
         # Database mode: Add to user's personal watchlist
-        if is_in_watchlist(user_id, movie_id):
+        if is_in_watchlist(user_id, movie_id, media_type):
             return jsonify({"success": False, "message": "Movie already in watchlist"}), 400
         
-        if db_add_to_watchlist(user_id, movie_id, title, poster_path):
-            logger.info(f"WATCHLIST ADD: Movie '{title}' (ID: {movie_id}) added for user_id {user_id}")
-            user_watchlist = get_user_watchlist(user_id)
-            return jsonify({"success": True, "message": "Movie added to watchlist", "watchlist": user_watchlist})
+        if db_add_to_watchlist(user_id, movie_id, title, poster_path, media_type):
+            logger.info(
+                "WATCHLIST ADD: Movie '%s' (ID: %s) added for user_id %s", title, movie_id, user_id,
+                extra={"event": "watchlist"}
+            )
+            return jsonify({"success": True, "message": "Movie added to watchlist", **watchlist_first_page(user_id)})
         else:
             return jsonify({"success": False, "message": "Failed to add movie"}), 500
     else:
@@ -545,34 +1120,83 @@ def remove_from_watchlist():
         return jsonify({"success": False, "message": "No data provided"}), 400
     
     movie_id = data.get("id")
+    media_type = data.get("media_type") or "movie"
     
     if not movie_id:
         return jsonify({"success": False, "message": "Movie ID required"}), 400
+    if media_type not in WATCHLIST_MEDIA_TYPES:
+        return jsonify({"success": False, "message": "media_type must be 'movie' or 'tv'"}), 400
     
     user_id = session.get("user_id")
     
     if user_id:
         # Database mode: Remove from user's personal watchlist
-        if db_remove_from_watchlist(user_id, movie_id):
-            logger.info(f"WATCHLIST REMOVE: Movie {movie_id} removed for user_id {user_id}")
-            user_watchlist = get_user_watchlist(user_id)
-            return jsonify({"success": True, "message": "Movie removed from watchlist", "watchlist": user_watchlist})
+        if db_remove_from_watchlist(user_id, movie_id, media_type):
+            logger.info(
+                "WATCHLIST REMOVE: Movie %s removed for user_id %s", movie_id, user_id, extra={"event": "watchlist"}
+            )
+            return jsonify({"success": True, "message": "Movie removed from watchlist", **watchlist_first_page(user_id)})
         else:
             return jsonify({"success": False, "message": "Movie not found in watchlist"}), 404
     else:
         return jsonify({"success": False, "message": "Unauthorized - Please log in"}), 401
 
 
-@app.route("/watchlist")  # allows rhe full list as json data .
+@app.route("/watchlist")  # returns the watchlist as json data, one page at a time (?limit=&cursor=)
 def get_watchlist():
-    """Get current watchlist"""
+    """Get current watchlist (keyset-paginated, newest first)"""
     user_id = session.get("user_id")
-    if user_id:
-        # Database mode: Get user's personal watchlist
-        user_watchlist = get_user_watchlist(user_id)
-        return jsonify({"watchlist": user_watchlist})
+    if not user_id:
+        return jsonify({"watchlist": [], "next_cursor": None})
+
+    try:
+        limit = min(max(int(request.args.get("limit", WATCHLIST_PAGE_SIZE)), 1), WATCHLIST_MAX_PAGE_SIZE)
+        user_watchlist, next_cursor = get_user_watchlist_page(user_id, limit, request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid limit or cursor"}), 400
+
+    return jsonify({"watchlist": enrich_watchlist(user_watchlist), "next_cursor": next_cursor})
+
+
+@app.route("/watchlist/export")  # streams the full watchlist as a download, row by row, so huge lists never sit in memory
+def export_watchlist():
+    """Export the whole watchlist as JSON lines (default) or CSV"""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "message": "Unauthorized - Please log in"}), 401
+
+    export_format = request.args.get("format", "jsonl")
+    if export_format not in ("jsonl", "csv"):
+        return jsonify({"success": False, "message": "Format must be 'jsonl' or 'csv'"}), 400
+
+    def generate_jsonl():
+        for movie in iter_user_watchlist(user_id):
+            yield json.dumps(movie) + "\n"
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["id", "title", "poster_path", "added_at"])
+        for movie in iter_user_watchlist(user_id):
+            writer.writerow([movie["id"], movie["title"], movie["poster_path"], movie["added_at"]])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()  # Header only, for an empty watchlist
+
+    if export_format == "csv":
+        body, mimetype = generate_csv(), "text/csv"
     else:
-        return jsonify({"watchlist": []})
+        body, mimetype = generate_jsonl(), "application/x-ndjson"
+
+    logger.info(
+        "WATCHLIST EXPORT: user_id %s exporting as %s", user_id, export_format, extra={"event": "watchlist"}
+    )
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=watchlist.{export_format}"}
+    )
 
 
 # ============================================================
@@ -585,12 +1209,29 @@ def page_not_found(e):
     return render_template("404.html"), 404
 
 
+@app.errorhandler(PasswordPoolSaturated)
+def password_pool_saturated(e):
+    """Handle login/signup bursts - shed load with 503 instead of queueing behind bcrypt"""
+    logger.warning(
+        "PASSWORD POOL SATURATED: %s from %s, retry in %ss", request.endpoint, request.remote_addr, e.retry_after
+    )
+    template = "signup.html" if request.endpoint == "signup" else "login.html"
+    return (
+        render_template(template, error="Server is busy, please try again in a moment"),
+        503,
+        {"Retry-After": str(e.retry_after)}
+    )
+
+
 @app.errorhandler(500)
 def internal_server_error(e):
     """Handle 500 errors - internal server error"""
     return render_template("500.html"), 500
 
 
+startup.mark("app ready")
+
+
 if __name__ == "__main__":
     # Get the PORT from Render, or use 5000 if running locally
     port = int(os.environ.get("PORT", 5000))
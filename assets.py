@@ -0,0 +1,310 @@
+"""
+Static asset pipeline for DevOps Flix
+Build step (Dockerfile runs it; run it locally to test the production setup):
+
+    python assets.py build
+
+Every .css/.js file under static/ is minified (comments and whitespace only - no
+renaming), written to static/dist/ under a content-hashed name (style.3f2a9c1b0d.css)
+with a .gz variant (and .br when the brotli package is installed), and listed in
+static/dist/manifest.json.
+
+At runtime, templates link assets through asset_url("style.css"): the hashed URL when
+the manifest has it, the plain /static/ file otherwise (development without a build).
+A hashed file never changes, so it is served with a one-year immutable Cache-Control
+and repeat page loads only fetch the HTML.
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone is fine
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_NAME = "dist"  # Under STATIC_DIR; everything in it is content-hashed
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 10
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MIN_COMPRESS_BYTES = 512  # Smaller files aren't worth a compressed variant
+
+# Served variant for each Accept-Encoding token, best first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+# ============================================================
+# MINIFIERS
+# ============================================================
+# Strings (and JS template literals) are copied untouched; only the code between them
+# loses comments and whitespace.
+
+_CSS_TOKENS = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON = re.compile(r":\s+")  # Not before ":" - "a :hover" (descendant) differs from "a:hover"
+
+
+def minify_css(text):
+    """Drop comments, collapse whitespace, tighten punctuation, drop the last ; in a block."""
+    parts, code, last = [], "", 0
+    for token in _CSS_TOKENS.finditer(text):
+        code += text[last:token.start()]
+        last = token.end()
+        if token.group().startswith("/*"):
+            continue  # Comment: the code around it is minified as one piece
+        parts.append(_minify_css_code(code))
+        parts.append(token.group())
+        code = ""
+    parts.append(_minify_css_code(code + text[last:]))
+    return "".join(parts).strip() + "\n"
+
+
+def _minify_css_code(code):
+    code = _CSS_PUNCTUATION.sub(r"\1", _CSS_SPACE.sub(" ", code))
+    return _CSS_COLON.sub(":", code).replace(";}", "}")
+
+
+_JS_TIGHT = set("{}()[];,:=?<>!&|")  # Spaces next to these never matter
+_JS_WORD = re.compile(r"[\w$]+")  # Identifier, keyword or number
+# Keywords a value can't end with, so a / after them starts a regex: "return /x/.test(s)"
+_JS_REGEX_KEYWORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+}
+
+
+def minify_js(text):
+    """
+    Drop comments, indentation, blank lines and spaces next to punctuation.
+    Line breaks are kept, so automatic semicolon insertion behaves exactly as before.
+    """
+    out = []
+    i, n = 0, len(text)
+    stack = []  # Open template literals: brace depth of the ${...} we are in
+    last = ""  # Last character of code emitted, for spacing
+    prev = ""  # Last token (strings, templates and regexes count as "x"), for regex vs division
+
+    while i < n:
+        c = text[i]
+        if c == "`" or (c == "}" and stack and stack[-1] == 0):
+            end = _js_template_end(text, i, stack)
+            prev = "{" if text.endswith("${", 0, end) else "x"
+        elif c in "'\"":
+            end, prev = _js_string_end(text, i), "x"
+        elif text.startswith(("//", "/*"), i):
+            i = _js_comment_end(text, i)
+            continue
+        elif c == "/" and _js_regex_allowed(prev):
+            end, prev = _js_regex_end(text, i), "x"
+        elif c in " \t\r\n":
+            i, space = _js_space(text, i, last)
+            out.append(space)
+            last = "\n" if space == "\n" else last
+            continue
+        else:
+            end = _js_code_end(text, i, stack)
+            prev = text[i:end]
+        out.append(text[i:end])
+        last = text[end - 1]
+        i = end
+
+    # A comment between code and a line break can leave a trailing space
+    return re.sub(r" +\n", "\n", "".join(out)).strip() + "\n"
+
+
+def _js_regex_allowed(prev):
+    """
+    A / after a value (identifier, number, string, ")", "]", "++", "--") divides; anywhere
+    else - after an operator, "(", ",", "{", "}", ";", a keyword like return, or at the
+    start - it opens a regular expression.
+    """
+    if prev in (")", "]", "++", "--"):
+        return False
+    if _JS_WORD.fullmatch(prev):
+        return prev in _JS_REGEX_KEYWORDS
+    return True
+
+
+def _js_template_end(text, i, stack):
+    """End of template literal text starting at ` or at the } closing a ${...}: past the closing ` or the next ${."""
+    if text[i] == "}":
+        stack.pop()
+    i += 1
+    while i < len(text) and text[i] != "`" and not text.startswith("${", i):
+        i += 2 if text[i] == "\\" else 1
+    if i < len(text) and text[i] == "`":
+        return i + 1
+    stack.append(0)
+    return i + 2
+
+
+def _js_string_end(text, i):
+    """End of the quoted string starting at i (strings can't span lines)."""
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote and text[i] != "\n":
+        i += 2 if text[i] == "\\" else 1
+    return i + 1
+
+
+def _js_comment_end(text, i):
+    """End of the // or /* comment starting at i; a // comment leaves its line break."""
+    if text.startswith("//", i):
+        end = text.find("\n", i)
+    else:
+        end = text.find("*/", i + 2)
+        end = -1 if end == -1 else end + 2
+    return len(text) if end == -1 else end
+
+
+def _js_regex_end(text, i):
+    """End of the regular expression literal at i: past the closing / (not one inside [...]) and its flags."""
+    in_class = False
+    i += 1
+    while i < len(text) and (text[i] != "/" or in_class) and text[i] != "\n":
+        if text[i] == "\\":
+            i += 1
+        elif text[i] in "[]":
+            in_class = text[i] == "["
+        i += 1
+    i += 1
+    while i < len(text) and text[i].isalpha():
+        i += 1
+    return i
+
+
+def _js_space(text, i, last):
+    """
+    Skip the whitespace at i. Returns (end, what to emit): one line break for a run that
+    has one, a single space where two words would otherwise merge, else nothing.
+    """
+    start = i
+    while i < len(text) and text[i] in " \t\r\n":
+        i += 1
+    if "\n" in text[start:i]:
+        return i, "" if last in ("", "\n") else "\n"
+    if last in _JS_TIGHT | {"", "\n"} or (i < len(text) and text[i] in _JS_TIGHT):
+        return i, ""
+    return i, " "
+
+
+def _js_code_end(text, i, stack):
+    """End of the word, "++"/"--" or single punctuator at i; counts braces inside ${...}."""
+    word = _JS_WORD.match(text, i)
+    if word:
+        return word.end()
+    c = text[i]
+    if stack and c in "{}":
+        stack[-1] += 1 if c == "{" else -1
+    if c in "+-" and text.startswith(c * 2, i):
+        return i + 2
+    return i + 1
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+# ============================================================
+# BUILD
+# ============================================================
+
+def source_files(static_dir=None):
+    """Paths (relative to static/) of every asset to build, skipping the build output."""
+    static_dir = static_dir or STATIC_DIR
+    found = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if d != DIST_NAME)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in MINIFIERS:
+                found.append(os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, "/"))
+    return found
+
+
+def hashed_name(name, content):
+    """js/index.js + content -> js/index.<first HASH_LENGTH hex of sha256>.js"""
+    base, ext = os.path.splitext(name)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def build(static_dir=None):
+    """Minify, hash and precompress every asset; write the manifest. Returns the manifest."""
+    static_dir = static_dir or STATIC_DIR
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    manifest = {}
+    for name in source_files(static_dir):
+        with open(os.path.join(static_dir, name), encoding="utf-8") as f:
+            source = f.read()
+        content = MINIFIERS[os.path.splitext(name)[1]](source).encode("utf-8")
+        target = hashed_name(name, content)
+        path = os.path.join(dist_dir, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        if len(content) >= MIN_COMPRESS_BYTES:
+            # mtime=0: the same input always produces byte-identical .gz files
+            with open(path + ".gz", "wb") as f:
+                f.write(gzip.compress(content, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(path + ".br", "wb") as f:
+                    f.write(brotli.compress(content))
+        manifest[name] = f"{DIST_NAME}/{target}"
+        print(f"{name:<24} {len(source.encode()):>8} -> {len(content):>8} bytes  {manifest[name]}")
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    _read_manifest.cache_clear()
+    return manifest
+
+
+# ============================================================
+# RUNTIME
+# ============================================================
+
+def load_manifest(static_dir=None):
+    """{"style.css": "dist/style.<hash>.css", ...}, or {} when assets haven't been built."""
+    return _read_manifest(static_dir or STATIC_DIR)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_manifest(static_dir):
+    try:
+        with open(os.path.join(static_dir, DIST_NAME, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve(name, static_dir=None):
+    """Path under static/ to link for asset `name`: its hashed build if there is one."""
+    return load_manifest(static_dir).get(name, name)
+
+
+def pick_variant(dist_dir, filename, accepted):
+    """
+    (file to send, Content-Encoding or None) for a hashed asset: the smallest
+    precompressed variant whose encoding is in `accepted`, else the file itself.
+    """
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(os.path.join(dist_dir, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
+
+
+def content_type(filename):
+    """Mimetype of the uncompressed asset (Flask adds the charset for text types)."""
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        sys.exit("usage: python assets.py build")
+    build()
@@ -0,0 +1,407 @@
+"""
+Load test for DevOps Flix
+Drives a weighted traffic mix against a running app and reports RPS and p50/p95/p99
+latency per route as JSON. Compare against a stored baseline to catch regressions.
+
+Usage:
+    # Start the TMDB stub + gunicorn locally, run 30s at 16 concurrent users
+    python benchmarks/loadtest.py --spawn --duration 30 --concurrency 16 --output results.json
+
+    # Against an app you started yourself (point its TMDB_BASE_URL at benchmarks/tmdb_stub.py
+    # and set RATELIMIT_ENABLED=false, or the limiter answers 429 to a single load-test IP)
+    python benchmarks/loadtest.py --target http://127.0.0.1:5000
+
+    # Save a baseline, then fail (exit 1) if a later run regresses beyond --max-regression
+    python benchmarks/loadtest.py --spawn --save-baseline benchmarks/baseline.json
+    python benchmarks/loadtest.py --spawn --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tmdb_stub import start_stub  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scenario -> weight; roughly a browsing session: home, search-as-you-type, details, play
+DEFAULT_MIX = {
+    "home": 20,
+    "browse": 10,
+    "search": 25,
+    "movie": 15,
+    "tv": 5,
+    "watch": 10,
+    "watchlist": 15,
+    "watchlist_add": 5,
+    "watchlist_remove": 5,
+}
+SEARCH_TERMS = ["star", "batman", "love", "the office", "dune", "breaking", "spider", "anime", "war", "comedy"]
+MEDIA_IDS = list(range(1000, 1200))  # Ids the stub's trending/top rated pages hand out
+
+
+# ============================================================
+# SCENARIOS
+# ============================================================
+# Each returns (route label, method, path, request kwargs); the label groups
+# /movie/123 and /movie/456 together
+
+def scenario_home(rng):
+    return "/", "GET", "/", {}
+
+
+def scenario_browse(rng):
+    # Infinite scroll: mostly the first few pages, which the app prefetches
+    list_path = rng.choice(["/api/trending", "/api/top_rated", "/api/tv/trending", "/api/tv/top_rated"])
+    return "/api/<list>", "GET", list_path, {"params": {"page": rng.choice([2, 2, 3, 3, 4, 5])}}
+
+
+def scenario_search(rng):
+    return "/api/search", "GET", "/api/search", {"params": {"q": rng.choice(SEARCH_TERMS)}}
+
+
+def scenario_movie(rng):
+    return "/movie/<id>", "GET", f"/movie/{rng.choice(MEDIA_IDS)}", {}
+
+
+def scenario_tv(rng):
+    return "/tv/<id>", "GET", f"/tv/{rng.choice(MEDIA_IDS)}", {}
+
+
+def scenario_watch(rng):
+    if rng.random() < 0.7:
+        return "/watch/movie/<id>", "GET", f"/watch/movie/{rng.choice(MEDIA_IDS)}", {}
+    return "/watch/tv/<id>/<s>/<e>", "GET", f"/watch/tv/{rng.choice(MEDIA_IDS)}/1/{rng.randint(1, 10)}", {}
+
+
+def scenario_watchlist(rng):
+    return "/watchlist", "GET", "/watchlist", {}
+
+
+def scenario_watchlist_add(rng):
+    movie_id = rng.choice(MEDIA_IDS)
+    body = {"id": movie_id, "title": f"Stub Movie {movie_id}", "poster_path": f"/poster{movie_id}.jpg"}
+    return "/watchlist/add", "POST", "/watchlist/add", {"json": body}
+
+
+def scenario_watchlist_remove(rng):
+    return "/watchlist/remove", "POST", "/watchlist/remove", {"json": {"id": rng.choice(MEDIA_IDS)}}
+
+
+SCENARIOS = {name[len("scenario_"):]: func for name, func in globals().items() if name.startswith("scenario_")}
+
+# "Already in watchlist" (400) and "not in watchlist" (404) are normal answers in a random mix
+EXPECTED_STATUS = {"/watchlist/add": {400}, "/watchlist/remove": {404}}
+
+
+def is_error(route, status):
+    if status is None or status >= 500 or status == 429:
+        return True
+    return status >= 400 and status not in EXPECTED_STATUS.get(route, ())
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def login(session, base, username):
+    """Sign up and log in a load-test user so watchlist routes hit the database."""
+    password = "loadtest-password"
+    session.post(f"{base}/signup", data={
+        "username": username, "email": f"{username}@example.com",
+        "password": password, "confirm_password": password,
+    }, allow_redirects=False)
+    response = session.post(f"{base}/login", data={"username": username, "password": password}, allow_redirects=False)
+    if response.status_code != 302:
+        raise RuntimeError(f"login for {username} failed with HTTP {response.status_code}")
+
+
+def run_load(base, mix, duration, concurrency, warmup=0.0, rate=None, seed=None):
+    """
+    Closed-loop load: each of `concurrency` users sends its next request as soon as the
+    previous one returns (or on a fixed schedule when `rate` total RPS is given).
+    Returns:
+        {route: [(latency seconds, status or None)]} for requests after the warmup
+    """
+    run_id = uuid.uuid4().hex[:8]
+    names, weights = zip(*mix.items())
+    samples = {}
+    lock = threading.Lock()
+    state = {}
+
+    def set_schedule():
+        # Runs once every user has logged in: signup/login is setup, not load
+        state["start"] = time.perf_counter()
+        state["measure_from"] = state["start"] + warmup
+        state["end"] = state["measure_from"] + duration
+
+    start_barrier = threading.Barrier(concurrency + 1, action=set_schedule)
+
+    def user(index):
+        rng = random.Random(None if seed is None else seed + index)
+        session = requests.Session()
+        try:
+            login(session, base, f"lt{run_id}u{index}")
+        finally:
+            start_barrier.wait()
+        interval = concurrency / rate if rate else 0
+        next_at = state["start"] + rng.uniform(0, interval)
+        local = []
+        while time.perf_counter() < state["end"]:
+            next_at = wait_turn(next_at, interval)
+            route, sent, latency, status = timed_request(session, base, SCENARIOS[rng.choices(names, weights)[0]](rng))
+            if sent >= state["measure_from"]:
+                local.append((route, latency, status))
+        with lock:
+            add_samples(samples, local)
+
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def wait_turn(next_at, interval):
+    """Fixed-rate pacing: sleep until next_at and return the user's next slot. interval=0 is closed loop."""
+    if not interval:
+        return next_at
+    delay = next_at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+    return next_at + interval
+
+
+def timed_request(session, base, scenario):
+    """
+    Send one (route, method, path, kwargs) scenario request.
+    Returns:
+        (route, send time, latency seconds, status or None on a connection error)
+    """
+    route, method, path, kwargs = scenario
+    sent = time.perf_counter()
+    try:
+        status = session.request(method, f"{base}{path}", timeout=30, **kwargs).status_code
+    except requests.RequestException:
+        status = None
+    return route, sent, time.perf_counter() - sent, status
+
+
+def add_samples(samples, entries):
+    """Merge one user's (route, latency, status) entries into {route: [(latency, status)]}."""
+    for route, latency, status in entries:
+        samples.setdefault(route, []).append((latency, status))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, duration):
+    """Per-route and total RPS / latency percentiles (ms) / error counts."""
+    def stats(route, entries):
+        latencies = sorted(latency for latency, _ in entries)
+        statuses = {}
+        for _, status in entries:
+            key = str(status) if status is not None else "connection_error"
+            statuses[key] = statuses.get(key, 0) + 1
+        errors = sum(1 for _, status in entries if is_error(route, status))
+        return {
+            "requests": len(entries),
+            "errors": errors,
+            "error_rate": round(errors / len(entries), 4) if entries else 0.0,
+            "rps": round(len(entries) / duration, 2),
+            "mean_ms": round(1000 * sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50_ms": round(1000 * percentile(latencies, 50), 2),
+            "p95_ms": round(1000 * percentile(latencies, 95), 2),
+            "p99_ms": round(1000 * percentile(latencies, 99), 2),
+            "max_ms": round(1000 * latencies[-1], 2) if latencies else 0.0,
+            "statuses": statuses,
+        }
+
+    routes = {route: stats(route, entries) for route, entries in sorted(samples.items())}
+    everything = [(latency, status) for entries in samples.values() for latency, status in entries]
+    total = stats("*", everything)
+    total["errors"] = sum(r["errors"] for r in routes.values())
+    total["error_rate"] = round(total["errors"] / total["requests"], 4) if total["requests"] else 0.0
+    return {"routes": routes, "total": total}
+
+
+def compare(results, baseline, max_regression):
+    """
+    Regressions vs a baseline run: p95 up or total RPS down by more than max_regression
+    (a fraction), or error rate up by more than a percentage point. Per-route RPS just
+    follows the random mix, so only the total is compared.
+    """
+    problems = []
+    for route, current in {**results["routes"], "TOTAL": results["total"]}.items():
+        before = baseline["total"] if route == "TOTAL" else baseline["routes"].get(route)
+        if not before or not current["requests"]:
+            continue
+        if before["p95_ms"] and current["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+            problems.append(f"{route}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if route == "TOTAL" and before["rps"] and current["rps"] < before["rps"] * (1 - max_regression):
+            problems.append(f"{route}: rps {before['rps']} -> {current['rps']}")
+        if current["error_rate"] > before["error_rate"] + 0.01:
+            problems.append(f"{route}: error rate {before['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return problems
+
+
+def print_table(results, stream=sys.stderr):
+    header = f"{'route':<26}{'reqs':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}"
+    print(header, file=stream)
+    print("-" * len(header), file=stream)
+    for route, r in {**results["routes"], "TOTAL": results["total"]}.items():
+        print(f"{route:<26}{r['requests']:>8}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['errors']:>8}", file=stream)
+
+
+# ============================================================
+# LOCAL STACK (--spawn)
+# ============================================================
+
+def wait_ready(base, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base}/readyz", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"app at {base} not ready after {timeout}s")
+
+
+def spawn_app(port, tmdb_base_url, server, workdir):
+    """Start the app against the stub with a throwaway SQLite database."""
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        TMDB_BASE_URL=tmdb_base_url,
+        RATELIMIT_ENABLED="false",
+        DB_PATH=os.path.join(workdir, "loadtest.db"),
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(workdir, "metrics"),
+        BCRYPT_ROUNDS=os.environ.get("BCRYPT_ROUNDS", "10"),  # Signups are setup, keep them quick
+    )
+    if server == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "app:app", "--access-logfile", "/dev/null"]
+    else:
+        env.pop("PROMETHEUS_MULTIPROC_DIR")
+        command = [sys.executable, "app.py"]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="http://127.0.0.1:5000", help="app base URL (ignored with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="start the TMDB stub and the app locally")
+    parser.add_argument("--server", choices=["gunicorn", "flask"], default="gunicorn", help="app server for --spawn")
+    parser.add_argument("--port", type=int, default=5077, help="app port for --spawn")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent users")
+    parser.add_argument("--rate", type=float, default=None, help="target total RPS (default: as fast as possible)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="scenario weights, e.g. home=20,search=30 (scenarios: %s)" % ", ".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--stub-latency-ms", type=float, default=80)
+    parser.add_argument("--stub-jitter-ms", type=float, default=30)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results file; exit 1 on regression")
+    parser.add_argument("--save-baseline", help="also write the results here as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=0.15, help="allowed p95/RPS change vs baseline")
+    args = parser.parse_args()
+
+    stub, app_process, workdir = None, None, None
+    base = args.target.rstrip("/")
+    meta = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "mix": args.mix,
+    }
+    try:
+        if args.spawn:
+            stub, stub_url = start_stub(
+                latency_ms=args.stub_latency_ms, jitter_ms=args.stub_jitter_ms,
+                error_rate=args.stub_error_rate, seed=args.seed
+            )
+            workdir = tempfile.mkdtemp(prefix="devopsflix-loadtest-")
+            app_process = spawn_app(args.port, stub_url, args.server, workdir)
+            base = f"http://127.0.0.1:{args.port}"
+            meta.update(server=args.server, stub={
+                "latency_ms": args.stub_latency_ms, "jitter_ms": args.stub_jitter_ms,
+                "error_rate": args.stub_error_rate,
+            })
+        wait_ready(base)
+        meta["target"] = base
+
+        print(f"Load: {args.concurrency} users for {args.duration:g}s (+{args.warmup:g}s warmup) -> {base}",
+              file=sys.stderr)
+        samples = run_load(base, args.mix, args.duration, args.concurrency, args.warmup, args.rate, args.seed)
+        results = {"meta": meta, **summarize(samples, args.duration)}
+        if stub:
+            # Upstream calls per TMDB endpoint: how much the app's caching saved
+            results["upstream_calls"] = dict(stub.RequestHandlerClass.config.calls)
+    finally:
+        if app_process:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+        if stub:
+            stub.shutdown()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"No regressions vs {args.baseline} (tolerance {args.max_regression:.0%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
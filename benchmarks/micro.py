@@ -0,0 +1,317 @@
+"""
+Microbenchmarks for the CPU-bound code every request runs through
+- TMDB detail projection (fetch_movie_details / fetch_tv_details)
+- Smart-link loop (fetch_watch_providers), search_multi filtering and result compaction
+- execute_query placeholder rewrite and a SQLite round-trip
+- Watchlist row mapping at 10 / 1k / 10k rows (with and without the query)
+- index.html rendering
+- A sampled log call (the request thread's share of logging)
+
+TMDB responses are pre-decoded payloads from benchmarks/tmdb_stub.py (no network), and
+the database is a throwaway SQLite file, so numbers only move when the code does.
+
+Usage:
+    python benchmarks/micro.py --save before.json
+    python benchmarks/micro.py --compare before.json --save after.json
+    python benchmarks/micro.py --filter watchlist --repeat 25
+"""
+
+import argparse
+import atexit
+import gc
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+# Throwaway SQLite database and no multiprocess metrics; must be set before importing app
+_workdir = tempfile.mkdtemp(prefix="devopsflix-micro-")
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+os.environ["DB_PATH"] = os.path.join(_workdir, "micro.db")
+os.environ.pop("DB_HOST", None)
+os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("DB_CACHE_TTL", "0")  # Measure the work, not the cache
+os.environ.setdefault("TMDB_CACHE_TTL", "0")
+
+import app as app_module  # noqa: E402
+import database  # noqa: E402
+import projection  # noqa: E402
+import tmdb_stub  # noqa: E402
+from flask import render_template  # noqa: E402
+
+
+class FakeResponse:
+    """Just enough of requests.Response for tmdb_get() and the fetchers."""
+
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+def tmdb_returning(data):
+    """Patch the HTTP call so a fetcher only does its own work on `data`."""
+    return patch.object(app_module.requests, "get", lambda url, params=None, timeout=None: FakeResponse(data))
+
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+# Each function does its setup and returns (callable to time, cleanup or None)
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def _patched(patcher, func):
+    patcher.start()
+    return func, patcher.stop
+
+
+@benchmark("fetch_movie_details")
+def bench_movie_details():
+    data = tmdb_stub._synthetic_details("movie", 550)
+    return _patched(tmdb_returning(data), lambda: app_module.fetch_movie_details(550))
+
+
+@benchmark("fetch_tv_details")
+def bench_tv_details():
+    data = tmdb_stub._synthetic_details("tv", 1399)
+    return _patched(tmdb_returning(data), lambda: app_module.fetch_tv_details(1399))
+
+
+@benchmark("fetch_watch_providers")
+def bench_watch_providers():
+    data = tmdb_stub._synthetic_providers("movie", 550)
+    return _patched(tmdb_returning(data), lambda: app_module.fetch_watch_providers("movie", 550, "Fight Club"))
+
+
+@benchmark("search_multi")
+def bench_search_multi():
+    data = tmdb_stub._synthetic_search("star")
+    return _patched(tmdb_returning(data), lambda: app_module.search_multi("star"))
+
+
+@benchmark("placeholder_rewrite")
+def bench_placeholder_rewrite():
+    # What execute_query does to every parameterized query in PostgreSQL mode
+    query = "SELECT id, username, email, password FROM users WHERE username = ? AND email = ?"
+    return (lambda: query.replace("?", "%s")), None
+
+
+@benchmark("execute_query_sqlite")
+def bench_execute_query():
+    return (lambda: database.execute_query("SELECT id, username FROM users WHERE username = ?", ("admin",), fetch="one")), None
+
+
+def _seed_watchlist(rows):
+    """A user with `rows` watchlist entries, inserted in bulk. Returns the user id."""
+    username = f"micro{rows}"
+    database.create_user(username, f"{username}@example.com", "password")
+    user_id = database._load_user(username)["id"]
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.executemany(
+        "INSERT OR IGNORE INTO watchlist (user_id, movie_id, title, poster_path) VALUES (?, ?, ?, ?)",
+        [(user_id, movie_id, f"Movie {movie_id}", f"/poster{movie_id}.jpg") for movie_id in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+    return user_id
+
+
+for _rows in (10, 1000, 10000):
+    def _load(rows=_rows):
+        user_id = _seed_watchlist(rows)
+        return (lambda: database._load_user_watchlist(user_id)), None
+
+    def _map(rows=_rows):
+        # Rows already fetched: only the row -> dict mapping is timed
+        user_id = _seed_watchlist(rows)
+        fetched = database.run_statement("get_user_watchlist", (user_id,), fetch="all")
+        patcher = patch.object(database, "run_statement", lambda *args, **kwargs: fetched)
+        return _patched(patcher, lambda: database._load_user_watchlist(user_id))
+
+    benchmark(f"watchlist_load[{_rows}]")(_load)
+    benchmark(f"watchlist_map[{_rows}]")(_map)
+
+
+@benchmark("log_search_event")
+def bench_log_search_event():
+    # Request-thread cost of the SEARCH log line in /api/search (sampled, queued, formatted later)
+    log = app_module.logger
+    return (lambda: log.info(
+        "SEARCH: User searched for '%s' from %s", "dune", "127.0.0.1", extra={"event": "search"}
+    )), None
+
+
+@benchmark("render_index")
+def bench_render_index():
+    # Lists reach the template compacted, as fetch_catalog_page caches them
+    trending = projection.compact_results(tmdb_stub._synthetic_list("movie", 1, seed="trending")["results"])
+    top_rated = projection.compact_results(tmdb_stub._synthetic_list("movie", 1, seed="top_rated")["results"])
+    watchlist = [{"id": i, "title": f"Movie {i}", "poster_path": f"/poster{i}.jpg"} for i in range(50)]
+    context = app_module.app.test_request_context("/")
+    context.push()
+
+    def render():
+        return render_template(
+            "index.html", trending=trending, top_rated=top_rated, watchlist=watchlist,
+            watchlist_next_cursor="next", hero_movie=trending[0], image_base=app_module.TMDB_IMAGE_BASE
+        )
+    return render, context.pop
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def measure(func, repeat, min_time):
+    """
+    timeit-style: pick a loop count so one sample takes >= min_time, then take `repeat`
+    samples with the GC off. Returns seconds per call for each sample.
+    """
+    func()  # Warm caches (templates, prepared statements, imports)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                func()
+            samples.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples, loops
+
+
+def summarize(samples, loops):
+    """Statistics in microseconds per call."""
+    us = sorted(s * 1e6 for s in samples)
+    q1, _, q3 = statistics.quantiles(us, n=4) if len(us) > 1 else (us[0], us[0], us[0])
+    return {
+        "loops": loops,
+        "samples": len(us),
+        "min_us": round(us[0], 3),
+        "median_us": round(statistics.median(us), 3),
+        "mean_us": round(statistics.fmean(us), 3),
+        "stdev_us": round(statistics.stdev(us), 3) if len(us) > 1 else 0.0,
+        "q1_us": round(q1, 3),
+        "q3_us": round(q3, 3),
+    }
+
+
+def compare(current, baseline):
+    """
+    Lines of "name  before -> after  change" for benchmarks in both runs.
+    A change counts only when the interquartile ranges don't overlap; otherwise it is noise.
+    """
+    lines = []
+    for name, after in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = (after["median_us"] - before["median_us"]) / before["median_us"]
+        if after["q1_us"] > before["q3_us"]:
+            verdict = "slower"
+        elif after["q3_us"] < before["q1_us"]:
+            verdict = "faster"
+        else:
+            verdict = "same"
+        lines.append(f"{name:<28}{before['median_us']:>12.2f}{after['median_us']:>12.2f}{change:>+9.1%}  {verdict}")
+    return lines
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=15, help="samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per sample (sets the loop count)")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--compare", help="compare with a JSON file written by --save")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<28}{'median us':>12}{'min us':>12}{'stdev':>10}{'loops':>9}", file=sys.stderr)
+    for name, setup in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+        func, cleanup = setup()
+        try:
+            samples, loops = measure(func, args.repeat, args.min_time)
+        finally:
+            if cleanup:
+                cleanup()
+        results[name] = summarize(samples, loops)
+        r = results[name]
+        print(f"{name:<28}{r['median_us']:>12.2f}{r['min_us']:>12.2f}{r['stdev_us']:>10.2f}{loops:>9}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nvs {args.compare} ({baseline['meta'].get('git_revision')})", file=sys.stderr)
+        print(f"{'benchmark':<28}{'before us':>12}{'after us':>12}{'change':>9}", file=sys.stderr)
+        for line in compare(results, baseline["results"]):
+            print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Local TMDB stand-in for load tests
+Serves the endpoints app.py calls with configurable latency, jitter and error rates:
+    /trending/{movie,tv}/week, /{movie,tv}/top_rated, /search/multi,
+    /movie/<id>, /tv/<id>, /{movie,tv}/<id>/watch/providers
+
+Responses come from recorded fixtures in benchmarks/fixtures/<name>.json when present
+(capture them from the real API with the "record" command), otherwise from synthetic
+payloads with TMDB's shape and realistic sizes (20 results per list, ~40 cast, ~100 crew).
+
+Usage:
+    python benchmarks/tmdb_stub.py serve --port 8765 --latency-ms 80 --jitter-ms 30 --error-rate 0.01
+    python benchmarks/tmdb_stub.py record --api-key $TMDB_API_KEY
+    TMDB_BASE_URL=http://127.0.0.1:8765/3 gunicorn app:app
+
+GET /__stats returns upstream calls per endpoint (to measure caching), POST /__reset clears them.
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (endpoint name, path pattern) - the name is also the fixture file name
+ROUTES = [
+    ("trending", re.compile(r"^/trending/(movie|tv)/week$")),
+    ("top_rated", re.compile(r"^/(movie|tv)/top_rated$")),
+    ("search", re.compile(r"^/search/multi$")),
+    ("providers", re.compile(r"^/(movie|tv)/(\d+)/watch/providers$")),
+    ("details", re.compile(r"^/(movie|tv)/(\d+)$")),
+]
+
+# What "record" captures from the real API: fixture name -> (path, extra params)
+RECORD = {
+    "trending_movie": ("/trending/movie/week", {}),
+    "trending_tv": ("/trending/tv/week", {}),
+    "top_rated_movie": ("/movie/top_rated", {}),
+    "top_rated_tv": ("/tv/top_rated", {}),
+    "search": ("/search/multi", {"query": "star"}),
+    "details_movie": ("/movie/550", {"append_to_response": "credits,videos"}),
+    "details_tv": ("/tv/1399", {"append_to_response": "credits,videos"}),
+    "providers_movie": ("/movie/550/watch/providers", {}),
+    "providers_tv": ("/tv/1399/watch/providers", {}),
+}
+
+PROVIDERS = ["Netflix", "Amazon Prime Video", "Disney Plus", "HBO Max", "YouTube", "Apple TV Plus", "Crunchyroll"]
+GENRES = ["Action", "Adventure", "Animation", "Comedy", "Crime", "Drama", "Fantasy", "Horror", "Science Fiction"]
+
+
+# ============================================================
+# PAYLOADS
+# ============================================================
+
+def _load_fixture(name):
+    path = os.path.join(FIXTURES_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _list_item(rng, media_type, item_id):
+    title_key, date_key = ("title", "release_date") if media_type == "movie" else ("name", "first_air_date")
+    return {
+        "id": item_id,
+        title_key: f"Stub {media_type.title()} {item_id}",
+        "overview": " ".join(rng.choice(["a", "hero", "must", "save", "the", "city", "from", "ruin"]) for _ in range(40)),
+        "poster_path": f"/poster{item_id}.jpg",
+        "backdrop_path": f"/backdrop{item_id}.jpg",
+        date_key: f"20{rng.randint(0, 24):02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "vote_average": round(rng.uniform(5, 9), 1),
+        "vote_count": rng.randint(100, 30000),
+        "popularity": round(rng.uniform(10, 900), 3),
+        "genre_ids": rng.sample(range(10, 40), 3),
+        "original_language": "en",
+        "adult": False,
+        "media_type": media_type,
+    }
+
+
+def _synthetic_list(media_type, page, seed):
+    rng = random.Random(f"{seed}:{media_type}:{page}")
+    base = (page - 1) * 20
+    return {
+        "page": page,
+        "results": [_list_item(rng, media_type, 1000 + base + i) for i in range(20)],
+        "total_pages": 500,
+        "total_results": 10000,
+    }
+
+
+def _synthetic_search(query):
+    rng = random.Random(f"search:{query}")
+    results = []
+    for i in range(20):
+        # Roughly 1 in 5 hits is a person, which search_multi() filters out
+        kind = rng.choice(["movie", "movie", "tv", "tv", "person"])
+        if kind == "person":
+            results.append({"id": 9000 + i, "name": f"Person {i}", "media_type": "person", "known_for": []})
+        else:
+            results.append(_list_item(rng, kind, 2000 + i))
+    return {"page": 1, "results": results, "total_pages": 1, "total_results": len(results)}
+
+
+def _synthetic_details(media_type, item_id):
+    rng = random.Random(f"details:{media_type}:{item_id}")
+    data = _list_item(rng, media_type, item_id)
+    data.pop("media_type")
+    data.update({
+        "genres": [{"id": i, "name": name} for i, name in enumerate(rng.sample(GENRES, 3))],
+        "tagline": "Every stub has a story.",
+        "status": "Released",
+        "videos": {"results": [
+            {"key": f"clip{item_id}{n}", "site": "YouTube", "type": kind}
+            for n, kind in enumerate(["Teaser", "Featurette", "Trailer", "Clip"])
+        ]},
+        "credits": {
+            "cast": [
+                {"name": f"Actor {n}", "character": f"Role {n}", "profile_path": f"/actor{n}.jpg", "order": n}
+                for n in range(40)
+            ],
+            "crew": [
+                {"name": f"Crew {n}", "job": "Director" if n == 0 else rng.choice(["Screenplay", "Editor", "Producer"]),
+                 "department": rng.choice(["Writing", "Production", "Editing", "Directing"])}
+                for n in range(100)
+            ],
+        },
+    })
+    if media_type == "movie":
+        data.update({"runtime": rng.randint(80, 180), "budget": 50_000_000, "revenue": 250_000_000})
+    else:
+        data.update({
+            "episode_run_time": [rng.randint(20, 60)],
+            "number_of_seasons": rng.randint(1, 8),
+            "number_of_episodes": rng.randint(8, 120),
+            "created_by": [{"name": "Creator One"}, {"name": "Creator Two"}],
+        })
+    return data
+
+
+def _synthetic_providers(media_type, item_id):
+    rng = random.Random(f"providers:{media_type}:{item_id}")
+    region = {
+        "link": f"https://www.themoviedb.org/{media_type}/{item_id}/watch?locale=SG",
+        "flatrate": [
+            {"provider_id": i, "provider_name": name, "logo_path": f"/logo{i}.jpg", "display_priority": i}
+            for i, name in enumerate(rng.sample(PROVIDERS, 4))
+        ],
+    }
+    return {"id": item_id, "results": {"SG": region, "US": region}}
+
+
+@functools.lru_cache(maxsize=4096)
+def payload(name, media_type, item_id, page, query, seed):
+    """Encoded response body - cached so the stub never becomes the bottleneck."""
+    fixture = _load_fixture(f"{name}_{media_type}" if media_type and name != "search" else name)
+    if fixture is not None:
+        # Recorded data, re-keyed to the requested id/page so every id is a distinct object
+        if item_id is not None:
+            fixture["id"] = item_id
+        if page is not None:
+            fixture["page"] = page
+        return json.dumps(fixture).encode()
+
+    if name in ("trending", "top_rated"):
+        data = _synthetic_list(media_type, page or 1, seed=name)
+    elif name == "search":
+        data = _synthetic_search(query)
+    elif name == "details":
+        data = _synthetic_details(media_type, item_id)
+    else:
+        data = _synthetic_providers(media_type, item_id)
+    return json.dumps(data).encode()
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+class StubConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=500, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def delay(self):
+        """Seconds to hold this response: normal around latency_ms, never negative."""
+        with self.lock:
+            ms = self.rng.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+            fail = self.rng.random() < self.error_rate
+        return max(0.0, ms / 1000), fail
+
+    def count(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+
+class TMDBStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    config = StubConfig()
+
+    def log_message(self, format, *args):
+        pass  # Access logs would dominate a load test's output
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        path = parsed.path
+        if path.startswith("/3/"):
+            path = path[2:]
+        params = urllib.parse.parse_qs(parsed.query)
+
+        if path == "/__stats":
+            with self.config.lock:
+                return self._send(200, json.dumps(self.config.calls).encode())
+
+        for name, pattern in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return self._send(404, b'{"status_code": 34, "status_message": "The resource you requested could not be found."}')
+
+        self.config.count(name)
+        delay, fail = self.config.delay()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            status = self.config.error_status
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return self._send(status, b'{"status_code": 11, "status_message": "Internal error (stub)."}', headers)
+
+        groups = match.groups()
+        media_type = groups[0] if groups else None
+        item_id = int(groups[1]) if len(groups) > 1 else None
+        page = int(params.get("page", ["1"])[0]) if name in ("trending", "top_rated") else None
+        query = params.get("query", [""])[0] if name == "search" else None
+        self._send(200, payload(name, media_type, item_id, page, query, seed=0))
+
+    def do_POST(self):
+        if self.path == "/__reset":
+            with self.config.lock:
+                self.config.calls.clear()
+            return self._send(200, b"{}")
+        self._send(404, b"{}")
+
+
+def start_stub(host="127.0.0.1", port=0, **config):
+    """Run the stub on a background thread. Returns (server, base_url) - base_url ends in /3 like TMDB's."""
+    handler = type("ConfiguredTMDBStubHandler", (TMDBStubHandler,), {"config": StubConfig(**config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="tmdb-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/3"
+
+
+def record(api_key, base_url="https://api.themoviedb.org/3"):
+    """Capture real TMDB responses into benchmarks/fixtures/."""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, (path, params) in RECORD.items():
+        query = urllib.parse.urlencode({"api_key": api_key, **params})
+        with urllib.request.urlopen(f"{base_url}{path}?{query}", timeout=10) as response:
+            data = json.load(response)
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json"), "w") as f:
+            json.dump(data, f, indent=1)
+        print(f"recorded {name} <- {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the stub server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency-ms", type=float, default=50, help="mean response delay")
+    serve.add_argument("--jitter-ms", type=float, default=20, help="standard deviation of the delay")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    serve.add_argument("--error-status", type=int, default=500, help="status for failures (e.g. 429, 503)")
+    serve.add_argument("--seed", type=int, default=None)
+
+    rec = commands.add_parser("record", help="capture fixtures from the real TMDB API")
+    rec.add_argument("--api-key", default=os.environ.get("TMDB_API_KEY"), required=not os.environ.get("TMDB_API_KEY"))
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.api_key)
+        return
+
+    server, base_url = start_stub(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed
+    )
+    print(f"TMDB stub at {base_url} (latency {args.latency_ms}±{args.jitter_ms}ms, errors {args.error_rate:.1%})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
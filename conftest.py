@@ -0,0 +1,19 @@
+"""
+DevOps Flix - shared pytest fixtures
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tmdbcache
+
+
+@pytest.fixture(autouse=True)
+def empty_tmdb_cache():
+    """Every test mocks TMDB its own way, so none may see another test's cached responses"""
+    tmdbcache.clear()
+    yield
@@ -7,8 +7,22 @@ Supports dual-mode operation:
 
 # done by ageelan
 import os
+import base64
+import contextlib
+import contextvars
+import functools
+import itertools
 import logging
-import bcrypt
+import math
+import select
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import startup
+import tasks
+import tracing
+from metrics import CACHE_INVALIDATIONS, CACHE_REQUESTS, DB_POOL_CONNECTIONS, DB_QUERY_LATENCY
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +32,60 @@ DB_USER = os.environ.get("DB_USER", "devopsflix")
 DB_PASSWORD = os.environ.get("DB_PASSWORD", "devopsflix123")
 DB_NAME = os.environ.get("DB_NAME", "devopsflix")
 DB_PATH = os.environ.get("DB_PATH", "devopsflix.db")  # SQLite path
+# Optional PostgreSQL read replicas, e.g. "pg-replica-1,pg-replica-2"
+DB_REPLICA_HOSTS = [h.strip() for h in os.environ.get("DB_REPLICA_HOSTS", "").split(",") if h.strip()]
+DB_REPLICA_STICKY_SECONDS = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", 5))  # Read-your-writes window
+DB_REPLICA_RETRY_SECONDS = 30  # How long a failed replica is skipped before we try it again
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))  # PostgreSQL connections per host, per process
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 10))  # Seconds to wait for a free connection
+DB_CACHE_TTL = float(os.environ.get("DB_CACHE_TTL", 300))  # Seconds a cached user/watchlist stays valid
+DB_CACHE_MAX_ENTRIES = int(os.environ.get("DB_CACHE_MAX_ENTRIES", 10000))
+WATCHLIST_PAGE_SIZE = 50  # Default page size for keyset-paginated watchlist reads
+
+# Password hashing (bcrypt) runs in a small process pool, off the request thread
+BCRYPT_ROUNDS = os.environ.get("BCRYPT_ROUNDS", "12")  # Cost factor, or "auto" to fit BCRYPT_TARGET_MS
+BCRYPT_TARGET_MS = float(os.environ.get("BCRYPT_TARGET_MS", 250))  # Latency budget for one hash
+PASSWORD_POOL_WORKERS = int(os.environ.get("PASSWORD_POOL_WORKERS", 2))  # 0 = hash on the request thread
+PASSWORD_QUEUE_LIMIT = int(os.environ.get("PASSWORD_QUEUE_LIMIT", 16))  # Jobs in flight before we shed load
 
 # Determine database mode
 USE_POSTGRES = DB_HOST is not None
 
+# bcrypt and psycopg2 are imported on first use, not when the app is imported (see startup.py)
+bcrypt = startup.lazy_module("bcrypt")
+
 if USE_POSTGRES:
-    import psycopg2
-    from psycopg2.extras import RealDictCursor
-    logger.info(f"Database Mode: PostgreSQL (Host: {DB_HOST})")
+    psycopg2 = startup.lazy_module("psycopg2")
+    logger.info("Database Mode: PostgreSQL (Host: %s)", DB_HOST)
 else:
     import sqlite3
-    logger.info(f"Database Mode: SQLite (Path: {DB_PATH})")
+    logger.info("Database Mode: SQLite (Path: %s)", DB_PATH)
+
+
+@functools.lru_cache(maxsize=None)
+def _pg_classes():
+    """(RealDictCursor, PreparingConnection), built the first time we connect."""
+    from psycopg2.extras import RealDictCursor
+
+    class PreparingConnection(psycopg2.extensions.connection):
+        """Pooled connection that remembers which registry statements it has PREPAREd."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
 
+    return RealDictCursor, PreparingConnection
 
-def get_db_connection():
-    """Create and return a database connection based on environment."""
+
+def get_db_connection(host=None):
+    """Create and return a database connection based on environment (host defaults to the primary)."""
     if USE_POSTGRES:
         conn = psycopg2.connect(
-            host=DB_HOST,
+            host=host or DB_HOST,
             user=DB_USER,
             password=DB_PASSWORD,
             database=DB_NAME,
-            cursor_factory=RealDictCursor
+            cursor_factory=_pg_classes()[0]
         )
         return conn
     else:
@@ -48,58 +94,438 @@ def get_db_connection():
         return conn
 
 
-def execute_query(query, params=None, fetch=None):
+# ============================================================
+# READ REPLICA ROUTING (PostgreSQL only)
+# ============================================================
+# Reads (fetch='one'/'all') go round-robin to DB_REPLICA_HOSTS, except:
+# - for DB_REPLICA_STICKY_SECONDS after the current user wrote, so they read their own writes.
+#   The deadline lives in a context variable that app.py loads from / saves to the session,
+#   so it follows the user to whichever pod serves their next request
+# - inside primary_reads(), used when filling the cache (a lagging replica must not be cached)
+# - when a replica fails; it is skipped for DB_REPLICA_RETRY_SECONDS and we use the primary
+
+_primary_until = contextvars.ContextVar("db_primary_until", default=0.0)
+_force_primary = contextvars.ContextVar("db_force_primary", default=False)
+_replica_cycle = itertools.cycle(DB_REPLICA_HOSTS)
+_replica_down_until = {}  # host -> time.monotonic() when we may try it again
+
+
+def read_your_writes_until():
+    """Wall-clock time until which this context's reads must go to the primary."""
+    return _primary_until.get()
+
+
+def set_read_your_writes_until(until):
+    """Restore the read-your-writes deadline (e.g. from the user's session) for this context."""
+    _primary_until.set(until or 0.0)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Send every read inside this block to the primary."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def _pick_replica():
+    """Next healthy replica for a read, or None to use the primary."""
+    if not (USE_POSTGRES and DB_REPLICA_HOSTS) or _force_primary.get() or time.time() < _primary_until.get():
+        return None
+    now = time.monotonic()
+    for _ in range(len(DB_REPLICA_HOSTS)):
+        host = next(_replica_cycle)
+        if _replica_down_until.get(host, 0) <= now:
+            return host
+    return None
+
+
+def _mark_replica_down(host, error):
+    _replica_down_until[host] = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+    logger.warning("Read replica %s failed, using primary for %ss: %s", host, DB_REPLICA_RETRY_SECONDS, error)
+
+
+def _read_connection():
+    """Connection for a read-only query: a healthy replica if routing allows, else the primary."""
+    replica = _pick_replica()
+    if replica:
+        try:
+            return get_db_connection(replica)
+        except psycopg2.OperationalError as e:
+            _mark_replica_down(replica, e)
+    return get_db_connection()
+
+
+# ============================================================
+# CONNECTION POOL (PostgreSQL only)
+# ============================================================
+# One small pool per host (primary + each replica) per process. Connections are
+# opened lazily and reused, which is what lets prepared statements pay off.
+# SQLite connections are cheap and file-local, so SQLite opens one per query.
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within DB_POOL_TIMEOUT."""
+
+
+class ConnectionPool:
+    """Blocking, lazily-filled pool of PostgreSQL connections to one host."""
+
+    def __init__(self, host, size=DB_POOL_SIZE):
+        self.host = host
+        self.size = size
+        self.in_use = 0
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+        DB_POOL_CONNECTIONS.labels(host, "capacity").inc(size)
+
+    def checkout(self, timeout=DB_POOL_TIMEOUT):
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"No free connection to {self.host} within {timeout}s")
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            self.in_use += 1
+        DB_POOL_CONNECTIONS.labels(self.host, "in_use").inc()
+        try:
+            if conn is None or conn.closed:
+                cursor_factory, connection_factory = _pg_classes()
+                conn = psycopg2.connect(
+                    host=self.host,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                    database=DB_NAME,
+                    cursor_factory=cursor_factory,
+                    connection_factory=connection_factory
+                )
+            return conn
+        except Exception:
+            self._release()
+            raise
+
+    def checkin(self, conn, discard=False):
+        """Return a connection; discard=True closes it (after errors its state is unknown)."""
+        try:
+            if discard or conn.closed:
+                conn.close()
+            else:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()  # End the implicit transaction a read opened
+                with self._lock:
+                    self._idle.append(conn)
+        except Exception as e:
+            logger.warning("Dropping pooled connection to %s: %s", self.host, e)
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            self.in_use -= 1
+        DB_POOL_CONNECTIONS.labels(self.host, "in_use").dec()
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {"size": self.size, "in_use": self.in_use, "idle": len(self._idle)}
+
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(host=None):
+    """Pool for host (default: primary). Pools are per process - never reuse sockets across fork."""
+    global _pools, _pools_pid
+    host = host or DB_HOST
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools, _pools_pid = {}, os.getpid()  # Abandon (don't close) the parent's connections
+        if host not in _pools:
+            _pools[host] = ConnectionPool(host)
+        return _pools[host]
+
+
+def pool_stats():
+    """Checked-out / idle connections per host for this process."""
+    with _pools_lock:
+        pools = list(_pools.values()) if _pools_pid == os.getpid() else []
+    return {pool.host: pool.stats() for pool in pools}
+
+
+def check_database(timeout=1.0):
+    """
+    Readiness check: a primary connection can be checked out and answers SELECT 1.
+    Raises PoolTimeout / database errors on failure.
+    """
+    if not USE_POSTGRES:
+        conn = get_db_connection()
+        try:
+            conn.execute("SELECT 1")
+        finally:
+            conn.close()
+        return
+
+    pool = get_pool()
+    conn = pool.checkout(timeout=timeout)
+    ok = False
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        ok = True
+    finally:
+        pool.checkin(conn, discard=not ok)
+
+
+def execute_query(query, params=None, fetch=None, commit=False):
     """
     Execute a database query with automatic placeholder conversion.
+    Reads may be served by a read replica (see READ REPLICA ROUTING).
+    Hot, fixed queries should use run_statement() instead (see STATEMENT REGISTRY).
     Args:
         query: SQL query string (use ? for placeholders) (sql command)
         params: Tuple of parameters ( the actual data)
         fetch: 'one', 'all', or None (for INSERT/UPDATE/DELETE)
+        commit: fetch from a write and commit it (INSERT ... RETURNING); always on the primary
     Returns:
         Result of fetch operation or lastrowid/rowcount
     """
     # Convert SQLite placeholders (?) to PostgreSQL placeholders (%s)
     if USE_POSTGRES and params:
         query = query.replace("?", "%s")
-    
-    conn = get_db_connection()
+    return _route_query(query, params, fetch, commit)
+
+
+def _route_query(query, params, fetch, commit, statement=None):
+    """Run on a replica when routing allows, falling back to the primary."""
+    if not _schema_ready:
+        ensure_schema()
+    start = time.perf_counter()
+    result = None
+    try:
+        result = _route_query_timed(query, params, fetch, commit, statement)
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        DB_QUERY_LATENCY.labels(statement.name if statement else "adhoc").observe(elapsed)
+        sql = tracing.fingerprint(statement.sql if statement else query)
+        tracing.record(
+            "db", statement.name if statement else sql, elapsed,
+            sql=sql if statement else None, params=tracing.param_shape(params),
+            rows=_row_count(result, fetch), cache=_cache_fill.get()
+        )
+
+
+def _row_count(result, fetch):
+    if fetch == 'all':
+        return len(result) if result is not None else None
+    if fetch == 'one':
+        return int(result is not None)
+    return result  # rowcount / lastrowid for writes
+
+
+def _route_query_timed(query, params, fetch, commit, statement):
+    if fetch in ('one', 'all') and not commit:
+        replica = _pick_replica()
+        if replica:
+            try:
+                return _run_query(replica, query, params, fetch, commit, statement)
+            except psycopg2.OperationalError as e:
+                # Replica unreachable or dropped mid-query: retry once on the primary
+                _mark_replica_down(replica, e)
+
+    return _run_query(None, query, params, fetch, commit, statement)
+
+
+def _run_query(host, query, params, fetch, commit=False, statement=None):
+    if USE_POSTGRES:
+        pool = get_pool(host)
+        conn = pool.checkout()
+    else:
+        conn = get_db_connection()
     cursor = conn.cursor()
+    ok = False
     
     try:
+        if statement is not None and USE_POSTGRES:
+            query = _prepared(conn, cursor, statement)
+
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
         
-        result = None
-        if fetch == 'one':
-            result = cursor.fetchone()
-        elif fetch == 'all':
-            result = cursor.fetchall()
-        elif fetch is None:
-            # For INSERT/UPDATE/DELETE
-            conn.commit()
-            if USE_POSTGRES:
-                result = cursor.rowcount
-            else:
-                result = cursor.lastrowid or cursor.rowcount
-        
-        conn.close()
+        result = _query_result(conn, cursor, fetch, commit)
+        ok = True
         return result
     
     except Exception as e:
-        conn.close()
-        logger.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
         raise
+    finally:
+        _release(conn, pool if USE_POSTGRES else None, ok)
 
 
-def init_db():
-    """Initialize the database with required tables."""
-    logger.info("Initializing database...")
-    
-    # SQL compatible with both SQLite and PostgreSQL
-    if USE_POSTGRES:
-        users_table = '''
+def _prepared(conn, cursor, statement):
+    """Parse + plan once per connection, then just EXECUTE by name. Returns the EXECUTE query."""
+    if statement.name not in conn.prepared:
+        cursor.execute(statement.prepare_sql)
+        conn.prepared.add(statement.name)
+    return statement.execute_sql
+
+
+def _query_result(conn, cursor, fetch, commit):
+    """Fetch the rows asked for, commit writes, and return rows / rowcount / lastrowid."""
+    result = None
+    if fetch == 'one':
+        result = cursor.fetchone()
+    elif fetch == 'all':
+        result = cursor.fetchall()
+    if commit or fetch is None:
+        conn.commit()
+        _primary_until.set(time.time() + DB_REPLICA_STICKY_SECONDS)
+    if fetch is None:
+        # For INSERT/UPDATE/DELETE
+        if USE_POSTGRES:
+            result = cursor.rowcount
+        else:
+            result = cursor.lastrowid or cursor.rowcount
+    return result
+
+
+def _release(conn, pool, ok):
+    """Return a pooled connection (dropped if the query failed) or close the SQLite one."""
+    if pool is not None:
+        pool.checkin(conn, discard=not ok)
+        return
+    if not ok:
+        # close() is deferred while a traceback still holds the cursor, and the failed
+        # write would keep the database locked until then
+        conn.rollback()
+    conn.close()
+
+
+# ============================================================
+# STATEMENT REGISTRY
+# ============================================================
+# Hot queries are registered once by name. Each is translated to the active dialect
+# at import; in PostgreSQL mode it is PREPAREd once per pooled connection and then
+# run with EXECUTE, skipping parse/plan on every call. Calls and timings are kept
+# per statement (see statement_stats()).
+
+class Statement:
+    """A named query written with ? placeholders, plus its PostgreSQL PREPARE/EXECUTE forms."""
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        parts = sql.split("?")
+        self.param_count = len(parts) - 1
+        # PREPARE uses $1..$n; EXECUTE passes the values through psycopg2's %s quoting
+        self.prepare_sql = f"PREPARE {name} AS " + "".join(
+            part + (f"${i}" if i <= self.param_count else "") for i, part in enumerate(parts, start=1)
+        )
+        if self.param_count:
+            self.execute_sql = f"EXECUTE {name} (" + ", ".join(["%s"] * self.param_count) + ")"
+        else:
+            self.execute_sql = f"EXECUTE {name}"
+
+
+STATEMENTS = {}
+_statement_stats = {}  # name -> [calls, total seconds, max seconds]
+_statement_stats_lock = threading.Lock()
+
+
+def register_statement(name, sql):
+    """Add a named query to the registry (at import time)."""
+    STATEMENTS[name] = Statement(name, sql)
+    _statement_stats[name] = [0, 0.0, 0.0]
+
+
+def run_statement(name, params=None, fetch=None, commit=False):
+    """Run a registered statement. Same arguments and results as execute_query()."""
+    statement = STATEMENTS[name]
+    query = statement.execute_sql if USE_POSTGRES else statement.sql
+    start = time.perf_counter()
+    try:
+        return _route_query(query, params, fetch, commit, statement)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _statement_stats_lock:
+            stats = _statement_stats[name]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+
+def statement_stats():
+    """Per-statement call counts and timings (milliseconds) for this process."""
+    with _statement_stats_lock:
+        return {
+            name: {
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total * 1000 / calls, 3) if calls else 0.0,
+                "max_ms": round(longest * 1000, 3),
+            }
+            for name, (calls, total, longest) in _statement_stats.items()
+        }
+
+
+register_statement("get_user", "SELECT id, username, email, password FROM users WHERE username = ?")
+register_statement("user_exists", "SELECT id FROM users WHERE LOWER(username) = LOWER(?)")
+register_statement(
+    "create_user",
+    "INSERT INTO users (username, email, password) VALUES (?, ?, ?) "
+    "ON CONFLICT ((LOWER(username))) DO NOTHING RETURNING id"
+)
+register_statement("set_password", "UPDATE users SET password = ? WHERE username = ?")
+register_statement(
+    "upgrade_password",
+    "UPDATE users SET password = ? WHERE username = ? AND password = ?"
+)
+register_statement(
+    "get_user_watchlist",
+    "SELECT movie_id, media_type, title, poster_path FROM watchlist WHERE user_id = ? "
+    "ORDER BY added_at DESC, id DESC"
+)
+register_statement(
+    "watchlist_first_page",
+    "SELECT id, movie_id, media_type, title, poster_path, added_at FROM watchlist WHERE user_id = ? "
+    "ORDER BY added_at DESC, id DESC LIMIT ?"
+)
+register_statement(
+    "watchlist_next_page",
+    "SELECT id, movie_id, media_type, title, poster_path, added_at FROM watchlist WHERE user_id = ? "
+    "AND (added_at, id) < (?, ?) ORDER BY added_at DESC, id DESC LIMIT ?"
+)
+register_statement(
+    "add_to_watchlist",
+    "INSERT INTO watchlist (user_id, movie_id, media_type, title, poster_path) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id, movie_id, media_type) DO NOTHING RETURNING id"
+)
+register_statement(
+    "remove_from_watchlist", "DELETE FROM watchlist WHERE user_id = ? AND movie_id = ? AND media_type = ?"
+)
+register_statement(
+    "is_in_watchlist", "SELECT id FROM watchlist WHERE user_id = ? AND movie_id = ? AND media_type = ?"
+)
+
+
+# ============================================================
+# SCHEMA MIGRATIONS
+# ============================================================
+# Ordered, versioned schema changes for both dialects. Each one runs exactly once
+# and is recorded in schema_migrations. Append new migrations to the end of the
+# list - never edit one that has already shipped.
+
+MIGRATION_LOCK_ID = 720130  # pg_advisory_lock key shared by every pod
+
+MIGRATIONS = [
+    (1, "create users and watchlist tables", {
+        "postgres": [
+            '''
             CREATE TABLE IF NOT EXISTS users (
                 id SERIAL PRIMARY KEY,
                 username VARCHAR(255) UNIQUE NOT NULL,
@@ -107,9 +533,8 @@ def init_db():
                 password VARCHAR(255) NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        '''
-        
-        watchlist_table = '''
+            ''',
+            '''
             CREATE TABLE IF NOT EXISTS watchlist (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER NOT NULL,
@@ -120,9 +545,10 @@ def init_db():
                 FOREIGN KEY (user_id) REFERENCES users (id),
                 UNIQUE(user_id, movie_id)
             )
-        '''
-    else:
-        users_table = '''
+            ''',
+        ],
+        "sqlite": [
+            '''
             CREATE TABLE IF NOT EXISTS users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
@@ -130,9 +556,8 @@ def init_db():
                 password TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
-        '''
-        
-        watchlist_table = '''
+            ''',
+            '''
             CREATE TABLE IF NOT EXISTS watchlist (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 user_id INTEGER NOT NULL,
@@ -143,10 +568,196 @@ def init_db():
                 FOREIGN KEY (user_id) REFERENCES users (id),
                 UNIQUE(user_id, movie_id)
             )
-        '''
-    
-    execute_query(users_table)
-    execute_query(watchlist_table)
+            ''',
+        ],
+    }),
+    # Covers "WHERE user_id = ? ORDER BY added_at DESC": no sort, no table lookups
+    (2, "covering index for watchlist listing", {
+        "postgres": [
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_added "
+            "ON watchlist (user_id, added_at DESC) INCLUDE (movie_id, title, poster_path)",
+        ],
+        "sqlite": [
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_added "
+            "ON watchlist (user_id, added_at DESC, movie_id, title, poster_path)",
+        ],
+    }),
+    (3, "case-insensitive username index", {
+        "postgres": ["CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users (LOWER(username))"],
+        "sqlite": ["CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users (LOWER(username))"],
+    }),
+    # Keyset pagination orders by (added_at, id) so rows added in the same instant
+    # have a stable order; the index must match that order to avoid a sort
+    (4, "keyset index for watchlist pagination", {
+        "postgres": [
+            "DROP INDEX IF EXISTS idx_watchlist_user_added",
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_keyset "
+            "ON watchlist (user_id, added_at DESC, id DESC) INCLUDE (movie_id, title, poster_path)",
+        ],
+        "sqlite": [
+            "DROP INDEX IF EXISTS idx_watchlist_user_added",
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_keyset "
+            "ON watchlist (user_id, added_at DESC, id DESC, movie_id, title, poster_path)",
+        ],
+    }),
+    # Movie and TV ids overlap, so cards need the type to open the right page and fetch the
+    # right details. Existing rows were all added from movie cards. The keyset index is
+    # rebuilt so listing still never touches the table
+    (5, "watchlist media type", {
+        "postgres": [
+            "ALTER TABLE watchlist ADD COLUMN IF NOT EXISTS media_type VARCHAR(10) NOT NULL DEFAULT 'movie'",
+            "DROP INDEX IF EXISTS idx_watchlist_user_keyset",
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_keyset "
+            "ON watchlist (user_id, added_at DESC, id DESC) INCLUDE (movie_id, media_type, title, poster_path)",
+        ],
+        "sqlite": [
+            "ALTER TABLE watchlist ADD COLUMN media_type TEXT NOT NULL DEFAULT 'movie'",
+            "DROP INDEX IF EXISTS idx_watchlist_user_keyset",
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_keyset "
+            "ON watchlist (user_id, added_at DESC, id DESC, movie_id, media_type, title, poster_path)",
+        ],
+    }),
+    # A movie and a TV series can share an id, so the type is part of a row's identity.
+    # SQLite can't drop a table constraint, so the table is rebuilt (ids and order kept)
+    (6, "watchlist unique per media type", {
+        "postgres": [
+            "ALTER TABLE watchlist DROP CONSTRAINT IF EXISTS watchlist_user_id_movie_id_key",
+            "ALTER TABLE watchlist ADD CONSTRAINT watchlist_user_id_movie_id_media_type_key "
+            "UNIQUE (user_id, movie_id, media_type)",
+        ],
+        "sqlite": [
+            '''
+            CREATE TABLE watchlist_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                movie_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                poster_path TEXT,
+                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                media_type TEXT NOT NULL DEFAULT 'movie',
+                FOREIGN KEY (user_id) REFERENCES users (id),
+                UNIQUE(user_id, movie_id, media_type)
+            )
+            ''',
+            "INSERT INTO watchlist_new (id, user_id, movie_id, title, poster_path, added_at, media_type) "
+            "SELECT id, user_id, movie_id, title, poster_path, added_at, media_type FROM watchlist",
+            "DROP TABLE watchlist",
+            "ALTER TABLE watchlist_new RENAME TO watchlist",
+            "CREATE INDEX IF NOT EXISTS idx_watchlist_user_keyset "
+            "ON watchlist (user_id, added_at DESC, id DESC, movie_id, media_type, title, poster_path)",
+        ],
+    }),
+    # Usernames are unique ignoring case ("Admin" can't shadow "admin"). The database enforces
+    # it, so signup's insert can use the index as its conflict target instead of a racy
+    # NOT EXISTS check. Fails on a database that already holds names differing only in case
+    (7, "unique case-insensitive usernames", {
+        "postgres": [
+            "DROP INDEX IF EXISTS idx_users_username_lower",
+            "CREATE UNIQUE INDEX idx_users_username_lower ON users (LOWER(username))",
+        ],
+        "sqlite": [
+            "DROP INDEX IF EXISTS idx_users_username_lower",
+            "CREATE UNIQUE INDEX idx_users_username_lower ON users (LOWER(username))",
+        ],
+    }),
+]
+
+MIGRATIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def _schema_version(cursor):
+    """Highest applied migration version (0 for a fresh database)."""
+    cursor.execute("SELECT MAX(version) AS version FROM schema_migrations")
+    row = cursor.fetchone()
+    return (row["version"] if row else None) or 0
+
+
+def run_migrations():
+    """
+    Apply pending migrations. Safe to call from every pod at once:
+    - Up-to-date databases are detected with a single read, no lock taken
+    - Otherwise PostgreSQL serialises pods on an advisory lock and SQLite on BEGIN IMMEDIATE
+    Returns:
+        list of migration versions applied by this call
+    """
+    applied = []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # Fast path: another pod (or an earlier start) already did the work
+        try:
+            if _schema_version(cursor) >= MIGRATIONS[-1][0]:
+                return applied
+        except Exception:
+            conn.rollback()  # schema_migrations doesn't exist yet
+
+        _lock_migrations(conn, cursor)
+        cursor.execute(MIGRATIONS_TABLE)
+        current = _schema_version(cursor)  # Re-read: we may have waited on another pod
+        for version, name, statements in MIGRATIONS:
+            if version > current:
+                _apply_migration(conn, cursor, version, name, statements)
+                applied.append(version)
+        _unlock_migrations(conn, cursor)
+        return applied
+
+    except Exception as e:
+        if USE_POSTGRES:
+            conn.rollback()
+        elif conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        logger.error("Migration failed: %s", e)
+        raise
+    finally:
+        conn.close()  # Also releases the advisory lock if we failed while holding it
+
+
+def _lock_migrations(conn, cursor):
+    """Wait for any other pod migrating: PostgreSQL advisory lock, SQLite write lock."""
+    if USE_POSTGRES:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+    else:
+        conn.isolation_level = None  # Manage the transaction ourselves
+        cursor.execute("BEGIN IMMEDIATE")  # Takes the database write lock
+
+
+def _apply_migration(conn, cursor, version, name, statements):
+    """Run one migration's statements for this dialect and record it."""
+    mark = "%s" if USE_POSTGRES else "?"
+    logger.info("Applying migration %s: %s", version, name)
+    for statement in statements["postgres" if USE_POSTGRES else "sqlite"]:
+        cursor.execute(statement)
+    cursor.execute(
+        f"INSERT INTO schema_migrations (version, name) VALUES ({mark}, {mark})",
+        (version, name)
+    )
+    if USE_POSTGRES:
+        conn.commit()  # One transaction per migration
+
+
+def _unlock_migrations(conn, cursor):
+    """Commit and let the next pod in (SQLite applied everything in one transaction)."""
+    if USE_POSTGRES:
+        conn.commit()
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+    else:
+        cursor.execute("COMMIT")
+
+
+def init_db():
+    """Bring the schema up to date and seed the default admin user."""
+    logger.info("Initializing database...")
+
+    applied = run_migrations()
+    if applied:
+        logger.info("Applied migrations: %s", applied)
     
     # Seed default admin user if not exists
     admin_exists = execute_query(
@@ -165,15 +776,324 @@ def init_db():
     logger.info("Database initialized successfully")
 
 
+# Importing this module doesn't touch the database. The schema is brought up to date by an
+# explicit step (gunicorn's master before forking, `flask --app app init-db`) or, failing
+# that, by the first query a process makes.
+_schema_ready = False
+_schema_owner = None  # Thread running init_db(); its own queries must not wait on themselves
+_schema_lock = threading.Lock()
+
+
+def ensure_schema():
+    """Run init_db() once per process; processes forked after it ran inherit the result."""
+    global _schema_ready, _schema_owner
+    if _schema_ready or _schema_owner == threading.get_ident():
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        _schema_owner = threading.get_ident()
+        try:
+            with startup.phase("schema"):
+                init_db()
+            _schema_ready = True
+        finally:
+            _schema_owner = None
+
+
+# ============================================================
+# READ CACHE + CROSS-REPLICA INVALIDATION
+# ============================================================
+# Users and watchlists are cached in-process. With several replicas a write on
+# one pod must drop the entry on every other pod, so:
+# - PostgreSQL: writers publish on CACHE_CHANNEL (pg_notify) and every pod runs a
+#   listener thread (LISTEN) that drops the matching local entries.
+# - SQLite: no NOTIFY, so we poll PRAGMA data_version, which changes whenever any
+#   other connection commits, and drop the whole cache when it moves.
+# While the PostgreSQL listener is disconnected the cache is bypassed entirely.
+
+CACHE_CHANNEL = "devopsflix_cache"
+
+_MISS = object()
+_cache = {}  # (kind, key) -> (expires_at, value)
+_cache_lock = threading.Lock()
+_cache_generation = 0  # Bumped on every invalidation so in-flight loads can't re-cache stale rows
+_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_cache_fill = contextvars.ContextVar("db_cache_fill", default=None)  # Cache status for query spans
+
+_source_lock = threading.Lock()
+_source_pid = None  # Listener thread / version connection are per process (safe across fork)
+_listener_connected = threading.Event()
+_version_conn = None
+_version_seen = None
+
+
+def _drop_local(kind=None, key=None):
+    """Drop cached entries: one key, every key of a kind, or everything."""
+    global _cache_generation
+    CACHE_INVALIDATIONS.labels(kind or "all").inc()
+    with _cache_lock:
+        _cache_generation += 1
+        _cache_stats["invalidations"] += 1
+        if kind is None:
+            _cache.clear()
+        elif key is None:
+            for cache_key in [k for k in _cache if k[0] == kind]:
+                del _cache[cache_key]
+        else:
+            _cache.pop((kind, str(key)), None)
+
+
+def _listen_for_invalidations():
+    """Background thread: apply invalidations published by other replicas."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(host=DB_HOST, user=DB_USER, password=DB_PASSWORD, database=DB_NAME)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {CACHE_CHANNEL}")
+            # Anything cached while we weren't listening may have missed a notification
+            _drop_local()
+            _listener_connected.set()
+            logger.info("Cache invalidation listener connected (channel: %s)", CACHE_CHANNEL)
+
+            while True:
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    kind, _, key = conn.notifies.pop(0).payload.partition(":")
+                    _drop_local(kind, key or None)
+        except Exception as e:
+            _listener_connected.clear()
+            logger.warning("Cache invalidation listener lost connection: %s", e)
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(5)
+
+
+def _poll_data_version():
+    """SQLite: drop the cache if another connection has committed since the last check."""
+    global _version_seen
+    version = _version_conn.execute("PRAGMA data_version").fetchone()[0]
+    if _version_seen is not None and version != _version_seen:
+        _drop_local()
+    _version_seen = version
+
+
+def _cache_usable():
+    """Make sure this process is receiving invalidations; False means bypass the cache."""
+    global _source_pid, _version_conn, _version_seen
+    with _source_lock:
+        if _source_pid != os.getpid():
+            # First use in this process (or we were forked): never trust inherited entries
+            _source_pid = os.getpid()
+            _drop_local()
+            if USE_POSTGRES:
+                _listener_connected.clear()
+                threading.Thread(
+                    target=_listen_for_invalidations, name="cache-invalidation", daemon=True
+                ).start()
+            else:
+                _version_conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+                _version_seen = None
+
+        if USE_POSTGRES:
+            return _listener_connected.is_set()
+
+        _poll_data_version()
+        return True
+
+
+def cached_read(kind, key, loader):
+    """Return the cached value for (kind, key), calling loader() on a miss. None is never cached."""
+    if DB_CACHE_TTL <= 0 or not _cache_usable():
+        CACHE_REQUESTS.labels(kind, "bypass").inc()
+        token = _cache_fill.set("bypass")
+        try:
+            return loader()
+        finally:
+            _cache_fill.reset(token)
+
+    cache_key = (kind, str(key))
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(cache_key, _MISS)
+        if entry is not _MISS and entry[0] > now:
+            _cache_stats["hits"] += 1
+            CACHE_REQUESTS.labels(kind, "hit").inc()
+            tracing.record("cache", kind, 0.0, cache="hit")
+            return entry[1]
+        _cache_stats["misses"] += 1
+        generation = _cache_generation
+    CACHE_REQUESTS.labels(kind, "miss").inc()
+
+    token = _cache_fill.set("miss")
+    try:
+        with primary_reads():  # A lagging replica must never be cached
+            value = loader()
+    finally:
+        _cache_fill.reset(token)
+
+    if value is not None:
+        with _cache_lock:
+            if generation == _cache_generation:
+                if len(_cache) >= DB_CACHE_MAX_ENTRIES:
+                    _cache.pop(next(iter(_cache)))  # Evict the oldest insertion
+                _cache[cache_key] = (now + DB_CACHE_TTL, value)
+    return value
+
+
+def invalidate_cache(kind, key=None):
+    """Drop (kind, key) here and tell every other replica to drop it too."""
+    _drop_local(kind, key)
+    if USE_POSTGRES:
+        payload = kind if key is None else f"{kind}:{key}"
+        try:
+            execute_query("SELECT pg_notify(?, ?)", (CACHE_CHANNEL, payload))
+        except Exception as e:
+            # Other replicas fall back to the TTL for this entry
+            logger.warning("Cache invalidation publish failed for %s: %s", payload, e)
+
+
+def cache_stats():
+    """Return a snapshot of cache counters (hits, misses, invalidations, size)."""
+    with _cache_lock:
+        return dict(_cache_stats, size=len(_cache))
+
+
 # ============================================================
 # PASSWORD SECURITY FUNCTIONS
 # ============================================================
 
+class PasswordPoolSaturated(Exception):
+    """Too many hash/verify jobs in flight. Callers should answer 503 with Retry-After."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Password hashing pool saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+_password_pool = None
+_password_pool_pid = None
+_password_slots = None
+_password_pool_lock = threading.Lock()
+_password_jobs = 0  # Jobs holding a slot in this process
+_bcrypt_rounds = None
+_bcrypt_hash_seconds = BCRYPT_TARGET_MS / 1000  # Refined by calibrate_password_hashing()
+
+
+def _bcrypt_hash(password, rounds):
+    """Runs in a pool process."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _bcrypt_check(password, password_hash):
+    """Runs in a pool process."""
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def _time_bcrypt(rounds):
+    start = time.perf_counter()
+    _bcrypt_hash("calibration-password", rounds)
+    return time.perf_counter() - start
+
+
+def calibrate_password_hashing():
+    """
+    Measure bcrypt on this hardware at startup.
+    BCRYPT_ROUNDS=auto picks the highest cost (10-14) that stays within BCRYPT_TARGET_MS;
+    an explicit cost is kept but logged with a warning if it blows the target.
+    Returns:
+        (rounds, milliseconds per hash)
+    """
+    global _bcrypt_rounds, _bcrypt_hash_seconds
+    target = BCRYPT_TARGET_MS / 1000
+
+    if BCRYPT_ROUNDS == "auto":
+        rounds, seconds = 10, _time_bcrypt(10)
+        # Each extra round doubles the cost
+        while rounds < 14 and seconds * 2 <= target:
+            rounds, seconds = rounds + 1, seconds * 2
+        seconds = _time_bcrypt(rounds)
+    else:
+        rounds = int(BCRYPT_ROUNDS)
+        seconds = _time_bcrypt(rounds)
+        if seconds > target:
+            logger.warning(
+                "bcrypt cost %s takes %.0fms, over the %.0fms target", rounds, seconds * 1000, BCRYPT_TARGET_MS
+            )
+
+    _bcrypt_rounds, _bcrypt_hash_seconds = rounds, seconds
+    logger.info("Password hashing: bcrypt cost %s (%.0fms per hash)", rounds, seconds * 1000)
+    return rounds, seconds * 1000
+
+
+def _get_password_pool():
+    """Per-process pool + in-flight slots, recreated after fork or if a worker died."""
+    global _password_pool, _password_pool_pid, _password_slots
+    with _password_pool_lock:
+        if _password_pool is None or _password_pool_pid != os.getpid():
+            _password_pool = ProcessPoolExecutor(max_workers=PASSWORD_POOL_WORKERS)
+            _password_pool_pid = os.getpid()
+            _password_slots = threading.BoundedSemaphore(PASSWORD_QUEUE_LIMIT)
+        return _password_pool, _password_slots
+
+
+def _reset_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
+
+def _run_password_job(job, *args):
+    """Run a bcrypt job in the pool, or raise PasswordPoolSaturated if the queue is full."""
+    if PASSWORD_POOL_WORKERS <= 0:
+        return job(*args)
+
+    global _password_jobs
+    pool, slots = _get_password_pool()
+    if not slots.acquire(blocking=False):
+        # Roughly how long until the queue ahead of this request drains
+        retry_after = max(1, math.ceil(PASSWORD_QUEUE_LIMIT * _bcrypt_hash_seconds / PASSWORD_POOL_WORKERS))
+        raise PasswordPoolSaturated(retry_after)
+    with _password_pool_lock:
+        _password_jobs += 1
+    try:
+        return pool.submit(job, *args).result()
+    except BrokenProcessPool:
+        logger.error("Password pool worker died, recreating pool")
+        _reset_password_pool()
+        return job(*args)
+    finally:
+        with _password_pool_lock:
+            _password_jobs -= 1
+        slots.release()
+
+
+def password_pool_stats():
+    """Hash/verify jobs in flight in this process vs the PASSWORD_QUEUE_LIMIT that triggers 503s."""
+    with _password_pool_lock:
+        in_flight = _password_jobs
+    return {
+        "workers": PASSWORD_POOL_WORKERS,
+        "in_flight": in_flight,
+        "limit": PASSWORD_QUEUE_LIMIT,
+        "rounds": _bcrypt_rounds,
+        "hash_ms": round(_bcrypt_hash_seconds * 1000, 1),
+    }
+
+
 def hash_password(password):
-    """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
-    password_hash = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return password_hash.decode('utf-8')
+    """Hash a password using bcrypt (in the password pool)."""
+    if _bcrypt_rounds is None:
+        calibrate_password_hashing()
+    return _run_password_job(_bcrypt_hash, password, _bcrypt_rounds)
 
 
 def check_password(username, password):
@@ -194,31 +1114,42 @@ def check_password(username, password):
     # Check if it's a bcrypt hash (new users)
     if stored_password.startswith(('$2b$', '$2a$', '$2y$')):
         try:
-            # Verify hashed password
-            return bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8'))
+            # Verify hashed password (in the password pool)
+            return _run_password_job(_bcrypt_check, password, stored_password)
         except (ValueError, AttributeError) as e:
             # Malformed hash, fail safely
-            logger.error(f"Invalid hash format for user {username}: {e}")
+            logger.error("Invalid hash format for user %s: %s", username, e)
             return False
     
     # Legacy plain text password (old users)
     if stored_password == password:
-        # Auto-upgrade to hashed password
-        logger.info(f"Auto-upgrading password for user: {username}")
-        new_hash = hash_password(password)
-        upgrade_user_password(username, new_hash)
+        # Auto-upgrade to hashed password in the background - the login doesn't wait for it
+        logger.info("Auto-upgrading password for user: %s", username)
+        tasks.submit(_upgrade_legacy_password, username, password, name="password-upgrade")
         return True
     
     return False
 
 
-def upgrade_user_password(username, password_hash):
-    """Upgrade a user's password to a hashed version."""
-    execute_query(
-        "UPDATE users SET password = ? WHERE username = ?",
-        (password_hash, username)
-    )
-    logger.info(f"Password upgraded for user: {username}")
+def upgrade_user_password(username, password_hash, expected_password=None):
+    """
+    Upgrade a user's password to a hashed version.
+    If expected_password is given, only update while that is still the stored value
+    (so a queued upgrade can't overwrite a password changed in the meantime).
+    """
+    if expected_password is None:
+        run_statement("set_password", (password_hash, username))
+    else:
+        updated = run_statement("upgrade_password", (password_hash, username, expected_password))
+        if not updated:
+            return
+    invalidate_cache("user", username)
+    logger.info("Password upgraded for user: %s", username)
+
+
+def _upgrade_legacy_password(username, password):
+    """Background task: replace a plain text password with its bcrypt hash."""
+    upgrade_user_password(username, hash_password(password), expected_password=password)
 
 
 # ============================================================
@@ -227,11 +1158,11 @@ def upgrade_user_password(username, password_hash):
 
 def get_user(username):
     """Get user by username. Returns dict or None."""
-    row = execute_query(
-        "SELECT * FROM users WHERE username = ?",
-        (username,),
-        fetch='one'
-    )
+    return cached_read("user", username, lambda: _load_user(username))
+
+
+def _load_user(username):
+    row = run_statement("get_user", (username,), fetch='one')
     
     if row:
         return {
@@ -244,46 +1175,31 @@ def get_user(username):
 
 
 def create_user(username, email, password):
-    """Create a new user. Returns user_id or None if failed."""
-    try:
-        # Hash password before storing
-        password_hash = hash_password(password)
-        
-        if USE_POSTGRES:
-            # PostgreSQL: Use RETURNING to get the new ID
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO users (username, email, password) VALUES (%s, %s, %s) RETURNING id",
-                (username, email, password_hash)
-            )
-            user_id = cursor.fetchone()['id']
-            conn.commit()
-            conn.close()
-        else:
-            # SQLite: Use lastrowid
-            user_id = execute_query(
-                "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
-                (username, email, password_hash)
-            )
-        
-        logger.info(f"USER CREATED: {username} (ID: {user_id}, password hashed)")
-        return user_id
-    
-    except Exception as e:
-        if "unique" in str(e).lower() or "duplicate" in str(e).lower():
-            logger.warning(f"USER CREATE FAILED: Username '{username}' already exists")
-            return None
-        raise
+    """
+    Create a new user in a single statement (one round-trip, no check-then-insert race).
+    Usernames that already exist - exactly, or differing only in case - hit the unique
+    LOWER(username) index and insert nothing, so the conflict shows up as "no row returned"
+    rather than as an exception.
+    Returns:
+        user_id, or None if the username is taken
+    """
+    # Hash password before storing
+    password_hash = hash_password(password)
+
+    row = run_statement("create_user", (username, email, password_hash), fetch='one', commit=True)
+
+    if row is None:
+        logger.warning("USER CREATE FAILED: Username '%s' already exists", username, extra={"event": "signup"})
+        return None
+
+    user_id = row["id"]
+    logger.info("USER CREATED: %s (ID: %s, password hashed)", username, user_id, extra={"event": "signup"})
+    return user_id
 
 
 def check_user_exists(username):
-    """Check if username already exists."""
-    result = execute_query(
-        "SELECT id FROM users WHERE username = ?",
-        (username,),
-        fetch='one'
-    )
+    """Check if username already exists (case-insensitive, so "Admin" can't shadow "admin")."""
+    result = run_statement("user_exists", (username,), fetch='one')
     return result is not None
 
 
@@ -291,46 +1207,43 @@ def check_user_exists(username):
 # WATCHLIST OPERATIONS
 # ============================================================
 
-def add_to_watchlist(user_id, movie_id, title, poster_path):
-    """Add movie to user's watchlist. Returns True if successful."""
-    try:
-        execute_query(
-            "INSERT INTO watchlist (user_id, movie_id, title, poster_path) VALUES (?, ?, ?, ?)",
-            (user_id, movie_id, title, poster_path)
-        )
-        logger.info(f"WATCHLIST ADD: Movie '{title}' added for user_id {user_id}")
-        return True
-    except Exception as e:
-        if "unique" in str(e).lower() or "duplicate" in str(e).lower():
-            logger.warning(f"WATCHLIST ADD FAILED: Movie already in watchlist")
-            return False
-        raise
+def add_to_watchlist(user_id, movie_id, title, poster_path, media_type="movie"):
+    """Add movie (or TV series) to user's watchlist. Returns True if added, False if it was already there."""
+    row = run_statement(
+        "add_to_watchlist", (user_id, movie_id, media_type, title, poster_path), fetch='one', commit=True
+    )
+    if row is None:
+        logger.warning("WATCHLIST ADD FAILED: Movie already in watchlist", extra={"event": "watchlist"})
+        return False
 
+    invalidate_cache("watchlist", user_id)
+    logger.info("WATCHLIST ADD: Movie '%s' added for user_id %s", title, user_id, extra={"event": "watchlist"})
+    return True
 
-def remove_from_watchlist(user_id, movie_id):
-    """Remove movie from user's watchlist. Returns True if movie was removed."""
-    rowcount = execute_query(
-        "DELETE FROM watchlist WHERE user_id = ? AND movie_id = ?",
-        (user_id, movie_id)
-    )
+
+def remove_from_watchlist(user_id, movie_id, media_type="movie"):
+    """Remove movie (or TV series) from user's watchlist. Returns True if it was removed."""
+    rowcount = run_statement("remove_from_watchlist", (user_id, movie_id, media_type))
     
     removed = rowcount > 0
     if removed:
-        logger.info(f"WATCHLIST REMOVE: Movie {movie_id} removed for user_id {user_id}")
+        invalidate_cache("watchlist", user_id)
+        logger.info("WATCHLIST REMOVE: Movie %s removed for user_id %s", movie_id, user_id, extra={"event": "watchlist"})
     return removed
 
 
 def get_user_watchlist(user_id):
     """Get all movies in user's watchlist."""
-    rows = execute_query(
-        "SELECT movie_id, title, poster_path FROM watchlist WHERE user_id = ? ORDER BY added_at DESC",
-        (user_id,),
-        fetch='all'
-    )
+    return cached_read("watchlist", user_id, lambda: _load_user_watchlist(user_id))
+
+
+def _load_user_watchlist(user_id):
+    rows = run_statement("get_user_watchlist", (user_id,), fetch='all')
     
     return [
         {
             "id": row["movie_id"],
+            "media_type": row["media_type"],
             "title": row["title"],
             "poster_path": row["poster_path"]
         }
@@ -338,11 +1251,96 @@ def get_user_watchlist(user_id):
     ]
 
 
-def is_in_watchlist(user_id, movie_id):
-    """Check if movie is already in user's watchlist."""
-    result = execute_query(
-        "SELECT id FROM watchlist WHERE user_id = ? AND movie_id = ?",
-        (user_id, movie_id),
-        fetch='one'
-    )
+def _encode_cursor(row):
+    """Opaque cursor pointing just after this row in (added_at DESC, id DESC) order."""
+    raw = f"{row['added_at']}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    """Inverse of _encode_cursor. Raises ValueError for anything we didn't issue."""
+    try:
+        added_at, _, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rpartition("|")
+        return added_at, int(row_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid watchlist cursor: {cursor!r}") from e
+
+
+def get_user_watchlist_page(user_id, limit=WATCHLIST_PAGE_SIZE, cursor=None):
+    """
+    Get one page of the user's watchlist, newest first, using keyset pagination.
+    Each page is an index range scan, so cost doesn't grow with list length.
+    Args:
+        cursor: next_cursor from the previous page, or None for the first page
+    Returns:
+        (movies, next_cursor) - next_cursor is None on the last page
+    """
+    # One extra row tells us whether there is a next page
+    if cursor:
+        added_at, row_id = _decode_cursor(cursor)
+        rows = run_statement("watchlist_next_page", (user_id, added_at, row_id, limit + 1), fetch='all')
+    else:
+        rows = run_statement("watchlist_first_page", (user_id, limit + 1), fetch='all')
+    rows = rows or []
+
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    movies = [
+        {
+            "id": row["movie_id"],
+            "media_type": row["media_type"],
+            "title": row["title"],
+            "poster_path": row["poster_path"]
+        }
+        for row in rows[:limit]
+    ]
+    return movies, next_cursor
+
+
+def iter_user_watchlist(user_id, batch_size=500):
+    """
+    Stream the user's whole watchlist (newest first) without loading it into memory.
+    PostgreSQL uses a server-side (named) cursor, on a read replica when routing allows;
+    SQLite steps its cursor in batches.
+    Yields:
+        dict per movie, including added_at as a string
+    """
+    ensure_schema()  # Doesn't go through _route_query
+    conn = _read_connection() if USE_POSTGRES else get_db_connection()
+    try:
+        if USE_POSTGRES:
+            cursor = conn.cursor(name=f"watchlist_export_{user_id}")
+            cursor.itersize = batch_size
+            cursor.execute(
+                "SELECT movie_id, media_type, title, poster_path, added_at FROM watchlist "
+                "WHERE user_id = %s ORDER BY added_at DESC, id DESC",
+                (user_id,)
+            )
+        else:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            cursor.execute(
+                "SELECT movie_id, media_type, title, poster_path, added_at FROM watchlist "
+                "WHERE user_id = ? ORDER BY added_at DESC, id DESC",
+                (user_id,)
+            )
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    "id": row["movie_id"],
+                    "media_type": row["media_type"],
+                    "title": row["title"],
+                    "poster_path": row["poster_path"],
+                    "added_at": str(row["added_at"])
+                }
+    finally:
+        conn.close()
+
+
+def is_in_watchlist(user_id, movie_id, media_type="movie"):
+    """Check if movie (or TV series) is already in user's watchlist."""
+    result = run_statement("is_in_watchlist", (user_id, movie_id, media_type), fetch='one')
     return result is not None
@@ -0,0 +1,163 @@
+"""
+Gunicorn production configuration for DevOps Flix
+Loaded automatically by `gunicorn app:app` from the working directory.
+- Sizes workers/threads from the container's cgroup CPU quota, not the node's core count
+- gthread workers by default; gevent (if installed) for the I/O-bound TMDB routes
+- preload_app: the app is imported once in the master and forked workers share that memory
+  (gthread only: gevent workers import it themselves, after monkey-patching)
+- Workers are recycled after max_requests and drain in-flight requests on SIGTERM
+- Schema setup and bcrypt calibration run once in the master, not in every worker
+"""
+
+import logging
+import math
+import os
+import shutil
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def cgroup_cpu_limit(root="/sys/fs/cgroup"):
+    """CPUs this container may use (e.g. 0.5 for a 500m limit), or None if unlimited."""
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        with open(os.path.join(root, "cpu.max")) as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+
+    # cgroup v1: quota of -1 means unlimited
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+        return quota / period if quota > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus():
+    """cgroup quota if there is one, otherwise the cores this process may run on."""
+    limit = cgroup_cpu_limit()
+    if limit:
+        return limit
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def gevent_available():
+    try:
+        import gevent  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def size_workers(cpus, worker_class):
+    """
+    (workers, threads) for this many CPUs.
+    Requests mostly wait on TMDB and PostgreSQL, so concurrency comes from threads or
+    greenlets; processes only need to cover the CPU quota (min 2 so one can restart).
+    """
+    cores = max(1, math.ceil(cpus))
+    if worker_class == "gevent":
+        return cores, 1
+    return max(2, cores * 2), 4
+
+
+cpus = available_cpus()
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent" and not gevent_available():
+    logger.warning("gevent is not installed, falling back to gthread workers")
+    worker_class = "gthread"
+
+_workers, _threads = size_workers(cpus, worker_class)
+workers = int(os.environ.get("WEB_CONCURRENCY", _workers))
+threads = int(os.environ.get("GUNICORN_THREADS", _threads))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 200))  # gevent only
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+# gevent patches sockets, threads and locks when a worker starts. A preloaded app would
+# already hold unpatched DB/HTTP pools and thread pools by then, so gevent workers load
+# the app (and run initialize()) after the patch instead, in post_worker_init
+preload_app = worker_class != "gevent"
+
+# Recycle workers to cap memory growth; jitter stops them all restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Graceful shutdown: in-flight requests get graceful_timeout seconds after SIGTERM.
+# Keep it below terminationGracePeriodSeconds in k8s/deployment.yaml.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 20))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+# Prometheus multiprocess mode: start every server with an empty metrics directory.
+# This must happen here, not in on_starting - preload_app imports the app first.
+_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir:
+    shutil.rmtree(_multiproc_dir, ignore_errors=True)
+    os.makedirs(_multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    server.log.info(
+        f"CPU quota {cpus:g} -> {workers} {worker_class} workers x {threads} threads "
+        f"(max_requests={max_requests})"
+    )
+    # Schema setup and bcrypt calibration once, here, instead of in every worker.
+    # preload_app has already imported the app, so this import is free.
+    if preload_app:
+        import app
+        app.initialize()
+
+
+def post_worker_init(worker):
+    # gevent workers only: the app was just imported, after monkey-patching
+    if not preload_app:
+        import app
+        app.initialize()
+
+
+def when_ready(server):
+    import startup
+    startup.mark("master ready")
+
+
+def post_fork(server, worker):
+    import startup
+    startup.mark("worker forked")
+
+    # Saturation is in-flight requests / request slots in this worker. Only workers publish
+    # their capacity, and each keeps its upstream window current while it is idle
+    import metrics
+    metrics.saturation.set_capacity(worker_connections if worker_class == "gevent" else threads)
+    metrics.saturation.start_refresh()
+
+    # psycopg2 blocks the whole process under gevent unless it is made cooperative
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen not installed: database calls will block gevent workers")
+
+
+def child_exit(server, worker):
+    # Stop counting a dead worker's in-flight requests and pool connections
+    import metrics
+    metrics.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    # Finish queued background work (password upgrades etc.) before the worker goes away
+    import tasks
+    tasks.background.shutdown(timeout=graceful_timeout)
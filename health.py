@@ -0,0 +1,137 @@
+"""
+Health checks for DevOps Flix
+- Liveness (/livez): the process can answer HTTP. No dependency checks - a database
+  outage must not make Kubernetes restart every pod.
+- Readiness (/readyz): this pod can serve quickly right now. Each check is cheap and
+  the combined result is cached for HEALTH_CACHE_SECONDS, so probes every 5s (from
+  every kubelet and load balancer) cost at most one round of checks per interval.
+
+Checks are registered with register_check(); a failing "critical" check takes the pod
+out of the Service, a failing non-critical one is reported as degraded only.
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CACHE_SECONDS = float(os.environ.get("HEALTH_CACHE_SECONDS", 2))
+TASK_LAG_LIMIT_MS = float(os.environ.get("TASK_LAG_LIMIT_MS", 5000))  # Background queue wait before not ready
+
+
+class CheckFailed(Exception):
+    """Raised by a check with a short reason; the check's detail dict rides along."""
+
+    def __init__(self, reason, detail=None):
+        super().__init__(reason)
+        self.detail = detail or {}
+
+
+_checks = {}  # name -> (func, critical)
+_cached = None  # (expires, ready, results)
+_lock = threading.Lock()
+
+
+def register_check(name, func, critical=True):
+    """
+    Add a readiness check. func() returns a dict of details (shown in /readyz)
+    or raises (CheckFailed for an expected failure, anything else for a broken dependency).
+    """
+    _checks[name] = (func, critical)
+
+
+def readiness(force=False):
+    """
+    Run (or reuse) the readiness checks.
+    Returns:
+        (ready, {name: {"status": "ok" | "failing" | "degraded", ...}})
+    """
+    global _cached
+    with _lock:
+        # One thread runs the checks; concurrent probes wait and share the result
+        if not force and _cached and _cached[0] > time.monotonic():
+            return _cached[1], _cached[2]
+
+        ready, results = True, {}
+        for name, (func, critical) in _checks.items():
+            start = time.perf_counter()
+            try:
+                result = {"status": "ok", **(func() or {})}
+            except CheckFailed as e:
+                result = {"status": "failing" if critical else "degraded", "reason": str(e), **e.detail}
+            except Exception as e:
+                result = {"status": "failing" if critical else "degraded", "reason": f"{type(e).__name__}: {e}"}
+            result["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            results[name] = result
+            if result["status"] == "failing":
+                ready = False
+
+        if not ready and (not _cached or _cached[1]):
+            failing = [name for name, r in results.items() if r["status"] == "failing"]
+            logger.warning("NOT READY: %s", ", ".join(failing))
+        _cached = (time.monotonic() + HEALTH_CACHE_SECONDS, ready, results)
+        return ready, results
+
+
+def reset():
+    """Forget the cached result (tests)."""
+    global _cached
+    with _lock:
+        _cached = None
+
+
+# ============================================================
+# BUILT-IN CHECKS
+# ============================================================
+
+def check_database():
+    """
+    Primary answers through the pool (a new pod also opens its first connection here),
+    and the schema is up to date - a pod isn't ready before its migrations have run.
+    """
+    import database
+    database.check_database(timeout=1.0)
+    database.ensure_schema()
+    return {"pools": database.pool_stats()} if database.USE_POSTGRES else {}
+
+
+def check_background_tasks():
+    """The background queue is keeping up: not near full and tasks start promptly."""
+    import tasks
+    stats = tasks.background.stats()
+    detail = {key: stats[key] for key in ("depth", "maxsize", "running", "wait_ms_p95")}
+    if stats["maxsize"] and stats["depth"] >= 0.9 * stats["maxsize"]:
+        raise CheckFailed("background queue nearly full", detail)
+    if stats["wait_ms_p95"] > TASK_LAG_LIMIT_MS:
+        raise CheckFailed(f"background tasks wait {stats['wait_ms_p95']:.0f}ms (p95)", detail)
+    return detail
+
+
+def check_password_pool():
+    """Login/signup won't answer 503: the bcrypt pool has free slots."""
+    import database
+    stats = database.password_pool_stats()
+    if stats["workers"] > 0 and stats["in_flight"] >= stats["limit"]:
+        raise CheckFailed("password hashing pool saturated", stats)
+    return stats
+
+
+def check_upstream():
+    """
+    TMDB latency seen by this pod. Non-critical: a slow TMDB slows every pod alike,
+    so pulling this one out of the Service would only concentrate the load.
+    """
+    import metrics
+    snapshot = metrics.saturation.snapshot()
+    detail = {"upstream_wait_seconds": round(snapshot["upstream_wait_seconds"], 3)}
+    if snapshot["upstream_wait_seconds"] > metrics.SATURATION_UPSTREAM_TARGET:
+        raise CheckFailed("TMDB responses are slow", detail)
+    return detail
+
+
+register_check("database", check_database)
+register_check("background_tasks", check_background_tasks)
+register_check("password_pool", check_password_pool)
+register_check("upstream", check_upstream, critical=False)
@@ -0,0 +1,258 @@
+"""
+Image proxy for DevOps Flix
+Posters, backdrops, cast photos and provider logos are served from /img/w<width>/<file>
+instead of straight from TMDB at w500:
+- Templates ask for the size each slot displays (image_attrs(path, "poster") gives a
+  src/srcset/sizes set), so a 70px cast photo downloads a 185px file, not a 500px one
+- Each (width, file) is fetched once from IMAGE_UPSTREAM and kept on local disk in
+  IMAGE_CACHE_DIR, evicting least recently used files beyond IMAGE_CACHE_MAX_MB
+- TMDB image paths never change content, so responses are cacheable for a year
+
+TMDB already publishes every image at a fixed set of widths, so the proxy caches those
+variants rather than resizing (no imaging library needed). IMAGE_PROXY=false links the
+same sized variants directly on IMAGE_UPSTREAM instead.
+"""
+
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from markupsafe import Markup, escape
+
+import startup
+import tracing
+from metrics import CACHE_REQUESTS
+
+requests = startup.lazy_module("requests")
+
+IMAGE_UPSTREAM = os.environ.get("IMAGE_UPSTREAM", "https://image.tmdb.org/t/p").rstrip("/")
+IMAGE_PROXY = os.environ.get("IMAGE_PROXY", "true").lower() != "false"
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "devopsflix-images"))
+IMAGE_CACHE_MAX_MB = float(os.environ.get("IMAGE_CACHE_MAX_MB", 512))
+IMAGE_MAX_AGE = 365 * 24 * 3600
+IMAGE_TIMEOUT = 10
+IMAGE_MISSING_TTL = 60  # Seconds an upstream 404 is remembered, so broken links don't hammer TMDB
+IMAGE_MISSING_MAX = 1000  # Remembered 404s, oldest dropped first
+
+# Root that "/w<width>/<file>" is appended to, in templates and page scripts
+IMAGE_ROOT = "/img" if IMAGE_PROXY else IMAGE_UPSTREAM
+
+# Widths TMDB serves (poster, backdrop, profile and logo sizes); nothing else is proxied
+WIDTHS = (45, 92, 154, 185, 300, 342, 500, 780, 1280)
+
+# Slot -> (widths offered in srcset, sizes attribute, src width for browsers without srcset);
+# sizes follow static/style.css
+SLOTS = {
+    "poster": ((154, 185, 342, 500), "200px", 342),  # .movie-card
+    "top10": ((185, 342, 500), "(max-width: 1100px) 220px, 20vw", 342),  # .top10-card
+    "grid": ((154, 185, 342), "(max-width: 768px) 45vw, 200px", 185),  # Search results grid
+    "profile": ((92, 185), "70px", 185),  # Cast photos
+    "logo": ((45, 92), "50px", 92),  # Watch provider logos
+}
+BACKDROP_WIDTH = 780  # CSS backgrounds can't use srcset; hero and detail page backdrops
+
+CONTENT_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".svg": "image/svg+xml"}
+_FILE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}\.(?:jpe?g|png|svg)$")
+
+
+class ImageNotFound(Exception):
+    """Unknown width, malformed file name, or upstream has no such image."""
+
+
+class UpstreamError(Exception):
+    """The image upstream failed or timed out."""
+
+
+# ============================================================
+# URL HELPERS (template globals)
+# ============================================================
+
+def image_url(path, width):
+    """URL of TMDB image `path` ("/abc.jpg") at `width` pixels ("" for no image)."""
+    if not path:
+        return ""
+    return f"{IMAGE_ROOT}/w{width}/{path.lstrip('/')}"
+
+
+def image_attrs(path, slot):
+    """src, srcset and sizes attributes for an <img> in one of SLOTS."""
+    widths, sizes, src_width = SLOTS[slot]
+    srcset = ", ".join(f"{image_url(path, width)} {width}w" for width in widths)
+    src = image_url(path, src_width)
+    return Markup(f'src="{escape(src)}" srcset="{escape(srcset)}" sizes="{escape(sizes)}"')
+
+
+# ============================================================
+# DISK CACHE
+# ============================================================
+
+class DiskCache:
+    """
+    Files under a directory, evicted least-recently-used first (by mtime) past max_bytes.
+    Shared by every worker on the pod: writes are atomic renames, and eviction rescans
+    the directory so it sees other processes' files.
+    """
+
+    TOUCH_INTERVAL = 60  # Seconds; re-stamping mtime on every hit would be a write per request
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None  # This process's running estimate, corrected by each rescan
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        # w342/ab/abcdef.jpg - the shard keeps directories small
+        width, name = key
+        return os.path.join(self.directory, f"w{width}", name[:2], name)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if time.time() - os.stat(path).st_mtime > self.TOUCH_INTERVAL:
+                os.utime(path)  # Mark as recently used
+            return data
+        except FileNotFoundError:  # Never cached, or evicted by another worker
+            return None
+
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # Readers see the whole file or none of it
+        except OSError:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._files())
+
+    def _evict(self):
+        """Delete oldest files until we are at 90% of the limit (so we don't evict on every put)."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Another worker got there first
+            total -= size
+        self._size = total
+
+
+cache = DiskCache(IMAGE_CACHE_DIR, int(IMAGE_CACHE_MAX_MB * 1024 * 1024))
+
+_inflight = {}  # key -> Future for the fetch in progress
+_missing = {}  # key -> monotonic time until which upstream's 404 is reused
+_inflight_lock = threading.Lock()  # Guards _inflight and _missing
+
+
+# ============================================================
+# FETCH
+# ============================================================
+
+def fetch(width, name):
+    """
+    Image bytes for (width, file name), from disk or upstream.
+    Returns:
+        (bytes, content type)
+    Raises:
+        ImageNotFound, UpstreamError
+    """
+    if width not in WIDTHS or not _FILE_NAME.match(name):
+        raise ImageNotFound(name)
+    key = (width, name)
+    content_type = CONTENT_TYPES[os.path.splitext(name)[1].lower()]
+
+    data = cache.get(key)
+    if data is not None:
+        CACHE_REQUESTS.labels("image", "hit").inc()
+        tracing.record("cache", "image", 0.0, width=width)
+        return data, content_type
+
+    # One upstream fetch per image: concurrent misses share its Future, so they get its
+    # bytes or its exception rather than each trying upstream again in turn
+    with _inflight_lock:
+        if _missing.get(key, 0) > time.monotonic():
+            raise ImageNotFound(name)
+        future = _inflight.get(key)
+        if future is None:
+            future = _inflight[key] = Future()
+            leader = True
+        else:
+            leader = False
+    if not leader:
+        return future.result(), content_type
+
+    try:
+        data = _fetch_and_store(key)
+    except BaseException as e:
+        with _inflight_lock:
+            if isinstance(e, ImageNotFound):
+                if len(_missing) >= IMAGE_MISSING_MAX:
+                    _missing.pop(next(iter(_missing)))
+                _missing[key] = time.monotonic() + IMAGE_MISSING_TTL
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+    with _inflight_lock:
+        _inflight.pop(key, None)
+    future.set_result(data)
+    return data, content_type
+
+
+def _fetch_and_store(key):
+    data = cache.get(key)  # Another worker process may have stored it since our first look
+    if data is None:
+        CACHE_REQUESTS.labels("image", "miss").inc()
+        data = _fetch_upstream(*key)
+        cache.put(key, data)
+    return data
+
+
+def _fetch_upstream(width, name):
+    start = time.perf_counter()
+    status = error = None
+    try:
+        response = requests.get(f"{IMAGE_UPSTREAM}/w{width}/{name}", timeout=IMAGE_TIMEOUT)
+        status = response.status_code
+        if status == 404:
+            raise ImageNotFound(name)
+        response.raise_for_status()
+        return response.content
+    except requests.RequestException as e:
+        error = type(e).__name__
+        raise UpstreamError(f"{name} at w{width}: {error}") from e
+    finally:
+        tracing.record(
+            "upstream", f"/w{width}/{{image}}", time.perf_counter() - start,
+            fetcher="image", status=status, error=error
+        )
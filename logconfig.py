@@ -0,0 +1,161 @@
+"""
+Logging pipeline for DevOps Flix
+Request threads only build a LogRecord and put it on a queue; a background listener
+thread formats and writes it. On top of that:
+- Per-event sampling: log calls tag themselves with extra={"event": "search"} and
+  LOG_SAMPLE_RATES (e.g. "search=0.01,request=0.1") keeps that fraction of them.
+  Warnings and errors are always kept.
+- Formatting is deferred: messages use %-style arguments, which are only merged
+  into the message by the listener, for records that survived sampling.
+- JSON lines by default (LOG_FORMAT=text for the old human-readable format).
+
+The listener thread is per process (restarted after fork, like tasks.py's workers)
+and flushed at exit. If it falls behind by LOG_QUEUE_SIZE records, new records are
+dropped and counted rather than blocking requests.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")  # "json" or "text"
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLE_RATES = os.environ.get("LOG_SAMPLE_RATES", "search=0.01,request=0.1")
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-8s [%(trace_id)s] %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else came from extra= and goes into the JSON
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "trace_id"}
+
+
+def parse_sample_rates(text):
+    """"search=0.01, request=0.1" -> {"search": 0.01, "request": 0.1}"""
+    rates = {}
+    for part in text.split(","):
+        event, _, rate = part.partition("=")
+        if event.strip() and rate.strip():
+            rates[event.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, trace_id, event and any extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "trace_id": getattr(record, "trace_id", "-"),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class EventSampler(logging.Filter):
+    """Keep LOG_SAMPLE_RATES[event] of each tagged event; warnings and errors always pass."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None), 1.0)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        event = record.event
+        self.sampled_out[event] = self.sampled_out.get(event, 0) + 1
+        return False
+
+
+class AsyncHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener and never blocks the caller."""
+
+    def __init__(self, target, maxsize=LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target = target
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        # Threads don't survive fork: a gunicorn worker starts its own listener on a fresh queue
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self.queue = queue.Queue(maxsize=self.maxsize)
+            self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # The stock prepare() formats the message here, on the request thread. The record
+        # stays in this process, so the listener can format it later.
+        return record
+
+    def enqueue(self, record):
+        self._ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush_and_stop(self):
+        """Write everything queued so far (atexit)."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._pid = None
+
+
+_handler = None
+
+
+def configure_logging():
+    """Install the queue-based handler on the root logger (once per process)."""
+    global _handler
+    if _handler is not None:
+        return _handler
+
+    stream = logging.StreamHandler()
+    if LOG_FORMAT == "text":
+        stream.setFormatter(logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    _handler = AsyncHandler(stream)
+    _handler.addFilter(EventSampler(parse_sample_rates(LOG_SAMPLE_RATES)))
+
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_handler)
+    atexit.register(_handler.flush_and_stop)
+    return _handler
+
+
+def log_stats():
+    """Records dropped because the queue was full, and sampled out per event."""
+    if _handler is None:
+        return {"dropped": 0, "sampled_out": {}, "queued": 0}
+    sampler = next(f for f in _handler.filters if isinstance(f, EventSampler))
+    return {"dropped": _handler.dropped, "sampled_out": dict(sampler.sampled_out), "queued": _handler.queue.qsize()}
@@ -0,0 +1,191 @@
+"""
+Prometheus metrics for DevOps Flix
+Counters and histograms are updated inline (a lock and an add per event) by app.py,
+database.py and tasks.py, and exposed at /metrics.
+
+Under gunicorn every worker is its own process. When PROMETHEUS_MULTIPROC_DIR is set
+(the Dockerfile does this) each worker writes to mmap'd files in that directory and
+/metrics aggregates all of them, whichever worker serves the scrape.
+
+Ratios are left to PromQL, e.g. cache hit ratio:
+    sum(rate(devopsflix_cache_requests_total{result="hit"}[5m]))
+      / sum(rate(devopsflix_cache_requests_total[5m]))
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from prometheus_client import (  # noqa: F401 - CONTENT_TYPE_LATEST is re-exported for /metrics
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+if MULTIPROCESS:
+    # gunicorn.conf.py empties it for each server start; any other entry point that imports
+    # the app (flask init-db, a shell, a one-off job) still needs it to exist before the
+    # first gauge below opens its file
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Request/upstream latencies cluster between a few ms (cache) and TMDB's 10s timeout
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+REQUEST_LATENCY = Histogram(
+    "devopsflix_request_duration_seconds", "Time to produce a response, per route",
+    ["route", "method", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "devopsflix_requests_in_flight", "Requests currently being handled",
+    multiprocess_mode="livesum"
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "devopsflix_tmdb_request_duration_seconds", "TMDB API call latency, per fetcher",
+    ["fetcher"], buckets=LATENCY_BUCKETS
+)
+UPSTREAM_ERRORS = Counter(
+    "devopsflix_tmdb_errors_total", "Failed TMDB API calls, per fetcher and error type",
+    ["fetcher", "error"]
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "devopsflix_db_query_duration_seconds", "Database query latency (registry statement name or 'adhoc')",
+    ["statement"], buckets=DB_BUCKETS
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "devopsflix_db_pool_connections", "PostgreSQL pool connections by state (in_use / capacity)",
+    ["host", "state"], multiprocess_mode="livesum"
+)
+
+CACHE_REQUESTS = Counter(
+    "devopsflix_cache_requests_total", "Cache lookups by cache and result (hit / miss / bypass)",
+    ["cache", "result"]
+)
+CACHE_INVALIDATIONS = Counter(
+    "devopsflix_cache_invalidations_total", "Cache invalidations applied, per cache",
+    ["cache"]
+)
+
+
+# ============================================================
+# SATURATION SIGNAL (for the custom-metrics HPA, see k8s/hpa-custom-metrics.yaml)
+# ============================================================
+# CPU stays low while requests wait on TMDB and PostgreSQL, so we scale on:
+#   busy      = requests in flight / concurrent request slots (threads or greenlets)
+#   upstream  = rolling mean TMDB wait / SATURATION_UPSTREAM_TARGET
+#   saturation = max(busy, upstream); 1.0 means "at capacity"
+SATURATION_UPSTREAM_TARGET = float(os.environ.get("SATURATION_UPSTREAM_TARGET", 1.0))  # Seconds
+SATURATION_WINDOW = 60  # Seconds of upstream calls in the rolling mean
+SATURATION_REFRESH_SECONDS = 5  # How often a gunicorn worker re-publishes its signal
+
+WORKER_CAPACITY = Gauge(
+    "devopsflix_worker_capacity", "Concurrent request slots (threads / greenlets)",
+    multiprocess_mode="livesum"
+)
+UPSTREAM_WAIT = Gauge(
+    "devopsflix_upstream_wait_seconds", f"Mean TMDB wait over the last {SATURATION_WINDOW}s",
+    multiprocess_mode="livemax"
+)
+SATURATION = Gauge(
+    "devopsflix_saturation", "max(busy request slots ratio, upstream wait / target); 1.0 = at capacity",
+    multiprocess_mode="livemax"
+)
+
+
+class SaturationTracker:
+    """
+    Per-process saturation, updated inline as requests start/finish and TMDB calls return.
+    The upstream window also has to age out when nothing happens, so the gauges are
+    re-published at scrape time (render) and, in gunicorn workers, every few seconds.
+    """
+
+    def __init__(self, capacity=1):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._upstream = deque()  # (monotonic time, seconds)
+        self._upstream_total = 0.0
+        self.capacity = max(1, int(capacity))  # Published by set_capacity()
+
+    def set_capacity(self, capacity):
+        self.capacity = max(1, int(capacity))
+        WORKER_CAPACITY.set(self.capacity)
+        self.refresh()
+
+    def request_started(self):
+        with self._lock:
+            self._in_flight += 1
+        self.refresh()
+
+    def request_finished(self):
+        with self._lock:
+            self._in_flight -= 1
+        self.refresh()
+
+    def observe_upstream(self, seconds):
+        with self._lock:
+            self._upstream.append((time.monotonic(), seconds))
+            self._upstream_total += seconds
+        self.refresh()
+
+    def snapshot(self):
+        """Current components of the signal for this process."""
+        with self._lock:
+            cutoff = time.monotonic() - SATURATION_WINDOW
+            while self._upstream and self._upstream[0][0] < cutoff:
+                self._upstream_total -= self._upstream.popleft()[1]
+            upstream_wait = self._upstream_total / len(self._upstream) if self._upstream else 0.0
+            in_flight, capacity = self._in_flight, self.capacity
+        busy = in_flight / capacity
+        return {
+            "in_flight": in_flight,
+            "capacity": capacity,
+            "busy_ratio": busy,
+            "upstream_wait_seconds": upstream_wait,
+            "saturation": max(busy, upstream_wait / SATURATION_UPSTREAM_TARGET),
+        }
+
+    def refresh(self):
+        """Publish the current signal, dropping upstream calls that have left the window."""
+        snapshot = self.snapshot()
+        UPSTREAM_WAIT.set(snapshot["upstream_wait_seconds"])
+        SATURATION.set(snapshot["saturation"])
+
+    def start_refresh(self, interval=SATURATION_REFRESH_SECONDS):
+        """
+        Refresh every `interval` seconds from a daemon thread. Under gunicorn a scrape only
+        refreshes the worker serving it, and an idle worker's last value would otherwise
+        stay up under livemax.
+        """
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.refresh()
+
+        threading.Thread(target=loop, name="saturation-refresh", daemon=True).start()
+
+
+# gunicorn.conf.py sets the real capacity in post_fork (and starts the refresh thread), so
+# only workers add to the livesum - not a preloaded master. A single process (the dev
+# server, tests) is its own worker and handles one request at a time
+saturation = SaturationTracker(int(os.environ.get("WORKER_CAPACITY", 1)))
+if not MULTIPROCESS:
+    saturation.set_capacity(saturation.capacity)
+
+
+def render():
+    """Current metrics in the Prometheus text format, aggregated across workers if needed."""
+    saturation.refresh()  # This process's window ages out even when it has seen no traffic
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges (gunicorn child_exit hook)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,276 @@
+"""
+Per-request sampling profiler for DevOps Flix
+Profiles one request at a time when asked to, so a slow page in production can be
+explained without attaching a debugger:
+- X-Profile: <token> header, token signed with the app's SECRET_KEY (python profiler.py token)
+- ?profile=1 from a logged-in admin (PROFILE_ADMINS)
+- A random PROFILE_SAMPLE_RATE of requests, for background collection
+
+A sampler thread reads the request thread's stack (sys._current_frames) every
+PROFILE_INTERVAL_MS and writes collapsed stacks (flamegraph.pl / speedscope) or a
+speedscope JSON file to PROFILE_DIR, plus a time breakdown: upstream (TMDB) wait,
+database, template rendering and everything else. PROFILE_DIR keeps the newest
+PROFILE_MAX_FILES files, so background sampling can't fill the disk.
+
+Requests that aren't profiled pay a header lookup and an args lookup - no thread, no timer.
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_FORMAT = os.environ.get("PROFILE_FORMAT", "speedscope")  # "speedscope" or "collapsed"
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))  # Fraction of all requests
+PROFILE_MAX_CONCURRENT = int(os.environ.get("PROFILE_MAX_CONCURRENT", 2))  # Caps random-sampling overhead
+PROFILE_TOKEN_MAX_AGE = int(os.environ.get("PROFILE_TOKEN_MAX_AGE", 3600))  # Seconds a signed header is valid
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 200))  # Oldest files in PROFILE_DIR go past this
+# Nobody by default: the seeded "admin" account has a well-known password
+PROFILE_ADMINS = {u.strip() for u in os.environ.get("PROFILE_ADMINS", "").split(",") if u.strip()}
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+TOKEN_SALT = "devopsflix-profile"
+
+_slots = threading.BoundedSemaphore(PROFILE_MAX_CONCURRENT)
+
+
+# ============================================================
+# TRIGGERS
+# ============================================================
+
+def make_token(secret_key):
+    """A signed X-Profile header value, valid for PROFILE_TOKEN_MAX_AGE seconds."""
+    return URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT).dumps("profile")
+
+
+def verify_token(secret_key, token):
+    try:
+        URLSafeTimedSerializer(secret_key, salt=TOKEN_SALT).loads(token, max_age=PROFILE_TOKEN_MAX_AGE)
+        return True
+    except BadSignature:  # Includes SignatureExpired
+        return False
+
+
+def profile_reason(headers, args, user, secret_key):
+    """Why this request should be profiled ("header", "admin", "sampled"), or None."""
+    token = headers.get(PROFILE_HEADER)
+    if token is not None:
+        if verify_token(secret_key, token):
+            return "header"
+        logger.warning("PROFILE REJECTED: bad or expired X-Profile token")
+    if PROFILE_PARAM in args and user in PROFILE_ADMINS:
+        return "admin"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+# ============================================================
+# SAMPLER
+# ============================================================
+
+# Where a sample's time is attributed: the first match walking from the innermost frame out
+CATEGORIES = [
+    ("upstream", lambda filename, function: function == "tmdb_get"),
+    ("database", lambda filename, function: filename == "database.py" and function in (
+        "_run_query", "iter_user_watchlist", "check_database", "run_migrations"
+    )),
+    ("password", lambda filename, function: filename == "database.py" and function == "_run_password_job"),
+    ("render", lambda filename, function: function in ("render_template", "stream_template")),
+]
+
+
+class SamplingProfiler:
+    """Samples one thread's stack on a timer thread until stop()."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL_MS / 1000):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()  # tuple of frame names (outermost first) -> samples
+        self.categories = Counter()
+        self._names = {}  # code object -> "function (file:line)"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.wall_seconds = time.perf_counter() - self.started
+        return self
+
+    def _frame_name(self, code):
+        name = self._names.get(code)
+        if name is None:
+            name = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._names[code] = name
+        return name
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            category = None
+            while frame is not None:
+                code = frame.f_code
+                stack.append(self._frame_name(code))
+                if category is None:
+                    filename = os.path.basename(code.co_filename)
+                    for label, matches in CATEGORIES:
+                        if matches(filename, code.co_name):
+                            category = label
+                            break
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.categories[category or "app"] += 1
+
+    def breakdown(self):
+        """Milliseconds per category, scaled so they add up to the wall time."""
+        total = sum(self.categories.values())
+        wall_ms = self.wall_seconds * 1000
+        result = {"total": round(wall_ms, 1), "samples": total}
+        for label in [c for c, _ in CATEGORIES] + ["app"]:
+            result[label] = round(wall_ms * self.categories[label] / total, 1) if total else 0.0
+        return result
+
+
+def _short_path(filename):
+    # .../site-packages/flask/app.py -> flask/app.py; everything else keeps just its file name
+    _, found, tail = filename.rpartition("site-packages" + os.sep)
+    return tail if found else os.path.basename(filename)
+
+
+# ============================================================
+# REQUEST LIFECYCLE + OUTPUT
+# ============================================================
+
+def start(reason):
+    """Begin profiling the current thread. Returns None if too many profiles are running."""
+    if not _slots.acquire(blocking=False):
+        if reason != "sampled":
+            logger.warning("PROFILE SKIPPED: too many concurrent profiles")
+        return None
+    profiler = SamplingProfiler(threading.get_ident()).start()
+    profiler.reason = reason
+    return profiler
+
+
+def finish(profiler, label):
+    """Stop sampling, write the profile file, release the slot. Returns (path, breakdown)."""
+    try:
+        profiler.stop()
+        breakdown = profiler.breakdown()
+        path = write_profile(profiler, label, breakdown)
+        logger.info(
+            "PROFILE: %s (%s) %sms - upstream %sms, database %sms, render %sms -> %s",
+            label, profiler.reason, breakdown["total"], breakdown["upstream"], breakdown["database"],
+            breakdown["render"], path, extra={"event": "profile"}
+        )
+        return path, breakdown
+    finally:
+        _slots.release()
+
+
+def write_profile(profiler, label, breakdown, directory=None, fmt=None):
+    directory = directory or PROFILE_DIR
+    fmt = fmt or PROFILE_FORMAT
+    os.makedirs(directory, exist_ok=True)
+    safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in label).strip("_") or "request"
+    base = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}-{uuid.uuid4().hex[:6]}")
+
+    if fmt == "collapsed":
+        path = base + ".collapsed.txt"
+        with open(path, "w") as f:
+            for stack, count in profiler.stacks.most_common():
+                f.write(";".join(stack) + f" {count}\n")
+    else:
+        path = base + ".speedscope.json"
+        with open(path, "w") as f:
+            json.dump(_speedscope(profiler, label, breakdown), f)
+
+    # The breakdown sits next to the stacks (collapsed stacks have nowhere to put it)
+    with open(base + ".summary.json", "w") as f:
+        json.dump({"label": label, "reason": profiler.reason, "breakdown_ms": breakdown}, f, indent=2)
+    prune(directory)
+    return path
+
+
+def prune(directory, max_files=None):
+    """Delete the oldest files in directory until at most max_files (PROFILE_MAX_FILES) are left."""
+    max_files = PROFILE_MAX_FILES if max_files is None else max_files
+    try:
+        entries = [e for e in os.scandir(directory) if e.is_file()]
+        entries.sort(key=lambda e: e.stat().st_mtime)
+    except OSError:  # Another worker deleted a file while we listed them
+        return
+    for entry in entries[:max(0, len(entries) - max_files)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _speedscope(profiler, label, breakdown):
+    """A 'sampled' profile: https://github.com/jlfwong/speedscope/wiki/Importing-from-custom-sources"""
+    frames, index = [], {}
+    samples, weights = [], []
+    sample_ms = profiler.wall_seconds * 1000 / max(1, sum(profiler.stacks.values()))
+    for stack, count in profiler.stacks.items():
+        ids = []
+        for name in stack:
+            if name not in index:
+                index[name] = len(frames)
+                frames.append({"name": name})
+            ids.append(index[name])
+        samples.append(ids)
+        weights.append(round(count * sample_ms, 3))
+    name = (f"{label} - upstream {breakdown['upstream']}ms, database {breakdown['database']}ms, "
+            f"render {breakdown['render']}ms")
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "devopsflix-profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(profiler.wall_seconds * 1000, 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+def server_timing(breakdown):
+    """Server-Timing header value, so the breakdown shows up in browser devtools."""
+    return ", ".join(
+        f"{label};dur={breakdown[label]}" for label in ("upstream", "database", "render", "password", "app")
+    )
+
+
+if __name__ == "__main__":
+    # python profiler.py token -> header value for: curl -H "X-Profile: <token>" ...
+    if sys.argv[1:] != ["token"]:
+        sys.exit("usage: SECRET_KEY=... python profiler.py token")
+    print(make_token(os.environ.get("SECRET_KEY", "devopsflix-secret")))
@@ -0,0 +1,81 @@
+"""
+Field projection for DevOps Flix JSON APIs
+Detail dicts carry cast, crew, budget and more; a client showing a title and a rating
+asks for just those with ?fields=title,vote_average and gets a response that size:
+- parse_fields() validates the comma-separated list against the fields an API offers
+- project() keeps only those fields (plus "id", so results can be matched up)
+
+Search and list results (trending, top rated, search) always go through compact_results(),
+which keeps only what the cards, carousels and hero banner read, before they are cached.
+Watchlist cards add card_meta() (rating, year, runtime) from the cached title details.
+"""
+
+# Every key fetch_movie_details / fetch_tv_details can return
+DETAIL_FIELDS = frozenset({
+    "id", "title", "overview", "poster_path", "backdrop_path", "release_date", "runtime",
+    "vote_average", "vote_count", "genres", "tagline", "status", "budget", "revenue",
+    "media_type", "number_of_seasons", "number_of_episodes", "trailer_key", "cast",
+    "directors", "writers",
+})
+
+
+def parse_fields(raw, allowed):
+    """
+    "title, vote_average" -> ("id", "title", "vote_average"); None/"" -> None (all fields).
+    Raises:
+        ValueError: naming the fields that aren't in `allowed`
+    """
+    if not raw:
+        return None
+    fields = ["id"]
+    for name in raw.split(","):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+    unknown = sorted(set(fields) - allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(fields)
+
+
+# What the cards, carousels and hero read from a search/list result. The rest of what TMDB
+# sends (genre_ids, popularity, original_title, adult, video, ...) is dropped
+OVERVIEW_MAX_CHARS = 300  # The hero banner shows 250 and adds "..." past that
+
+
+def compact_result(item, media_type=None):
+    """
+    One TMDB search/list result in the shape every client uses: TV's name and
+    first_air_date become title and release_date, and media_type is always set.
+    """
+    return {
+        "id": item.get("id"),
+        "media_type": item.get("media_type") or media_type or "movie",
+        "title": item.get("title") or item.get("name") or "",
+        "release_date": item.get("release_date") or item.get("first_air_date") or "",
+        "poster_path": item.get("poster_path"),
+        "backdrop_path": item.get("backdrop_path"),
+        "overview": (item.get("overview") or "")[:OVERVIEW_MAX_CHARS],
+        "vote_average": round(item.get("vote_average") or 0, 1),
+    }
+
+
+def compact_results(items, media_type=None):
+    """compact_result() for every item; media_type fills in lists that don't tag it."""
+    return [compact_result(item, media_type) for item in items]
+
+
+def card_meta(details):
+    """The rating, year and runtime a watchlist card shows, from fetch_*_details() output."""
+    return {
+        "vote_average": round(details.get("vote_average") or 0, 1),
+        "year": (details.get("release_date") or "")[:4],
+        "runtime": details.get("runtime"),
+    }
+
+
+def project(record, fields):
+    """record with only `fields` (missing ones are skipped); fields=None returns it as is."""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
@@ -0,0 +1,191 @@
+"""
+Startup timing for DevOps Flix
+A pod only helps absorb a spike once it answers requests, so this module keeps track of
+where a cold start goes:
+- marks: seconds from process start to "imports done", "app ready", "first request"
+- phases: one-time work (schema setup, bcrypt calibration) and its duration
+- deferred imports: heavy modules (requests, bcrypt, psycopg2) are loaded on first use
+  through lazy_module(), and the time that first use cost is recorded
+
+The report is logged once, on the first request each process serves. For a per-module
+breakdown of import time run:
+
+    python startup.py            # import app in a fresh interpreter, time every import
+    python startup.py --top 25
+"""
+
+import argparse
+import contextlib
+import importlib
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import types
+
+logger = logging.getLogger(__name__)
+
+
+def _process_start_time():
+    """Wall-clock time this process started (Linux /proc), or now if that isn't available."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Field 22, counted after the ")" that ends the (possibly spaced) command name
+            start_ticks = int(f.read().rpartition(")")[2].split()[19])
+        with open("/proc/stat") as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return boot_time + start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return time.time()
+
+
+PROCESS_START = _process_start_time()
+
+_marks = []  # (name, wall-clock time)
+_phases = {}  # name -> seconds
+_deferred = {}  # module name -> seconds its first use spent importing it
+_reported = False
+_report_lock = threading.Lock()
+
+
+def mark(name):
+    """Note that startup reached `name` now."""
+    _marks.append((name, time.time()))
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a piece of one-time startup work."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = time.perf_counter() - start
+
+
+# ============================================================
+# LAZY IMPORTS
+# ============================================================
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module until one of its attributes is used, then imports it.
+    Attributes are looked up on the real module every time, so patching either the
+    real module or this stand-in (patch("app.requests.get")) behaves as usual.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    def _load(self):
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                if self.__name__ not in _deferred:
+                    _deferred[self.__name__] = time.perf_counter() - start
+                self._lazy_module = module
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        # Only called for attributes this stand-in doesn't have itself
+        module = self._lazy_module or self._load()
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._lazy_module is not None else "not loaded yet"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name):
+    """The module itself if something already imported it, otherwise a LazyModule."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def report():
+    """Seconds since process start for each mark, plus phase and deferred import durations."""
+    return {
+        "marks": {name: round(at - PROCESS_START, 3) for name, at in _marks},
+        "phases": {name: round(seconds, 3) for name, seconds in _phases.items()},
+        "deferred_imports": {name: round(seconds, 3) for name, seconds in _deferred.items()},
+    }
+
+
+def first_request():
+    """Called before every request; logs the startup report on the first one in this process."""
+    global _reported
+    if _reported:
+        return
+    with _report_lock:
+        if _reported:
+            return
+        _reported = True
+    mark("first request")
+    data = report()
+    logger.info(
+        "STARTUP: %s | %s | deferred imports: %s",
+        ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in data["marks"].items()),
+        ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in data["phases"].items()) or "no startup work",
+        ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in data["deferred_imports"].items()) or "none yet",
+        extra={"event": "startup", "startup": data}
+    )
+
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def parse_importtime(output, target):
+    """
+    -X importtime output -> (cumulative ms for `target`, {top-level package: self ms})
+    for the imports made while importing `target`.
+    """
+    pending = []
+    for line in output.splitlines():
+        found = _IMPORTTIME_LINE.match(line)
+        if not found:
+            continue
+        self_us, cumulative_us, indent, name = found.groups()
+        pending.append((name, int(self_us)))
+        if len(indent) == 1:  # Outermost import: its subtree was printed just before it
+            if name == target:
+                packages = {}
+                for module, us in pending:
+                    package = module.split(".")[0]
+                    packages[package] = packages.get(package, 0) + us / 1000
+                return int(cumulative_us) / 1000, packages
+            pending = []
+    raise ValueError(f"{target} was not imported")
+
+
+def import_times(target="app"):
+    """Import `target` in a fresh interpreter with -X importtime and parse the result."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Where `import app` spends its time, per package")
+    parser.add_argument("--target", default="app", help="module to import (default: app)")
+    parser.add_argument("--top", type=int, default=15, help="packages to show")
+    args = parser.parse_args()
+
+    total_ms, packages = import_times(args.target)
+    print(f"import {args.target}: {total_ms:.1f}ms")
+    for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<24}{ms:>9.1f}ms  {ms / total_ms:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+// Page script for templates/index.html (IMAGE_ROOT is set inline by the template)
+
+// Sized image through the /img proxy (IMAGE_ROOT); widths match images.SLOTS
+function imageUrl(path, width) {
+    return `${IMAGE_ROOT}/w${width}${path}`;
+}
+
+// ===== INTRO ANIMATION =====
+document.addEventListener('DOMContentLoaded', function () {
+    const intro = document.getElementById('intro');
+
+    // Hide intro after 6 seconds
+    setTimeout(() => {
+        intro.classList.add('hidden');
+        setTimeout(() => {
+            intro.style.display = 'none';
+        }, 500);
+    }, 6000);
+});
+
+// ===== AUTO-ROTATING HERO BANNER =====
+(function () {
+    const slides = document.querySelectorAll('.hero-slide');
+    const dots = document.querySelectorAll('.hero-dot');
+    let currentSlide = 0;
+    let heroInterval;
+    const SLIDE_DURATION = 8000; // 8 seconds
+
+    function showSlide(index) {
+        // Remove active class from all slides and dots
+        slides.forEach(slide => slide.classList.remove('active'));
+        dots.forEach(dot => dot.classList.remove('active'));
+
+        // Add active class to current slide and dot
+        if (slides[index]) slides[index].classList.add('active');
+        if (dots[index]) dots[index].classList.add('active');
+
+        currentSlide = index;
+    }
+
+    function nextSlide() {
+        const next = (currentSlide + 1) % slides.length;
+        showSlide(next);
+    }
+
+    // Start auto-rotation
+    function startRotation() {
+        heroInterval = setInterval(nextSlide, SLIDE_DURATION);
+    }
+
+    // Click on dots to navigate
+    dots.forEach((dot, index) => {
+        dot.addEventListener('click', () => {
+            clearInterval(heroInterval);
+            showSlide(index);
+            startRotation();
+        });
+    });
+
+    // Pause on hover (optional - enhances UX)
+    const heroSection = document.getElementById('heroSection');
+    if (heroSection) {
+        heroSection.addEventListener('mouseenter', () => {
+            clearInterval(heroInterval);
+        });
+        heroSection.addEventListener('mouseleave', () => {
+            startRotation();
+        });
+    }
+
+    // Initialize
+    if (slides.length > 0) {
+        startRotation();
+    }
+})();
+
+// ===== TOP 10 CAROUSEL ARROW NAVIGATION =====
+(function () {
+    const carousel = document.getElementById('top10-carousel');
+    const leftBtn = document.getElementById('top10-left');
+    const rightBtn = document.getElementById('top10-right');
+
+    if (carousel && leftBtn && rightBtn) {
+        const scrollAmount = 450; // Scroll by roughly 2 cards
+
+        leftBtn.addEventListener('click', () => {
+            carousel.scrollBy({ left: -scrollAmount, behavior: 'smooth' });
+        });
+
+        rightBtn.addEventListener('click', () => {
+            carousel.scrollBy({ left: scrollAmount, behavior: 'smooth' });
+        });
+    }
+})();
+
+// ===== TOAST NOTIFICATION =====
+function showToast(message, type = 'success') {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.className = `toast ${type} show`;
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 3000);
+}
+
+// ===== WATCHLIST FUNCTIONS =====
+function addToWatchlist(id, title, posterPath, mediaType = 'movie') {
+    fetch('/watchlist/add', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            id: id,
+            title: title,
+            poster_path: posterPath,
+            media_type: mediaType
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showToast(`"${title}" added to watchlist!`, 'success');
+                updateWatchlistUI(data.watchlist, data.next_cursor);
+            } else {
+                showToast(data.message, 'error');
+            }
+        })
+        .catch(error => {
+            showToast('Error adding to watchlist', 'error');
+            console.error('Error:', error);
+        });
+}
+
+function removeFromWatchlist(id, mediaType = 'movie') {
+    fetch('/watchlist/remove', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ id: id, media_type: mediaType })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showToast('Movie removed from watchlist', 'success');
+                updateWatchlistUI(data.watchlist, data.next_cursor);
+            } else {
+                showToast(data.message, 'error');
+            }
+        })
+        .catch(error => {
+            showToast('Error removing from watchlist', 'error');
+            console.error('Error:', error);
+        });
+}
+
+// Rating, year and runtime are only there when the server had the details in time
+function watchlistMetaHTML(movie) {
+    if (movie.vote_average === undefined) return '';
+    return `
+                        <div class="overlay-meta">
+                            <span class="overlay-rating">★ ${movie.vote_average.toFixed(1)}</span>
+                            <span class="overlay-year">${escapeHTML(movie.year)}</span>
+                            ${movie.runtime ? `<span class="overlay-year">${movie.runtime} min</span>` : ''}
+                        </div>`;
+}
+
+function watchlistCardHTML(movie) {
+    const title = escapeHTML(movie.title);
+    return `
+        <div class="movie-card watchlist-card" data-id="${movie.id}" onclick="openMovieModal(${movie.id}, '${movie.media_type}')">
+            <div class="movie-poster">
+                ${movie.poster_path
+            ? `<img src="${imageUrl(movie.poster_path, 342)}" alt="${title}" loading="lazy">`
+            : '<div class="no-poster">No Image</div>'
+        }
+                <div class="movie-overlay">
+                    <div class="overlay-content">
+                        <h4 class="overlay-title">${title}</h4>${watchlistMetaHTML(movie)}
+                        <div class="overlay-buttons">
+                            <button class="overlay-btn play-btn" onclick="event.stopPropagation();">▶</button>
+                            <button class="overlay-btn remove-btn" onclick="event.stopPropagation(); removeFromWatchlist(${movie.id}, '${movie.media_type}')">✕</button>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+// Add and remove send back the first page and its cursor, so the row starts over from page
+// one with a working "Load more" button, just like the page as rendered
+function updateWatchlistUI(watchlist, nextCursor) {
+    const container = document.getElementById('watchlist-container');
+
+    if (watchlist.length === 0) {
+        container.innerHTML = `
+            <div class="empty-watchlist">
+                <p>Your watchlist is empty</p>
+                <span>Click the + button on any movie to add it here</span>
+            </div>
+        `;
+    } else {
+        let html = '<div class="movie-carousel" id="watchlist-carousel">';
+        watchlist.forEach(movie => {
+            html += watchlistCardHTML(movie);
+        });
+        html += '</div>';
+        if (nextCursor) {
+            html += `<button class="btn btn-info watchlist-more" id="watchlist-more"
+                        data-cursor="${escapeHTML(nextCursor)}" onclick="loadMoreWatchlist()">Load more</button>`;
+        }
+        container.innerHTML = html;
+    }
+}
+
+// ===== WATCHLIST PAGINATION =====
+// The page renders the first page only; each click fetches the next page by cursor
+function loadMoreWatchlist() {
+    const button = document.getElementById('watchlist-more');
+    if (!button || !button.dataset.cursor) return;
+    button.disabled = true;
+
+    fetch(`/watchlist?cursor=${encodeURIComponent(button.dataset.cursor)}`)
+        .then(response => response.json())
+        .then(data => {
+            const carousel = document.getElementById('watchlist-carousel');
+            data.watchlist.forEach(movie => {
+                carousel.insertAdjacentHTML('beforeend', watchlistCardHTML(movie));
+            });
+            if (data.next_cursor) {
+                button.dataset.cursor = data.next_cursor;
+                button.disabled = false;
+            } else {
+                button.remove();
+            }
+        })
+        .catch(error => {
+            button.disabled = false;
+            showToast('Error loading watchlist', 'error');
+            console.error('Error:', error);
+        });
+}
+
+
+// ===== INFINITE SCROLL =====
+// Trending and Top Rated fetch their next page from /api/<list>?page=N as the carousel nears
+// its end; the server prefetches pages ahead, so these usually come straight from its cache
+function escapeHTML(text) {
+    return String(text).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+}
+
+function catalogCardHTML(movie) {
+    const title = escapeHTML(movie.title);
+    const rating = movie.vote_average.toFixed(1);
+    return `
+        <div class="movie-card" data-id="${movie.id}" onclick="openMovieModal(${movie.id}, '${movie.media_type}')">
+            <div class="movie-poster">
+                ${movie.poster_path
+            ? `<img src="${imageUrl(movie.poster_path, 342)}" alt="${title}" loading="lazy">`
+            : '<div class="no-poster">No Image</div>'
+        }
+                <div class="movie-overlay">
+                    <button class="overlay-add-btn" data-title="${title}" data-poster="${escapeHTML(movie.poster_path || '')}"
+                        onclick="event.stopPropagation(); addToWatchlist(${movie.id}, this.dataset.title, this.dataset.poster, '${movie.media_type}')"
+                        title="Add to Watchlist">+</button>
+                    <div class="overlay-rating-badge">
+                        <span class="rating-star">★</span>
+                        <span class="rating-value">${rating}/10</span>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+}
+
+document.querySelectorAll('.movie-carousel[data-list]').forEach(carousel => {
+    const sentinel = document.createElement('div');
+    sentinel.className = 'carousel-sentinel';
+    carousel.appendChild(sentinel);
+    let loading = false;
+
+    const observer = new IntersectionObserver(entries => {
+        if (!entries[0].isIntersecting || loading || !carousel.dataset.nextPage) return;
+        loading = true;
+        fetch(`${carousel.dataset.list}?page=${carousel.dataset.nextPage}`)
+            .then(response => response.ok ? response.json() : Promise.reject(new Error(`HTTP ${response.status}`)))
+            .then(data => {
+                sentinel.insertAdjacentHTML('beforebegin', data.results.map(catalogCardHTML).join(''));
+                carousel.dataset.nextPage = data.next_page || '';
+                if (!data.next_page) observer.disconnect();
+            })
+            .catch(error => console.error('Error:', error))  // Scrolling back to the end retries
+            .finally(() => { loading = false; });
+    }, { root: carousel, rootMargin: '0px 800px 0px 0px' });  // Start loading ~4 cards early
+    observer.observe(sentinel);
+});
+
+
+// ===== MOVIE MODAL =====
+const movieModal = document.getElementById('movieModal');
+const modalClose = document.getElementById('modalClose');
+let currentMovieData = null;
+
+function openMovieModal(movieId, mediaType) {
+    // Navigate to the correct page based on type
+    if (mediaType === 'tv') {
+        window.location.href = `/tv/${movieId}`;
+    } else {
+        window.location.href = `/movie/${movieId}`;
+    }
+}
+
+function displayMovieModal(movie) {
+    currentMovieData = movie;
+
+    // Set backdrop
+    const backdrop = document.getElementById('modalBackdrop');
+    if (movie.backdrop_path) {
+        backdrop.style.backgroundImage = `url('${imageUrl(movie.backdrop_path, 780)}')`;
+    } else if (movie.poster_path) {
+        backdrop.style.backgroundImage = `url('${imageUrl(movie.poster_path, 780)}')`;
+    }
+
+    // Set basic info
+    document.getElementById('modalTitle').textContent = movie.title;
+    document.getElementById('modalTagline').textContent = movie.tagline || '';
+    document.getElementById('modalRating').innerHTML = `⭐ ${movie.vote_average ? movie.vote_average.toFixed(1) : 'N/A'}`;
+    document.getElementById('modalYear').textContent = movie.release_date ? movie.release_date.substring(0, 4) : 'N/A';
+    document.getElementById('modalRuntime').textContent = movie.runtime ? `${Math.floor(movie.runtime / 60)}h ${movie.runtime % 60}m` : '';
+    document.getElementById('modalOverview').textContent = movie.overview || 'No overview available.';
+
+    // Set genres
+    const genresEl = document.getElementById('modalGenres');
+    genresEl.innerHTML = movie.genres ? movie.genres.map(g => `<span class="genre-tag">${g}</span>`).join('') : '';
+
+    // Set cast
+    const castEl = document.getElementById('modalCast');
+    if (movie.cast && movie.cast.length > 0) {
+        castEl.innerHTML = movie.cast.map(c => `
+            <div class="cast-item">
+                <div class="cast-photo">
+                    ${c.profile_path
+                ? `<img src="${imageUrl(c.profile_path, 185)}" alt="${c.name}">`
+                : '<div class="no-photo">👤</div>'
+            }
+                </div>
+                <p class="cast-name">${c.name}</p>
+                <p class="cast-character">${c.character}</p>
+            </div>
+        `).join('');
+    } else {
+        castEl.innerHTML = '<p class="no-data">No cast information available</p>';
+    }
+
+    // Set crew
+    const crewEl = document.getElementById('modalCrew');
+    let crewHtml = '';
+    if (movie.directors && movie.directors.length > 0) {
+        crewHtml += `<p><strong>Director:</strong> ${movie.directors.map(d => d.name).join(', ')}</p>`;
+    }
+    if (movie.writers && movie.writers.length > 0) {
+        crewHtml += `<p><strong>Writers:</strong> ${movie.writers.map(w => w.name).join(', ')}</p>`;
+    }
+    crewEl.innerHTML = crewHtml || '<p class="no-data">No crew information available</p>';
+
+    // Update add button
+    const addBtn = document.getElementById('modalAddBtn');
+    addBtn.onclick = () => addToWatchlist(movie.id, movie.title, movie.poster_path, movie.media_type || 'movie');
+
+    // Show modal
+    movieModal.classList.add('active');
+    document.body.style.overflow = 'hidden';
+}
+
+modalClose.addEventListener('click', closeModal);
+movieModal.addEventListener('click', function (e) {
+    if (e.target === movieModal) {
+        closeModal();
+    }
+});
+
+function closeModal() {
+    movieModal.classList.remove('active');
+    document.body.style.overflow = '';
+}
+
+// Close modal on Escape key
+document.addEventListener('keydown', function (e) {
+    if (e.key === 'Escape' && movieModal.classList.contains('active')) {
+        closeModal();
+    }
+});
+
+// ===== NAVBAR SCROLL EFFECT =====
+window.addEventListener('scroll', () => {
+    const navbar = document.querySelector('.navbar');
+    if (window.scrollY > 50) {
+        navbar.classList.add('scrolled');
+    } else {
+        navbar.classList.remove('scrolled');
+    }
+});
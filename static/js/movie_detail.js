@@ -0,0 +1,92 @@
+// Page script for templates/movie_detail.html (MOVIE_DATA and TRAILER_KEY are set inline by the template)
+
+let player;
+let isMuted = false;
+
+// YouTube IFrame API ready callback
+function onYouTubeIframeAPIReady() {
+    if (TRAILER_KEY) {
+        player = new YT.Player('trailerPlayer', {
+            videoId: TRAILER_KEY,
+            playerVars: {
+                autoplay: 1,
+                controls: 0,
+                showinfo: 0,
+                modestbranding: 1,
+                loop: 1,
+                fs: 0,
+                cc_load_policy: 0,
+                iv_load_policy: 3,
+                autohide: 1,
+                mute: 0, // Start with sound ON
+                playlist: TRAILER_KEY // Required for loop
+            },
+            events: {
+                'onReady': onPlayerReady
+            }
+        });
+    }
+}
+
+function onPlayerReady(event) {
+    event.target.playVideo();
+    event.target.unMute(); // Ensure sound is on
+    event.target.setVolume(100);
+}
+
+function toggleMute() {
+    if (!player) return;
+
+    const muteIcon = document.getElementById('muteIcon');
+
+    if (isMuted) {
+        // Unmute
+        player.unMute();
+        isMuted = false;
+        // Show unmuted icon
+        muteIcon.innerHTML = '<path d="M3 9v6h4l5 5V4L7 9H3zm13.5 3c0-1.77-1.02-3.29-2.5-4.03v8.05c1.48-.73 2.5-2.25 2.5-4.02zM14 3.23v2.06c2.89.86 5 3.54 5 6.71s-2.11 5.85-5 6.71v2.06c4.01-.91 7-4.49 7-8.77s-2.99-7.86-7-8.77z"/>';
+    } else {
+        // Mute
+        player.mute();
+        isMuted = true;
+        // Show muted icon
+        muteIcon.innerHTML = '<path d="M16.5 12c0-1.77-1.02-3.29-2.5-4.03v2.21l2.45 2.45c.03-.2.05-.41.05-.63zm2.5 0c0 .94-.2 1.82-.54 2.64l1.51 1.51C20.63 14.91 21 13.5 21 12c0-4.28-2.99-7.86-7-8.77v2.06c2.89.86 5 3.54 5 6.71zM4.27 3L3 4.27 7.73 9H3v6h4l5 5v-6.73l4.25 4.25c-.67.52-1.42.93-2.25 1.18v2.06c1.38-.31 2.63-.95 3.69-1.81L19.73 21 21 19.73l-9-9L4.27 3zM12 4L9.91 6.09 12 8.18V4z"/>';
+    }
+}
+
+function addToWatchlistFromDetail() {
+    fetch('/watchlist/add', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            id: MOVIE_DATA.id,
+            title: MOVIE_DATA.title,
+            poster_path: MOVIE_DATA.poster_path,
+            media_type: MOVIE_DATA.media_type
+        })
+    })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showToast(`"${MOVIE_DATA.title}" added to watchlist!`, 'success');
+            } else {
+                showToast(data.message, 'error');
+            }
+        })
+        .catch(error => {
+            showToast('Error adding to watchlist', 'error');
+            console.error('Error:', error);
+        });
+}
+
+function showToast(message, type = 'success') {
+    const toast = document.getElementById('toast');
+    toast.textContent = message;
+    toast.className = `toast ${type} show`;
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+    }, 3000);
+}
@@ -0,0 +1,107 @@
+// Page script for templates/search.html (IMAGE_ROOT is set inline by the template)
+
+// Sized image through the /img proxy (IMAGE_ROOT); widths match images.SLOTS
+function imageUrl(path, width) {
+    return `${IMAGE_ROOT}/w${width}${path}`;
+}
+
+const searchInput = document.getElementById('searchInput');
+const searchResults = document.getElementById('searchResults');
+let searchTimeout = null;
+let latestRequestId = 0; // Track the most recent search request
+
+// Store the original trending HTML so we can restore it
+const originalTrendingHTML = searchResults.innerHTML;
+
+// Search as you type with improved debouncing
+searchInput.addEventListener('input', function () {
+    const query = this.value.trim();
+
+    if (searchTimeout) {
+        clearTimeout(searchTimeout);
+    }
+
+    if (!query) {
+        // Restore original trending section without reloading page
+        searchResults.innerHTML = originalTrendingHTML;
+        return;
+    }
+
+    // Very fast debounce (50ms) - instant results while typing
+    searchTimeout = setTimeout(() => {
+        performSearch(query);
+    }, 50);
+});
+
+function performSearch(query) {
+    // Increment request ID to track this specific search
+    const requestId = ++latestRequestId;
+
+    fetch(`/api/search?q=${encodeURIComponent(query)}`)
+        .then(response => response.json())
+        .then(data => {
+            // Only display results if this is still the latest search
+            if (requestId === latestRequestId) {
+                displaySearchResults(data.results, query);
+            }
+            // Otherwise ignore old results (race condition prevented!)
+        })
+        .catch(error => {
+            console.error('Error:', error);
+        });
+}
+
+function displaySearchResults(results, query) {
+    if (results.length === 0) {
+        searchResults.innerHTML = `
+            <div class="no-results">
+                <p>No results found for "${query}"</p>
+                <span>Try a different search term</span>
+            </div>
+        `;
+    } else {
+        let html = `
+            <div class="search-section">
+                <div class="search-section-header">
+                    <h2 class="search-section-title">🔍 Search Results for "${query}"</h2>
+                    <span class="search-section-count">${results.length} result${results.length !== 1 ? 's' : ''} found</span>
+                </div>
+                <div class="search-results-grid">
+        `;
+
+        results.forEach(item => {
+            const posterUrl = item.poster_path ? imageUrl(item.poster_path, 185) : '';
+            // Results are compacted server-side (projection.py): TV series also have
+            // title/release_date, and media_type is always set
+            const title = item.title;
+            const releaseDate = item.release_date;
+            const mediaType = item.media_type;
+
+            html += `
+                <div class="search-result-card" onclick="openMovieModal(${item.id}, '${mediaType}')">
+                    <div class="search-result-card-poster">
+                        ${posterUrl
+                    ? `<img src="${posterUrl}" alt="${title}" loading="lazy">`
+                    : '<div class="no-poster">No Image</div>'
+                }
+                    </div>
+                    <h4 class="search-result-card-title">${title}</h4>
+                    <div class="search-result-card-meta">
+                        <span>⭐ ${item.vote_average ? item.vote_average.toFixed(1) : 'N/A'}</span>
+                        <span>${releaseDate ? releaseDate.substring(0, 4) : 'N/A'}</span>
+                        <span class="media-type-badge">${mediaType === 'tv' ? 'TV' : 'Movie'}</span>
+                    </div>
+                </div>
+            `;
+        });
+
+        html += '</div></div>';
+        searchResults.innerHTML = html;
+    }
+}
+
+function openMovieModal(id, mediaType) {
+    // Navigate to the full detail page
+    const url = mediaType === 'tv' ? `/tv/${id}` : `/movie/${id}`;
+    window.location.href = url;
+}
@@ -0,0 +1,210 @@
+"""
+Background task queue for DevOps Flix
+Runs non-critical work (password upgrades, analytics writes) off the request thread:
+- Bounded queue and a fixed number of worker threads
+- Retries with exponential backoff for tasks that raise
+- Graceful drain on shutdown so queued work isn't lost during rollouts
+
+fan_out() is the other half: a small thread pool for a request's independent lookups
+(TMDB lists, watchlist query) that the request waits on, so they overlap instead of
+running one after another. FanOutPool gives bursty callers a pool of their own.
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TASK_WORKERS = int(os.environ.get("TASK_WORKERS", 2))
+TASK_QUEUE_SIZE = int(os.environ.get("TASK_QUEUE_SIZE", 1000))  # Tasks beyond this are dropped, not queued
+TASK_MAX_RETRIES = int(os.environ.get("TASK_MAX_RETRIES", 3))
+TASK_RETRY_DELAY = float(os.environ.get("TASK_RETRY_DELAY", 0.5))  # Seconds, doubled on every retry
+FANOUT_WORKERS = int(os.environ.get("FANOUT_WORKERS", 16))  # Concurrent lookups per process, across requests
+
+
+class TaskQueue:
+    """In-process queue drained by daemon worker threads (started lazily, once per process)."""
+
+    def __init__(self, name, workers=TASK_WORKERS, maxsize=TASK_QUEUE_SIZE,
+                 max_retries=TASK_MAX_RETRIES, retry_delay=TASK_RETRY_DELAY):
+        self.name = name
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pid = None
+        self._accepting = True
+        self._unfinished = 0  # Queued + running + waiting to retry
+        self._running = 0
+        self._counts = {"completed": 0, "failed": 0, "retried": 0, "dropped": 0}
+        self._latencies = deque(maxlen=500)  # (queue wait, run time) in seconds
+
+    def _ensure_workers(self):
+        # Threads don't survive fork, so a forked gunicorn worker starts its own
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True).start()
+
+    def submit(self, func, *args, name=None, **kwargs):
+        """
+        Queue func(*args, **kwargs) to run in the background.
+        Returns:
+            bool: False if the task was dropped (queue full or shutting down)
+        """
+        name = name or func.__name__
+        with self._lock:
+            if not self._accepting:
+                self._counts["dropped"] += 1
+                logger.warning("TASK DROPPED: %s submitted after shutdown", name)
+                return False
+            self._ensure_workers()
+            self._unfinished += 1
+        return self._enqueue((name, func, args, kwargs, 0, time.monotonic()))
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            logger.warning("TASK DROPPED: %s (queue full, %s pending)", item[0], self._queue.maxsize)
+            with self._lock:
+                self._counts["dropped"] += 1
+                self._task_finished()
+            return False
+
+    def _task_finished(self):
+        # Caller holds self._lock
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._idle.notify_all()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, func, args, kwargs, attempt, queued_at = item
+            started = time.monotonic()
+            with self._lock:
+                self._running += 1
+            try:
+                func(*args, **kwargs)
+                outcome = "completed"
+            except Exception as e:
+                if attempt < self.max_retries:
+                    outcome = "retried"
+                    delay = self.retry_delay * (2 ** attempt)
+                    logger.warning("TASK RETRY: %s failed (%s), attempt %d in %.1fs", name, e, attempt + 1, delay)
+                    retry = (name, func, args, kwargs, attempt + 1, time.monotonic() + delay)
+                    timer = threading.Timer(delay, self._enqueue, (retry,))
+                    timer.daemon = True
+                    timer.start()
+                else:
+                    outcome = "failed"
+                    logger.error("TASK FAILED: %s gave up after %d attempts: %s", name, attempt + 1, e)
+            finished = time.monotonic()
+            with self._lock:
+                self._running -= 1
+                self._counts[outcome] += 1
+                self._latencies.append((started - queued_at, finished - started))
+                if outcome != "retried":
+                    self._task_finished()
+
+    def wait_idle(self, timeout=None):
+        """Block until every submitted task (including retries) has finished. Returns False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._unfinished == 0, timeout)
+
+    def shutdown(self, timeout=30):
+        """Stop accepting tasks and drain what is queued (up to timeout seconds)."""
+        with self._lock:
+            self._accepting = False
+            started = self._pid == os.getpid()
+        if not started:
+            return True
+        drained = self.wait_idle(timeout)
+        if not drained:
+            logger.warning("TASK QUEUE %s: %s tasks still pending at shutdown", self.name, self._unfinished)
+        for _ in range(self.workers):
+            self._queue.put(None)
+        return drained
+
+    def stats(self):
+        """Queue depth, counters and task latency (milliseconds) for monitoring."""
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = dict(
+                self._counts,
+                depth=self._queue.qsize(),
+                maxsize=self._queue.maxsize,
+                running=self._running,
+                pending=self._unfinished,
+            )
+        waits = sorted(w for w, _ in latencies)
+        runs = sorted(r for _, r in latencies)
+        for label, values in (("wait", waits), ("run", runs)):
+            stats[f"{label}_ms_avg"] = round(1000 * sum(values) / len(values), 2) if values else 0.0
+            stats[f"{label}_ms_p95"] = round(1000 * values[int(len(values) * 0.95) - 1], 2) if values else 0.0
+        return stats
+
+
+# Shared queue for the app; drained when the process exits
+background = TaskQueue("background")
+atexit.register(background.shutdown)
+
+
+def submit(func, *args, name=None, **kwargs):
+    """Queue func on the shared background queue. Returns False if it was dropped."""
+    return background.submit(func, *args, name=name, **kwargs)
+
+
+# ============================================================
+# FAN-OUT - a request's independent lookups, run side by side
+# ============================================================
+class FanOutPool:
+    """Thread pool for lookups a request waits on, started lazily once per process."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Start func(*args, **kwargs) on the pool and return its Future.
+        It runs in a copy of the caller's context, so trace spans and the read-your-writes
+        deadline carry over.
+        """
+        with self._lock:
+            # Threads don't survive fork, so a forked gunicorn worker starts its own pool
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix=self.name)
+                self._pid = os.getpid()
+            executor = self._executor
+        return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+# Shared pool for the homepage lookups and /api/batch. Work that may queue up a lot of
+# lookups (watchlist enrichment) gets a pool of its own so it can't hold these back
+fanout = FanOutPool("fanout", FANOUT_WORKERS)
+
+
+def fan_out(func, *args, **kwargs):
+    """
+    Start func(*args, **kwargs) on the shared fan-out pool and return its Future.
+    Don't wait on a fan-out Future from inside a fan-out task: a full pool would deadlock.
+    """
+    return fanout.submit(func, *args, **kwargs)
@@ -108,7 +108,7 @@ class TestDevOpsFlixComprehensiveFeatureTests:
         # Mock database functions
         with patch("app.is_in_watchlist", return_value=False), \
              patch("app.db_add_to_watchlist", return_value=True), \
-             patch("app.get_user_watchlist", return_value=[movie_data]):
+             patch("app.get_user_watchlist_page", return_value=([movie_data], None)):
 
             response = client.post(
                 "/watchlist/add",
@@ -132,7 +132,7 @@ class TestDevOpsFlixComprehensiveFeatureTests:
 
         # Mock database functions
         with patch("app.db_remove_from_watchlist", return_value=True), \
-             patch("app.get_user_watchlist", return_value=[]):
+             patch("app.get_user_watchlist_page", return_value=([], None)):
 
             remove_response = client.post(
                 "/watchlist/remove",
@@ -306,3 +306,102 @@ class TestDevOpsFlixComprehensiveFeatureTests:
 
             # Assert that the section containing the streaming providers is present
             assert b"Stream Legally on:" in response.data
+
+    def test_signup_existing_username_shows_error(self, client):
+        """Signing up with a taken username re-renders the form with an error"""
+        signup_data = {
+            "email": "someone@example.com",
+            "username": "admin",
+            "password": "newpass123",
+            "confirm_password": "newpass123"
+        }
+        response = client.post("/signup", data=signup_data)
+        assert response.status_code == 200
+        assert b"Username already exists" in response.data
+
+    def test_metrics_endpoint_exposes_route_upstream_and_db_metrics(self, client):
+        """/metrics reports route latency, TMDB fetcher errors and database timings"""
+        import requests as real_requests
+
+        def failing_get(url, params=None, timeout=None):
+            raise real_requests.ConnectionError("TMDB unreachable")
+
+        with patch("app.requests.get", side_effect=failing_get):
+            assert client.get("/api/search?q=metrics").status_code == 200
+
+        client.post("/login", data={"username": "admin", "password": "123"})
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        body = response.data.decode()
+        assert 'devopsflix_request_duration_seconds_count{method="GET",route="/api/search",status="200"}' in body
+        assert 'devopsflix_tmdb_errors_total{error="ConnectionError",fetcher="search_multi"}' in body
+        assert 'devopsflix_db_query_duration_seconds_count{statement="get_user"}' in body
+        assert "devopsflix_requests_in_flight" in body
+        assert "devopsflix_cache_requests_total" in body
+
+    def test_saturation_signal_tracks_busy_slots_and_upstream_wait(self, client):
+        """Saturation is the larger of busy request slots and rolling TMDB wait vs target"""
+        import metrics
+
+        tracker = metrics.SaturationTracker(capacity=4)
+        tracker.request_started()
+        tracker.request_started()
+        assert tracker.snapshot()["busy_ratio"] == 0.5
+        assert tracker.snapshot()["saturation"] == 0.5
+
+        # A slow upstream saturates the pod even with free threads
+        tracker.observe_upstream(metrics.SATURATION_UPSTREAM_TARGET * 2)
+        tracker.observe_upstream(0.0)
+        snapshot = tracker.snapshot()
+        assert snapshot["upstream_wait_seconds"] == metrics.SATURATION_UPSTREAM_TARGET
+        assert snapshot["saturation"] == 1.0
+
+        tracker.request_finished()
+        tracker.request_finished()
+        assert tracker.snapshot()["in_flight"] == 0
+
+        body = client.get("/metrics").data.decode()
+        assert "devopsflix_saturation" in body
+        assert "devopsflix_worker_capacity" in body
+        assert "devopsflix_upstream_wait_seconds" in body
+
+    def test_saturation_decays_without_traffic(self, monkeypatch):
+        """A scrape ages out the upstream window even if no request or TMDB call came since"""
+        import time
+        import types
+        import metrics
+
+        monkeypatch.setattr(metrics, "saturation", metrics.SaturationTracker())
+        metrics.saturation.observe_upstream(metrics.SATURATION_UPSTREAM_TARGET * 3)
+        metrics.render()
+        assert metrics.REGISTRY.get_sample_value("devopsflix_saturation") == 3.0
+
+        later = time.monotonic() + metrics.SATURATION_WINDOW + 1
+        monkeypatch.setattr(metrics, "time", types.SimpleNamespace(monotonic=lambda: later))
+        metrics.render()
+        assert metrics.REGISTRY.get_sample_value("devopsflix_saturation") == 0.0
+        assert metrics.REGISTRY.get_sample_value("devopsflix_upstream_wait_seconds") == 0.0
+
+    def test_only_set_capacity_publishes_worker_capacity(self):
+        """A tracker that isn't a worker's (e.g. a preloaded gunicorn master's) adds no request slots"""
+        import metrics
+
+        before = metrics.REGISTRY.get_sample_value("devopsflix_worker_capacity")
+        tracker = metrics.SaturationTracker(capacity=7)
+        assert metrics.REGISTRY.get_sample_value("devopsflix_worker_capacity") == before
+        tracker.set_capacity(7)
+        assert metrics.REGISTRY.get_sample_value("devopsflix_worker_capacity") == 7
+        metrics.saturation.set_capacity(metrics.saturation.capacity)  # Put the app's value back
+
+    def test_app_imports_with_missing_multiproc_dir(self, tmp_path):
+        """Entry points other than gunicorn (flask init-db, shells) create the metrics directory"""
+        import subprocess
+        multiproc_dir = tmp_path / "not" / "created"
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(multiproc_dir), DB_PATH=str(tmp_path / "db.sqlite"))
+        result = subprocess.run(
+            [sys.executable, "-c", "import app"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, timeout=60
+        )
+        assert result.returncode == 0, result.stderr
+        assert multiproc_dir.is_dir()
@@ -0,0 +1,123 @@
+"""
+DevOps Flix - Asset Pipeline Test Suite
+pytest tests for minification, content-hashed builds and long-cache asset serving
+"""
+
+import gzip
+import json
+import shutil
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import assets
+from app import app
+
+
+@pytest.fixture
+def built(tmp_path, monkeypatch):
+    """The real static/ sources, built into a throwaway static dir the app serves from"""
+    static_dir = tmp_path / "static"
+    shutil.copytree(assets.STATIC_DIR, static_dir, ignore=shutil.ignore_patterns(assets.DIST_NAME))
+    monkeypatch.setattr(assets, "STATIC_DIR", str(static_dir))
+    manifest = assets.build(str(static_dir))
+    yield static_dir, manifest
+    assets._read_manifest.cache_clear()
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestMinifiers:
+    """Comments and whitespace go, strings and line breaks stay"""
+
+    def test_css(self):
+        css = "/* header */\na :hover ,\n.b > .c {\n    color : red ;\n    content: \"  two  spaces \";\n}\n"
+        assert assets.minify_css(css) == 'a :hover,.b>.c{color :red;content:"  two  spaces "}\n'
+
+    def test_js_keeps_strings_and_template_literals(self):
+        js = (
+            "// comment\n"
+            "const url = 'http://example.com/a  b';  /* note */\n"
+            "const html = `<div>\n    ${ items.map(i => `<b>${i}</b>`).join('') }\n</div>`;\n"
+            "\n"
+            "let x = a - -b\n"
+        )
+        assert assets.minify_js(js) == (
+            "const url='http://example.com/a  b';\n"
+            "const html=`<div>\n    ${items.map(i=>`<b>${i}</b>`).join('')}\n</div>`;\n"
+            "let x=a - -b\n"
+        )
+
+    def test_js_regex_after_keyword(self):
+        """A / after return opens a regex, so the quote inside it isn't read as a string"""
+        js = "function quoted(s) {\n    return /\"/.test(s);  // has a quote\n}\n"
+        assert assets.minify_js(js) == 'function quoted(s){\nreturn /"/.test(s);\n}\n'
+
+    def test_js_division_after_increment(self):
+        """A / after a++ divides, so the comment after it is still dropped"""
+        js = "const half = a++ / b;  // per side\nconst ratio = (a) / 2\n"
+        assert assets.minify_js(js) == "const half=a++ / b;\nconst ratio=(a)/ 2\n"
+
+
+class TestBuild:
+    """Hashed files, precompressed variants and the manifest"""
+
+    def test_build_writes_hashed_files_and_manifest(self, built):
+        static_dir, manifest = built
+        assert set(manifest) == set(assets.source_files(str(static_dir)))
+        assert "style.css" in manifest and "js/index.js" in manifest
+
+        hashed = static_dir / manifest["style.css"]
+        content = hashed.read_bytes()
+        assert hashed.name == os.path.basename(assets.hashed_name("style.css", content))
+        assert gzip.decompress((static_dir / (manifest["style.css"] + ".gz")).read_bytes()) == content
+        assert json.loads((static_dir / "dist" / "manifest.json").read_text()) == manifest
+
+    def test_build_is_deterministic(self, built):
+        static_dir, manifest = built
+        gz_path = static_dir / (manifest["js/index.js"] + ".gz")
+        before = gz_path.read_bytes()
+        assert assets.build(str(static_dir)) == manifest
+        assert gz_path.read_bytes() == before
+
+
+class TestServing:
+    """asset_url() and the immutable /static/dist/ route"""
+
+    def test_pages_link_hashed_assets(self, built, client):
+        _, manifest = built
+        html = client.get("/login").get_data(as_text=True)
+        assert f'/static/{manifest["style.css"]}' in html
+
+    def test_unbuilt_assets_fall_back_to_plain_files(self, tmp_path, monkeypatch, client):
+        monkeypatch.setattr(assets, "STATIC_DIR", str(tmp_path))
+        assert "/static/style.css" in client.get("/login").get_data(as_text=True)
+
+    def test_hashed_asset_is_immutable_and_precompressed(self, built, client):
+        _, manifest = built
+        url = f'/static/{manifest["style.css"]}'
+
+        response = client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert response.headers["Content-Type"].startswith("text/css")
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert "Cookie" not in response.headers["Vary"]
+
+        plain = client.get(url, headers={"Accept-Encoding": "gzip;q=0"})
+        assert "Content-Encoding" not in plain.headers
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_compressed_variants_are_not_addressable(self, built, client):
+        _, manifest = built
+        assert client.get(f'/static/{manifest["style.css"]}.gz').status_code == 404
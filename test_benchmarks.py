@@ -0,0 +1,80 @@
+"""
+DevOps Flix - Benchmark Harness Test Suite
+pytest tests that the TMDB stub speaks TMDB's shapes and the load test spots regressions
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import app as app_module
+import loadtest
+from tmdb_stub import start_stub
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """A TMDB stub on a free port, with the app's fetchers pointed at it"""
+    server, base_url = start_stub(latency_ms=0)
+    monkeypatch.setattr(app_module, "TMDB_BASE_URL", base_url)
+    yield server
+    server.shutdown()
+
+
+class TestTMDBStub:
+    """The app's real fetchers work against the stub over HTTP"""
+
+    def test_fetchers_parse_stub_responses(self, stub):
+        """Lists, search, details and providers all come back in TMDB's format"""
+        assert len(app_module.fetch_trending_movies()) == 20
+        assert len(app_module.fetch_top_rated_movies()) == 20
+        assert all(r["media_type"] in ("movie", "tv") for r in app_module.search_multi("star"))
+
+        movie = app_module.fetch_movie_details(1234)
+        assert movie["id"] == 1234
+        assert movie["trailer_key"] and len(movie["cast"]) == 10 and movie["directors"]
+
+        tv = app_module.fetch_tv_details(55)
+        assert tv["media_type"] == "tv" and tv["number_of_seasons"]
+
+        providers = app_module.fetch_watch_providers("movie", 1234, "Stub Movie")
+        assert all("custom_link" in p for p in providers["flatrate"])
+
+    def test_error_rate_and_call_counts(self):
+        """error_rate=1 fails every call, and /__stats counts upstream calls per endpoint"""
+        server, base_url = start_stub(error_rate=1.0)
+        try:
+            original = app_module.TMDB_BASE_URL
+            app_module.TMDB_BASE_URL = base_url
+            assert app_module.fetch_trending_movies() == []
+            assert app_module.fetch_movie_details(1) is None
+        finally:
+            app_module.TMDB_BASE_URL = original
+            server.shutdown()
+        assert server.RequestHandlerClass.config.calls == {"trending": 1, "details": 1}
+
+
+class TestLoadTestReport:
+    """Percentiles and baseline comparison"""
+
+    def test_summary_and_regression_detection(self):
+        """p95 regressions and new errors are flagged; expected 404s from remove are not"""
+        baseline = loadtest.summarize({
+            "/": [(0.1, 200)] * 100,
+            "/watchlist/remove": [(0.01, 404)] * 10,
+        }, duration=10)
+        assert baseline["routes"]["/"]["p95_ms"] == 100.0
+        assert baseline["routes"]["/watchlist/remove"]["errors"] == 0
+        assert loadtest.compare(baseline, baseline, 0.15) == []
+
+        slower = loadtest.summarize({
+            "/": [(0.2, 200)] * 95 + [(0.2, 502)] * 5,
+            "/watchlist/remove": [(0.01, 404)] * 10,
+        }, duration=10)
+        problems = loadtest.compare(slower, baseline, 0.15)
+        assert any(p.startswith("/: p95") for p in problems)
+        assert any(p.startswith("/: error rate") for p in problems)
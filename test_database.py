@@ -0,0 +1,301 @@
+"""
+DevOps Flix - Database Layer Test Suite
+pytest tests for the read cache, its invalidation and other database.py internals
+"""
+
+import pytest
+import sqlite3
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+from database import (
+    init_db, execute_query, get_user, create_user,
+    add_to_watchlist, remove_from_watchlist, get_user_watchlist, cache_stats
+)
+
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    """Initialize database and start every test with an empty cache"""
+    init_db()
+    database._drop_local()
+    yield
+
+
+@pytest.fixture
+def cache_user():
+    """Create a throwaway user and remove it (and its watchlist) afterwards"""
+    execute_query("DELETE FROM users WHERE username = ?", ("cache_user",))
+    user_id = create_user("cache_user", "cache@example.com", "CachePass123")
+    yield user_id
+    execute_query("DELETE FROM watchlist WHERE user_id = ?", (user_id,))
+    execute_query("DELETE FROM users WHERE username = ?", ("cache_user",))
+
+
+class TestReadCache:
+    """Test caching of users and watchlists and cross-connection invalidation"""
+
+    def test_repeated_user_reads_hit_cache(self, cache_user):
+        """Second read of the same user should be served from the cache"""
+        get_user("cache_user")
+        hits_before = cache_stats()["hits"]
+
+        assert get_user("cache_user")["id"] == cache_user
+        assert cache_stats()["hits"] == hits_before + 1
+
+    def test_missing_user_is_not_cached(self):
+        """A lookup miss must not hide a user created afterwards"""
+        execute_query("DELETE FROM users WHERE username = ?", ("cache_late_user",))
+        assert get_user("cache_late_user") is None
+
+        create_user("cache_late_user", "late@example.com", "LatePass123")
+        assert get_user("cache_late_user") is not None
+
+        execute_query("DELETE FROM users WHERE username = ?", ("cache_late_user",))
+
+    def test_watchlist_writes_invalidate_cache(self, cache_user):
+        """Adding and removing movies must be visible on the next read"""
+        assert get_user_watchlist(cache_user) == []
+
+        add_to_watchlist(cache_user, 4242, "Cached Movie", "/cached.jpg")
+        assert [m["id"] for m in get_user_watchlist(cache_user)] == [4242]
+
+        remove_from_watchlist(cache_user, 4242)
+        assert get_user_watchlist(cache_user) == []
+
+    def test_write_from_other_connection_invalidates_cache(self, cache_user):
+        """SQLite mode: a commit by another connection (another worker/pod) drops cached rows"""
+        assert get_user_watchlist(cache_user) == []
+
+        conn = sqlite3.connect(database.DB_PATH)
+        conn.execute(
+            "INSERT INTO watchlist (user_id, movie_id, title, poster_path) VALUES (?, ?, ?, ?)",
+            (cache_user, 5151, "Written Elsewhere", None)
+        )
+        conn.commit()
+        conn.close()
+
+        assert [m["id"] for m in get_user_watchlist(cache_user)] == [5151]
+
+
+class TestMigrations:
+    """Test the versioned schema migration engine"""
+
+    def test_all_migrations_recorded(self):
+        """Every migration version should be recorded exactly once"""
+        rows = execute_query("SELECT version FROM schema_migrations ORDER BY version", fetch='all')
+        assert [row["version"] for row in rows] == [m[0] for m in database.MIGRATIONS]
+
+    def test_run_migrations_is_idempotent(self):
+        """Running migrations on an up-to-date database applies nothing"""
+        assert database.run_migrations() == []
+
+    def test_fresh_database_is_migrated(self, tmp_path, monkeypatch):
+        """A brand new SQLite file gets every migration in order"""
+        monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "fresh.db"))
+        assert database.run_migrations() == [m[0] for m in database.MIGRATIONS]
+        assert database.run_migrations() == []
+
+    def test_watchlist_listing_uses_covering_index(self):
+        """The watchlist listing query should be answered from the index alone"""
+        plan = execute_query(
+            "EXPLAIN QUERY PLAN SELECT movie_id, media_type, title, poster_path FROM watchlist "
+            "WHERE user_id = ? ORDER BY added_at DESC, id DESC",
+            (1,),
+            fetch='all'
+        )
+        details = " ".join(row["detail"] for row in plan)
+        assert "COVERING INDEX idx_watchlist_user_keyset" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestWatchlistPagination:
+    """Test keyset pagination and streaming of watchlists"""
+
+    def test_pages_cover_list_without_overlap(self, cache_user):
+        """Walking next_cursor visits every movie once, newest first"""
+        for movie_id in range(1, 8):
+            add_to_watchlist(cache_user, movie_id, f"Movie {movie_id}", None)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = database.get_user_watchlist_page(cache_user, limit=3, cursor=cursor)
+            assert len(page) <= 3
+            seen.extend(m["id"] for m in page)
+            if cursor is None:
+                break
+
+        assert seen == [7, 6, 5, 4, 3, 2, 1]
+        assert seen == [m["id"] for m in get_user_watchlist(cache_user)]
+
+    def test_exact_page_has_no_next_cursor(self, cache_user):
+        """A list that exactly fills one page must not report another page"""
+        for movie_id in range(1, 4):
+            add_to_watchlist(cache_user, movie_id, f"Movie {movie_id}", None)
+
+        page, cursor = database.get_user_watchlist_page(cache_user, limit=3)
+        assert len(page) == 3
+        assert cursor is None
+
+    def test_media_type_round_trip(self, cache_user):
+        """Items keep their movie/tv type; it defaults to movie"""
+        add_to_watchlist(cache_user, 1399, "Show", None, media_type="tv")
+        add_to_watchlist(cache_user, 550, "Film", None)
+
+        page, _ = database.get_user_watchlist_page(cache_user)
+        assert [(m["id"], m["media_type"]) for m in page] == [(550, "movie"), (1399, "tv")]
+        assert [m["media_type"] for m in get_user_watchlist(cache_user)] == ["movie", "tv"]
+        assert [m["media_type"] for m in database.iter_user_watchlist(cache_user)] == ["movie", "tv"]
+
+    def test_invalid_cursor_rejected(self, cache_user):
+        """Cursors we didn't issue raise ValueError"""
+        with pytest.raises(ValueError):
+            database.get_user_watchlist_page(cache_user, cursor="garbage")
+
+    def test_iter_user_watchlist_streams_all_rows(self, cache_user):
+        """Export iterator yields every row across batch boundaries"""
+        for movie_id in range(1, 6):
+            add_to_watchlist(cache_user, movie_id, f"Movie {movie_id}", None)
+
+        rows = list(database.iter_user_watchlist(cache_user, batch_size=2))
+        assert [row["id"] for row in rows] == [5, 4, 3, 2, 1]
+        assert all(row["added_at"] for row in rows)
+
+
+class TestReplicaRouting:
+    """Test read replica selection, read-your-writes stickiness and failover"""
+
+    @pytest.fixture
+    def replicas(self, monkeypatch):
+        """Pretend we're in PostgreSQL mode with two replicas"""
+        import itertools
+        hosts = ["replica-a", "replica-b"]
+        monkeypatch.setattr(database, "USE_POSTGRES", True)
+        monkeypatch.setattr(database, "DB_REPLICA_HOSTS", hosts)
+        monkeypatch.setattr(database, "_replica_cycle", itertools.cycle(hosts))
+        monkeypatch.setattr(database, "_replica_down_until", {})
+        database.set_read_your_writes_until(0.0)
+        yield hosts
+        database.set_read_your_writes_until(0.0)
+
+    def test_reads_round_robin_over_replicas(self, replicas):
+        """Consecutive reads alternate between replicas"""
+        assert [database._pick_replica() for _ in range(4)] == replicas * 2
+
+    def test_recent_write_sticks_to_primary(self, replicas):
+        """Within the sticky window reads go to the primary"""
+        import time
+        database.set_read_your_writes_until(time.time() + 5)
+        assert database._pick_replica() is None
+
+        database.set_read_your_writes_until(time.time() - 1)
+        assert database._pick_replica() in replicas
+
+    def test_cache_fills_read_from_primary(self, replicas):
+        """primary_reads() overrides replica routing"""
+        with database.primary_reads():
+            assert database._pick_replica() is None
+        assert database._pick_replica() in replicas
+
+    def test_failed_replica_is_skipped(self, replicas):
+        """A replica marked down is skipped until its retry time"""
+        database._mark_replica_down("replica-a", "connection refused")
+        assert {database._pick_replica() for _ in range(4)} == {"replica-b"}
+
+        database._mark_replica_down("replica-b", "connection refused")
+        assert database._pick_replica() is None
+
+    def test_sqlite_write_starts_sticky_window(self, cache_user):
+        """Every committed write opens the read-your-writes window for this context"""
+        import time
+        database.set_read_your_writes_until(0.0)
+        add_to_watchlist(cache_user, 777, "Sticky Movie", None)
+        assert database.read_your_writes_until() > time.time()
+
+
+class TestSingleStatementInserts:
+    """Test insert-on-conflict user creation and watchlist adds"""
+
+    def test_duplicate_username_returns_none(self, cache_user):
+        """Creating an existing username reports the conflict as None, not an exception"""
+        assert create_user("cache_user", "other@example.com", "OtherPass123") is None
+
+    def test_username_conflict_is_case_insensitive(self, cache_user):
+        """A username differing only in case is treated as taken"""
+        assert create_user("Cache_User", "other@example.com", "OtherPass123") is None
+        assert get_user("Cache_User") is None
+
+    def test_database_rejects_usernames_differing_only_in_case(self, cache_user):
+        """The unique LOWER(username) index holds even for inserts that skip create_user"""
+        with pytest.raises(Exception, match="(?i)unique"):
+            execute_query(
+                "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+                ("CACHE_USER", "other@example.com", "x")
+            )
+
+    def test_signup_costs_one_statement(self, monkeypatch):
+        """create_user issues exactly one SQL statement"""
+        execute_query("DELETE FROM users WHERE username = ?", ("one_trip_user",))
+        calls = []
+        real_route_query = database._route_query
+
+        def counting_route_query(query, *args, **kwargs):
+            calls.append(query)
+            return real_route_query(query, *args, **kwargs)
+
+        monkeypatch.setattr(database, "_route_query", counting_route_query)
+        assert create_user("one_trip_user", "trip@example.com", "TripPass123")
+        monkeypatch.undo()
+
+        assert len(calls) == 1 and calls[0].startswith("INSERT")
+        execute_query("DELETE FROM users WHERE username = ?", ("one_trip_user",))
+
+    def test_duplicate_watchlist_add_returns_false(self, cache_user):
+        """Adding the same movie twice reports False the second time"""
+        assert add_to_watchlist(cache_user, 31337, "Only Once", None) is True
+        assert add_to_watchlist(cache_user, 31337, "Only Once", None) is False
+        assert [m["id"] for m in get_user_watchlist(cache_user)] == [31337]
+
+    def test_movie_and_series_with_the_same_id_are_separate_items(self, cache_user):
+        """Movie and TV ids overlap, so the media type is part of a watchlist item's identity"""
+        assert add_to_watchlist(cache_user, 1399, "Film", None) is True
+        assert add_to_watchlist(cache_user, 1399, "Show", None, media_type="tv") is True
+        assert database.is_in_watchlist(cache_user, 1399, "tv")
+
+        assert remove_from_watchlist(cache_user, 1399, "tv") is True
+        assert not database.is_in_watchlist(cache_user, 1399, "tv")
+        assert [(m["id"], m["media_type"]) for m in get_user_watchlist(cache_user)] == [(1399, "movie")]
+
+
+class TestStatementRegistry:
+    """Test named statements, their dialect translation and per-statement stats"""
+
+    def test_postgres_forms_are_translated_once(self):
+        """PREPARE uses $n placeholders and EXECUTE passes one %s per parameter"""
+        statement = database.STATEMENTS["is_in_watchlist"]
+        assert statement.param_count == 3
+        assert statement.prepare_sql == (
+            "PREPARE is_in_watchlist AS SELECT id FROM watchlist WHERE user_id = $1 AND movie_id = $2 "
+            "AND media_type = $3"
+        )
+        assert statement.execute_sql == "EXECUTE is_in_watchlist (%s, %s, %s)"
+
+    def test_statement_without_params(self):
+        """Statements without placeholders EXECUTE without a parameter list"""
+        statement = database.Statement("count_users", "SELECT COUNT(*) FROM users")
+        assert statement.param_count == 0
+        assert statement.execute_sql == "EXECUTE count_users"
+
+    def test_calls_and_timings_are_recorded(self, cache_user):
+        """Each run_statement call updates that statement's stats"""
+        before = database.statement_stats()["is_in_watchlist"]["calls"]
+        database.is_in_watchlist(cache_user, 1)
+        database.is_in_watchlist(cache_user, 2)
+
+        stats = database.statement_stats()["is_in_watchlist"]
+        assert stats["calls"] == before + 2
+        assert stats["max_ms"] > 0 and stats["avg_ms"] > 0
@@ -0,0 +1,189 @@
+"""
+DevOps Flix - Watchlist Enrichment Test Suite
+pytest tests for rating, year and runtime on watchlist cards, looked up concurrently within a budget
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+import tasks
+import tmdbcache
+from app import app
+
+
+@pytest.fixture
+def client():
+    """A logged-in test client"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess["user_id"] = 1
+            sess["user"] = "testuser"
+        yield client
+
+
+def watchlist(count, media_type="movie"):
+    return [{"id": i, "media_type": media_type, "title": f"Title {i}", "poster_path": None} for i in range(1, count + 1)]
+
+
+def tmdb_details(gate=None, barrier=None):
+    """
+    Mock TMDB: /movie/<id> and /tv/<id> details, empty lists for everything else.
+    Detail lookups wait for `gate` to be set, or for `barrier` to fill up, first.
+    """
+    def fake_get(url, params=None, timeout=None):
+        media_type, media_id = url.rsplit("/", 2)[-2:]
+        if media_type not in ("movie", "tv") or not media_id.isdigit():
+            return MagicMock(status_code=200, json=MagicMock(return_value={"results": []}))
+        if gate is not None:
+            gate.wait(5)
+        if barrier is not None:
+            barrier.wait()
+        data = {"id": int(media_id), "vote_average": 7.26}
+        if media_type == "movie":
+            data.update(title=f"Title {media_id}", release_date="2010-07-16", runtime=148)
+        else:
+            data.update(name=f"Title {media_id}", first_air_date="2011-04-17", episode_run_time=[57])
+        return MagicMock(status_code=200, json=MagicMock(return_value=data))
+    return patch("app.requests.get", side_effect=fake_get)
+
+
+def details_requested(mock_get):
+    return [call.args[0].rsplit("/", 2)[-2] for call in mock_get.call_args_list]
+
+
+def wait_until_cached(movies, timeout=5):
+    """Wait for the lookups left running after a response to land in the TMDB cache"""
+    deadline = time.monotonic() + timeout
+    keys = [app_module.detail_cache_key(m["media_type"], m["id"]) for m in movies]
+    while not all(tmdbcache.peek("tmdb_details", key) for key in keys):
+        assert time.monotonic() < deadline, "lookups never finished"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def enrich_pool(monkeypatch):
+    """A fresh enrichment pool per test, so no test waits behind another's lookups"""
+    pool = tasks.FanOutPool("enrich-test", 8)
+    monkeypatch.setattr(app_module, "enrich_pool", pool)
+    return pool
+
+
+class TestEnrichWatchlist:
+    """Cards get rating, year and runtime from the cached details"""
+
+    def test_page_is_enriched_by_media_type(self, client):
+        movies = watchlist(2) + [{"id": 3, "media_type": "tv", "title": "Show", "poster_path": None}]
+        with tmdb_details() as mock_get, \
+             patch("app.get_user_watchlist_page", return_value=(movies, None)):
+            data = client.get("/watchlist").get_json()
+
+        assert data["watchlist"][0] == {
+            "id": 1, "media_type": "movie", "title": "Title 1", "poster_path": None,
+            "vote_average": 7.3, "year": "2010", "runtime": 148,
+        }
+        assert data["watchlist"][2]["year"] == "2011" and data["watchlist"][2]["runtime"] == 57
+        assert details_requested(mock_get).count("tv") == 1
+        assert "vote_average" not in movies[0]  # The cached watchlist itself is left alone
+
+    def test_lookups_run_side_by_side(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "WATCHLIST_ENRICH_BUDGET_MS", 5000)
+        # Each lookup only returns once all 8 are running at the same time
+        barrier = threading.Barrier(8, timeout=5)
+        with tmdb_details(barrier=barrier), \
+             patch("app.get_user_watchlist_page", return_value=(watchlist(8), None)):
+            data = client.get("/watchlist").get_json()
+
+        assert all(movie["vote_average"] == 7.3 for movie in data["watchlist"])
+
+    def test_budget_caps_the_wait_and_warms_the_cache(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "WATCHLIST_ENRICH_BUDGET_MS", 50)
+        gate = threading.Event()
+        movies = watchlist(3)
+        with tmdb_details(gate=gate) as mock_get, \
+             patch("app.get_user_watchlist_page", return_value=(movies, None)):
+            first = client.get("/watchlist").get_json()["watchlist"]
+            assert not any("vote_average" in movie for movie in first)
+
+            gate.set()  # The lookups carry on after the response
+            wait_until_cached(movies)
+            second = client.get("/watchlist").get_json()["watchlist"]
+
+        assert all(movie["year"] == "2010" for movie in second)
+        assert mock_get.call_count == 3
+
+    def test_queued_lookups_are_cancelled(self, client, monkeypatch, enrich_pool):
+        monkeypatch.setattr(app_module, "WATCHLIST_ENRICH_BUDGET_MS", 50)
+        gate = threading.Event()
+        movies = watchlist(50)
+        with tmdb_details(gate=gate) as mock_get, \
+             patch("app.get_user_watchlist_page", return_value=(movies, None)):
+            client.get("/watchlist")
+            # The shared fan-out pool is free while the enrichment pool is busy
+            assert tasks.fan_out(lambda: "free").result(timeout=2) == "free"
+
+            gate.set()
+            wait_until_cached(movies[:enrich_pool.workers])
+            assert enrich_pool.submit(lambda: None).result(timeout=2) is None  # Drained
+
+        # Only the lookups that had started ran; the other 42 were cancelled
+        assert mock_get.call_count == enrich_pool.workers
+
+    def test_add_and_remove_return_the_first_page(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "WATCHLIST_PAGE_SIZE", 2)
+        with tmdb_details() as mock_get, \
+             patch("app.is_in_watchlist", return_value=False), \
+             patch("app.db_add_to_watchlist", return_value=True), \
+             patch("app.db_remove_from_watchlist", return_value=True), \
+             patch("app.get_user_watchlist_page", return_value=(watchlist(2), "next")) as mock_page:
+            added = client.post("/watchlist/add", json={"id": 5, "title": "Title 5"}).get_json()
+            removed = client.post("/watchlist/remove", json={"id": 5}).get_json()
+
+        for data in (added, removed):
+            assert [movie["vote_average"] for movie in data["watchlist"]] == [7.3, 7.3]
+            assert data["next_cursor"] == "next"  # So "Load more" carries on from page one
+        assert [call.args for call in mock_page.call_args_list] == [(1, 2), (1, 2)]
+        assert mock_get.call_count == 2  # The second response came from the cache
+
+    def test_homepage_row_shows_ratings(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_HOMEPAGE", False)
+        with tmdb_details(), patch("app.get_user_watchlist_page", return_value=(watchlist(1), None)):
+            html = client.get("/").get_data(as_text=True)
+        assert "★ 7.3" in html and "148 min" in html
+
+
+class TestWatchlistMediaType:
+    """/watchlist/add and /watchlist/remove know whether an item is a movie or a TV series"""
+
+    def test_media_type_is_stored(self, client):
+        with patch("app.is_in_watchlist", return_value=False), \
+             patch("app.db_add_to_watchlist", return_value=True) as mock_add, \
+             patch("app.get_user_watchlist_page", return_value=([], None)):
+            client.post("/watchlist/add", json={"id": 1399, "title": "Show", "media_type": "tv"})
+            client.post("/watchlist/add", json={"id": 550, "title": "Film"})
+
+        assert mock_add.call_args_list[0].args == (1, 1399, "Show", None, "tv")
+        assert mock_add.call_args_list[1].args[-1] == "movie"
+
+    def test_remove_targets_the_media_type(self, client):
+        with patch("app.db_remove_from_watchlist", return_value=True) as mock_remove, \
+             patch("app.get_user_watchlist_page", return_value=([], None)):
+            client.post("/watchlist/remove", json={"id": 1399, "media_type": "tv"})
+            client.post("/watchlist/remove", json={"id": 550})
+
+        assert mock_remove.call_args_list[0].args == (1, 1399, "tv")
+        assert mock_remove.call_args_list[1].args == (1, 550, "movie")
+
+    def test_unknown_media_type_is_400(self, client):
+        response = client.post("/watchlist/add", json={"id": 5, "title": "Someone", "media_type": "person"})
+        assert response.status_code == 400
+        response = client.post("/watchlist/remove", json={"id": 5, "media_type": "person"})
+        assert response.status_code == 400
@@ -0,0 +1,92 @@
+"""
+DevOps Flix - Gunicorn Configuration Test Suite
+pytest tests for cgroup CPU detection and worker sizing
+"""
+
+import importlib.util
+import logging
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_conf():
+    """Execute gunicorn.conf.py as gunicorn does, returning it as a module"""
+    spec = importlib.util.spec_from_file_location(
+        "gunicorn_conf", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+gunicorn_conf = load_conf()
+
+
+class TestCgroupCpuLimit:
+    """Test reading the container CPU quota"""
+
+    def test_cgroup_v2_quota(self, tmp_path):
+        """A 500m limit in cpu.max reads as half a CPU"""
+        (tmp_path / "cpu.max").write_text("50000 100000\n")
+        assert gunicorn_conf.cgroup_cpu_limit(str(tmp_path)) == 0.5
+
+    def test_cgroup_v2_unlimited(self, tmp_path):
+        """"max" means no quota"""
+        (tmp_path / "cpu.max").write_text("max 100000\n")
+        assert gunicorn_conf.cgroup_cpu_limit(str(tmp_path)) is None
+
+    def test_cgroup_v1_quota(self, tmp_path):
+        """cgroup v1 quota/period files are used when cpu.max is absent"""
+        (tmp_path / "cpu").mkdir()
+        (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("150000\n")
+        (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+        assert gunicorn_conf.cgroup_cpu_limit(str(tmp_path)) == 1.5
+
+    def test_no_cgroup_files(self, tmp_path):
+        """Outside a container there is no quota"""
+        assert gunicorn_conf.cgroup_cpu_limit(str(tmp_path)) is None
+
+
+class TestWorkerSizing:
+    """Test worker/thread sizing from the CPU quota"""
+
+    def test_half_cpu_gets_two_threaded_workers(self):
+        """The 500m k8s limit still gets two workers so one can restart"""
+        assert gunicorn_conf.size_workers(0.5, "gthread") == (2, 4)
+
+    def test_workers_scale_with_quota(self):
+        """More CPU quota means more worker processes"""
+        assert gunicorn_conf.size_workers(2, "gthread") == (4, 4)
+
+    def test_gevent_uses_one_worker_per_core(self):
+        """gevent workers get concurrency from greenlets, not threads"""
+        assert gunicorn_conf.size_workers(1.5, "gevent") == (2, 1)
+
+    def test_production_settings(self):
+        """Preload, recycling and graceful shutdown are configured"""
+        assert gunicorn_conf.preload_app is True
+        assert gunicorn_conf.max_requests > 0 and gunicorn_conf.max_requests_jitter > 0
+        assert gunicorn_conf.graceful_timeout < 30  # terminationGracePeriodSeconds in k8s
+
+
+class TestGeventWorkers:
+    """Test the optional gevent worker class"""
+
+    def test_missing_gevent_falls_back_with_a_log_line(self, monkeypatch, caplog):
+        """Without gevent installed the config logs a warning and keeps gthread + preload"""
+        monkeypatch.setenv("GUNICORN_WORKER_CLASS", "gevent")
+        with patch.dict(sys.modules, {"gevent": None}), caplog.at_level(logging.WARNING):
+            conf = load_conf()
+        assert conf.worker_class == "gthread" and conf.preload_app is True
+        assert "falling back to gthread" in caplog.text
+
+    def test_gevent_workers_load_the_app_after_patching(self, monkeypatch):
+        """gevent turns preload off, so the app is imported after monkey-patching"""
+        monkeypatch.setenv("GUNICORN_WORKER_CLASS", "gevent")
+        with patch.dict(sys.modules, {"gevent": MagicMock()}):
+            conf = load_conf()
+        assert conf.worker_class == "gevent" and conf.preload_app is False
@@ -0,0 +1,94 @@
+"""
+DevOps Flix - Health Check Test Suite
+pytest tests for /livez, /readyz and the cached readiness checks
+"""
+
+import pytest
+from unittest.mock import ANY, patch
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+import health
+from app import app
+
+
+@pytest.fixture
+def client():
+    """Test client with a fresh readiness cache"""
+    app.config["TESTING"] = True
+    health.reset()
+    with app.test_client() as client:
+        yield client
+    health.reset()
+
+
+class TestHealthEndpoints:
+    """Test liveness/readiness probes"""
+
+    def test_livez_never_touches_dependencies(self, client):
+        """Liveness stays 200 even if the database is down"""
+        with patch("database.check_database", side_effect=Exception("db down")):
+            response = client.get("/livez")
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "alive"}
+
+    def test_readyz_reports_each_check(self, client):
+        """Readiness is 200 with per-check details when dependencies are healthy"""
+        with patch("tmdbcache.is_cached", return_value=True):  # Homepage lists already warm
+            response = client.get("/readyz")
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body["status"] == "ready"
+        assert set(body["checks"]) >= {"database", "background_tasks", "password_pool", "upstream", "tmdb_cache"}
+        assert all(check["status"] == "ok" for check in body["checks"].values())
+
+    def test_readyz_fails_when_database_is_unreachable(self, client):
+        """A failing critical check returns 503 so the pod leaves the Service"""
+        with patch("database.check_database", side_effect=Exception("connection refused")):
+            response = client.get("/readyz")
+        assert response.status_code == 503
+        body = response.get_json()
+        assert body["status"] == "not ready"
+        assert body["checks"]["database"]["status"] == "failing"
+        assert "connection refused" in body["checks"]["database"]["reason"]
+
+    def test_slow_upstream_is_degraded_not_unready(self, client):
+        """TMDB slowness is reported but doesn't pull the pod out of rotation"""
+        import metrics
+        slow = dict(metrics.saturation.snapshot(), upstream_wait_seconds=metrics.SATURATION_UPSTREAM_TARGET * 3)
+        with patch("metrics.saturation.snapshot", return_value=slow):
+            response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.get_json()["checks"]["upstream"]["status"] == "degraded"
+
+    def test_cold_tmdb_cache_is_degraded_not_unready(self, client):
+        """A pod that hasn't cached the homepage lists yet still takes traffic"""
+        body = client.get("/readyz").get_json()
+        assert body["status"] == "ready"
+        assert body["checks"]["tmdb_cache"]["status"] == "degraded"
+        assert body["checks"]["tmdb_cache"]["cold"] == ["movie/trending", "movie/top_rated"]
+
+        with patch("app.requests.get") as mock_get:
+            mock_get.return_value.json.return_value = {"results": [], "total_pages": 1}
+            app_module.fetch_trending_movies()
+            app_module.fetch_top_rated_movies()
+        assert health.readiness(force=True)[1]["tmdb_cache"] == {"status": "ok", "cold": [], "ms": ANY}
+
+    def test_readiness_result_is_cached_between_probes(self, client):
+        """Probes within HEALTH_CACHE_SECONDS reuse the last result"""
+        with patch("database.check_database") as check:
+            client.get("/readyz")
+            client.get("/readyz")
+            client.get("/readyz")
+        assert check.call_count == 1
+
+    def test_background_queue_lag_fails_readiness(self):
+        """A backed-up background queue is reported as not keeping up"""
+        stats = {"depth": 0, "maxsize": 1000, "running": 2, "wait_ms_p95": health.TASK_LAG_LIMIT_MS + 1}
+        with patch("tasks.background.stats", return_value=stats):
+            with pytest.raises(health.CheckFailed):
+                health.check_background_tasks()
@@ -0,0 +1,168 @@
+"""
+DevOps Flix - Image Proxy Test Suite
+pytest tests for the /img proxy, its disk cache and the srcset template helpers
+"""
+
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import images
+import requests
+from app import app
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def image_cache(tmp_path, monkeypatch):
+    """Every test starts with an empty image cache in its own directory"""
+    cache = images.DiskCache(str(tmp_path / "images"), 10 * 1024 * 1024)
+    monkeypatch.setattr(images, "cache", cache)
+    monkeypatch.setattr(images, "_missing", {})
+    return cache
+
+
+def upstream_returning(content=b"\xff\xd8image", status=200):
+    response = MagicMock(status_code=status, content=content)
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status} error")
+    return patch("images.requests.get", return_value=response)
+
+
+class TestImageProxy:
+    """/img/w<width>/<file> fetches once, then serves from disk"""
+
+    def test_fetches_once_then_serves_from_disk(self, client):
+        with upstream_returning() as mock_get:
+            first = client.get("/img/w342/poster1.jpg")
+            second = client.get("/img/w342/poster1.jpg")
+
+        assert first.status_code == second.status_code == 200
+        assert second.data == b"\xff\xd8image"
+        assert second.headers["Content-Type"] == "image/jpeg"
+        assert second.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+        mock_get.assert_called_once_with(f"{images.IMAGE_UPSTREAM}/w342/poster1.jpg", timeout=images.IMAGE_TIMEOUT)
+
+    def test_revalidation_returns_304(self, client):
+        with upstream_returning():
+            etag = client.get("/img/w185/poster1.jpg").headers["ETag"]
+            response = client.get("/img/w185/poster1.jpg", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_rejects_unknown_widths_and_names(self, client):
+        with upstream_returning() as mock_get:
+            assert client.get("/img/w343/poster1.jpg").status_code == 404
+            assert client.get("/img/w342/poster1.exe").status_code == 404
+            assert client.get("/img/w342/..%2Fsecret.jpg").status_code == 404
+        mock_get.assert_not_called()
+
+    def test_upstream_404_and_errors(self, client):
+        with upstream_returning(status=404):
+            assert client.get("/img/w342/missing.jpg").status_code == 404
+        with patch("images.requests.get", side_effect=requests.Timeout("slow")):
+            assert client.get("/img/w342/slow.jpg").status_code == 502
+
+    def test_concurrent_misses_fetch_once(self):
+        release = threading.Event()
+        response = MagicMock(status_code=200, content=b"data")
+
+        def slow_get(url, timeout=None):
+            release.wait(2)
+            return response
+
+        with patch("images.requests.get", side_effect=slow_get) as mock_get:
+            threads = [threading.Thread(target=images.fetch, args=(500, "same.jpg")) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join()
+        assert mock_get.call_count == 1
+
+    def test_concurrent_misses_share_a_failure(self):
+        release = threading.Event()
+        errors = []
+
+        def failing_get(url, timeout=None):
+            release.wait(2)
+            raise requests.ConnectionError("down")
+
+        def get():
+            try:
+                images.fetch(500, "down.jpg")
+            except images.UpstreamError as e:
+                errors.append(e)
+
+        with patch("images.requests.get", side_effect=failing_get) as mock_get:
+            threads = [threading.Thread(target=get) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            # Fail the leader's fetch once the three followers are waiting on it
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                future = images._inflight.get((500, "down.jpg"))
+                if future is not None and len(future._condition._waiters) == 3:
+                    break
+                time.sleep(0.01)
+            release.set()
+            for thread in threads:
+                thread.join()
+        assert mock_get.call_count == 1 and len(errors) == 4
+        assert not images._inflight  # The next request tries upstream again
+
+    def test_upstream_404_is_remembered_briefly(self):
+        with upstream_returning(status=404) as mock_get:
+            for _ in range(3):
+                with pytest.raises(images.ImageNotFound):
+                    images.fetch(342, "gone.jpg")
+            assert mock_get.call_count == 1
+
+            images._missing[(342, "gone.jpg")] = time.monotonic() - 1  # Expired: ask upstream again
+            with pytest.raises(images.ImageNotFound):
+                images.fetch(342, "gone.jpg")
+            assert mock_get.call_count == 2
+
+
+class TestDiskCache:
+    """Least recently used files go first once the cache is over its limit"""
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = images.DiskCache(str(tmp_path / "lru"), max_bytes=250)
+        for i in range(3):
+            cache.put((185, f"img{i}.jpg"), b"x" * 100)
+            os.utime(cache.path((185, f"img{i}.jpg")), (time.time() - 300 + i, time.time() - 300 + i))
+            cache.get((185, "img0.jpg"))  # img0 is the one in use
+
+        assert cache.get((185, "img0.jpg")) is not None
+        assert cache.get((185, "img1.jpg")) is None
+        assert cache.get((185, "img2.jpg")) is not None
+
+
+class TestTemplateHelpers:
+    """Templates request the size each slot displays"""
+
+    def test_image_attrs(self):
+        attrs = images.image_attrs("/abc.jpg", "profile")
+        assert attrs == (
+            f'src="{images.IMAGE_ROOT}/w185/abc.jpg" '
+            f'srcset="{images.IMAGE_ROOT}/w92/abc.jpg 92w, {images.IMAGE_ROOT}/w185/abc.jpg 185w" sizes="70px"'
+        )
+        assert images.image_url(None, 780) == ""
+
+    def test_slot_widths_are_proxied(self):
+        for widths, _, src_width in images.SLOTS.values():
+            assert set(widths) | {src_width} <= set(images.WIDTHS)
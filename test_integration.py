@@ -6,6 +6,7 @@ End-to-end workflow tests for complete user journeys and multi-component interac
 
 import pytest
 from unittest.mock import patch, MagicMock
+import json
 import sys
 import os
 
@@ -360,5 +361,60 @@ class TestIntegrationWorkflows:
             response = client.get('/watchlist')
             watchlist_data = response.get_json()['watchlist']
             assert len(watchlist_data) == 2
-            assert watchlist_data[0]['id'] == 11111
-            assert watchlist_data[1]['id'] == 22222
+            # Newest first: ties on added_at (same second) are broken by insertion order
+            assert watchlist_data[0]['id'] == 22222
+            assert watchlist_data[1]['id'] == 11111
+
+    def test_watchlist_pagination_and_export(self, client):
+        """
+        Integration Test: Paging through the watchlist by cursor and exporting it
+        Tests that pages don't overlap and the streamed export contains every movie
+        """
+        import sqlite3
+
+        # Cleanup admin watchlist
+        try:
+            conn = sqlite3.connect("devopsflix.db")
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM watchlist WHERE user_id = (SELECT id FROM users WHERE username = 'admin')")
+            conn.commit()
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+        client.post('/login', data={'username': 'admin', 'password': '123'})
+        for movie_id in range(301, 306):
+            client.post('/watchlist/add', json={'id': movie_id, 'title': f'Paged Movie {movie_id}', 'poster_path': None})
+
+        # Step 1: Walk the pages two at a time
+        seen, cursor = [], None
+        while True:
+            url = '/watchlist?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            data = client.get(url).get_json()
+            assert len(data['watchlist']) <= 2
+            seen.extend(m['id'] for m in data['watchlist'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert seen == [305, 304, 303, 302, 301]
+
+        # Step 2: A tampered cursor is rejected
+        response = client.get('/watchlist?cursor=not-a-cursor')
+        assert response.status_code == 400
+
+        # Step 3: Export as JSON lines and CSV
+        response = client.get('/watchlist/export')
+        assert response.status_code == 200
+        lines = response.data.decode().strip().split("\n")
+        assert [json.loads(line)['id'] for line in lines] == [305, 304, 303, 302, 301]
+
+        response = client.get('/watchlist/export?format=csv')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = response.data.decode().strip().splitlines()
+        assert rows[0] == 'id,title,poster_path,added_at'
+        assert len(rows) == 6
+
+        # Step 4: Export requires login
+        client.get('/logout')
+        assert client.get('/watchlist/export').status_code == 401
@@ -0,0 +1,66 @@
+"""
+DevOps Flix - Logging Pipeline Test Suite
+pytest tests for the queue-based, sampled JSON logging pipeline
+"""
+
+import io
+import json
+import logging
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import logconfig
+
+
+def make_record(level=logging.INFO, msg="SEARCH: %s", args=("dune",), **extra):
+    record = logging.LogRecord("app", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLoggingPipeline:
+    """Test sampling, deferred formatting and JSON output"""
+
+    def test_sampler_keeps_fraction_of_events_and_all_warnings(self):
+        """search=0 drops every info-level search log, but never a warning; untagged logs pass"""
+        sampler = logconfig.EventSampler({"search": 0.0})
+        assert not sampler.filter(make_record(event="search"))
+        assert sampler.filter(make_record(level=logging.WARNING, event="search"))
+        assert sampler.filter(make_record())
+        assert sampler.sampled_out == {"search": 1}
+
+    def test_formatting_happens_on_the_listener_thread(self):
+        """Records are queued with their %-args unmerged, then written as JSON by the listener"""
+        stream = io.StringIO()
+        target = logging.StreamHandler(stream)
+        target.setFormatter(logconfig.JsonFormatter())
+        handler = logconfig.AsyncHandler(target)
+
+        record = make_record(event="search", trace_id="t-1")
+        assert handler.prepare(record) is record
+        assert record.args == ("dune",)  # Not merged on the caller's thread
+
+        handler.handle(record)
+        handler.flush_and_stop()
+        entry = json.loads(stream.getvalue())
+        assert entry["message"] == "SEARCH: dune"
+        assert entry["event"] == "search"
+        assert entry["trace_id"] == "t-1"
+        assert entry["level"] == "INFO"
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """A stalled writer costs dropped records, not stalled requests"""
+        handler = logconfig.AsyncHandler(logging.NullHandler(), maxsize=1)
+        handler._ensure_listener()
+        handler._listener.stop()  # Nothing drains the queue now
+        handler._pid = os.getpid()
+        handler.handle(make_record())
+        handler.handle(make_record())
+        assert handler.dropped == 1
+
+    def test_parse_sample_rates(self):
+        """LOG_SAMPLE_RATES parsing clamps to [0, 1] and ignores blanks"""
+        assert logconfig.parse_sample_rates("search=0.01, request=2,,bad") == {"search": 0.01, "request": 1.0}
@@ -0,0 +1,105 @@
+"""
+DevOps Flix - Profiler Test Suite
+pytest tests for the opt-in per-request sampling profiler
+"""
+
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import profiler
+from app import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client writing profiles to a temporary directory"""
+    app.config["TESTING"] = True
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    with app.test_client() as client:
+        yield client
+
+
+def slow_tmdb(url, params=None, timeout=None):
+    """A TMDB call that spends 60ms waiting"""
+    time.sleep(0.06)
+    response = MagicMock()
+    response.json.return_value = {"results": [{"id": 1, "title": "Slow", "media_type": "movie"}]}
+    return response
+
+
+class TestProfiler:
+    """Test profiling triggers, output files and the time breakdown"""
+
+    def test_unprofiled_requests_write_nothing(self, client, tmp_path):
+        """No trigger: no sampler thread, no file, no Server-Timing header"""
+        with patch("app.requests.get", side_effect=slow_tmdb):
+            response = client.get("/api/search?q=slow")
+        assert "Server-Timing" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_signed_header_profiles_request_with_upstream_breakdown(self, client, tmp_path):
+        """A valid X-Profile token writes a speedscope file and attributes TMDB wait to upstream"""
+        token = profiler.make_token(app.secret_key)
+        with patch("app.requests.get", side_effect=slow_tmdb):
+            response = client.get("/api/search?q=slow", headers={"X-Profile": token})
+
+        assert response.status_code == 200
+        assert "upstream;dur=" in response.headers["Server-Timing"]
+        profile_file = tmp_path / response.headers["X-Profile-File"]
+        speedscope = json.loads(profile_file.read_text())
+        assert speedscope["profiles"][0]["type"] == "sampled"
+        assert any("tmdb_get" in frame["name"] for frame in speedscope["shared"]["frames"])
+
+        summary = json.loads(next(tmp_path.glob("*.summary.json")).read_text())
+        assert summary["reason"] == "header"
+        assert summary["breakdown_ms"]["upstream"] > summary["breakdown_ms"]["app"]
+
+    def test_forged_header_is_ignored(self, client, tmp_path):
+        """A token signed with another key does not turn profiling on"""
+        token = profiler.make_token("not-the-secret-key")
+        client.get("/health", headers={"X-Profile": token})
+        assert list(tmp_path.iterdir()) == []
+
+    def test_query_parameter_is_admin_only(self, client, tmp_path, monkeypatch):
+        """?profile=1 works for users in PROFILE_ADMINS, not for anonymous visitors"""
+        assert profiler.PROFILE_ADMINS == set()  # Nobody unless configured
+        monkeypatch.setattr(profiler, "PROFILE_ADMINS", {"admin"})
+        client.get("/health?profile=1")
+        assert list(tmp_path.iterdir()) == []
+
+        with client.session_transaction() as sess:
+            sess["user"] = "admin"
+        response = client.get("/health?profile=1")
+        assert "Server-Timing" in response.headers
+
+    def test_collapsed_stack_output(self, client, tmp_path, monkeypatch):
+        """PROFILE_FORMAT=collapsed writes 'frame;frame count' lines for flamegraph.pl"""
+        monkeypatch.setattr(profiler, "PROFILE_FORMAT", "collapsed")
+        with patch("app.requests.get", side_effect=slow_tmdb):
+            response = client.get("/api/search?q=slow", headers={"X-Profile": profiler.make_token(app.secret_key)})
+        lines = (tmp_path / response.headers["X-Profile-File"]).read_text().splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert ";" in stack and int(count) > 0
+
+    def test_profile_dir_keeps_the_newest_files(self, client, tmp_path, monkeypatch):
+        """Past PROFILE_MAX_FILES the oldest profiles are deleted"""
+        monkeypatch.setattr(profiler, "PROFILE_MAX_FILES", 4)
+        for age in range(6):
+            old = tmp_path / f"old-{age}.summary.json"
+            old.write_text("{}")
+            os.utime(old, (1000 + age, 1000 + age))
+
+        response = client.get("/health", headers={"X-Profile": profiler.make_token(app.secret_key)})
+
+        names = sorted(p.name for p in tmp_path.iterdir())
+        assert len(names) == 4
+        assert response.headers["X-Profile-File"] in names
+        assert "old-5.summary.json" in names and "old-3.summary.json" not in names
@@ -0,0 +1,153 @@
+"""
+DevOps Flix - Field Projection Test Suite
+pytest tests for ?fields= on the detail APIs, the /api/batch lookup and compact list results
+"""
+
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import projection
+import requests
+import tmdbcache
+from app import app
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def tmdb_details(barrier=None, missing=()):
+    """Mock TMDB detail endpoints: /movie/<id> and /tv/<id>, 404 for ids in `missing`"""
+    def fake_get(url, params=None, timeout=None):
+        if url.endswith("/watch/providers"):
+            return MagicMock(status_code=200, json=MagicMock(return_value={"results": {}}))
+        if barrier is not None:
+            barrier.wait()
+        media_type, media_id = url.rsplit("/", 2)[-2:]
+        if int(media_id) in missing:
+            response = MagicMock(status_code=404)
+            response.raise_for_status.side_effect = requests.HTTPError("404")
+            return response
+        data = {
+            "id": int(media_id), "vote_average": 7.5, "overview": "Long text " * 50,
+            "budget": 1000000, "credits": {"cast": [{"name": "Actor"}], "crew": []},
+        }
+        data["title" if media_type == "movie" else "name"] = f"{media_type} {media_id}"
+        return MagicMock(status_code=200, json=MagicMock(return_value=data))
+    return patch("app.requests.get", side_effect=fake_get)
+
+
+class TestParseFields:
+    """fields= is validated and always keeps the id"""
+
+    def test_parse_and_project(self):
+        fields = projection.parse_fields("title, vote_average,title", projection.DETAIL_FIELDS)
+        assert fields == ("id", "title", "vote_average")
+        assert projection.project({"id": 1, "title": "A", "cast": []}, fields) == {"id": 1, "title": "A"}
+        assert projection.parse_fields("", projection.DETAIL_FIELDS) is None
+
+    def test_unknown_fields_are_rejected(self):
+        with pytest.raises(ValueError, match="password"):
+            projection.parse_fields("title,password", projection.DETAIL_FIELDS)
+
+
+class TestDetailFields:
+    """/api/movie/<id>?fields= returns only what was asked for"""
+
+    def test_projection(self, client):
+        with tmdb_details():
+            full = client.get("/api/movie/550").get_json()["movie"]
+            small = client.get("/api/movie/550?fields=title,vote_average").get_json()["movie"]
+            tv = client.get("/api/tv/1399?fields=title").get_json()["movie"]
+        assert "cast" in full and "budget" in full
+        assert small == {"id": 550, "title": "movie 550", "vote_average": 7.5}
+        assert tv == {"id": 1399, "title": "tv 1399"}
+
+    def test_details_are_cached(self, client):
+        with tmdb_details() as mock_get:
+            client.get("/api/movie/550?fields=title")
+            client.get("/movie/550")
+        # The detail page also fetches watch providers; the details themselves only once
+        assert sum(call.args[0].endswith("/movie/550") for call in mock_get.call_args_list) == 1
+
+    def test_unknown_field_is_400(self, client):
+        assert client.get("/api/tv/1399?fields=title,secret").status_code == 400
+
+
+class TestBatch:
+    """/api/batch resolves many ids concurrently, through the cache"""
+
+    def test_batch_is_concurrent_and_projected(self, client):
+        # No lookup returns until all five are running at the same time
+        with tmdb_details(barrier=threading.Barrier(5, timeout=5), missing={404}):
+            data = client.get("/api/batch?movie=1,2,3,404&tv=7&fields=title,vote_average").get_json()
+
+        assert data["results"] == [
+            {"id": 1, "title": "movie 1", "vote_average": 7.5, "media_type": "movie"},
+            {"id": 2, "title": "movie 2", "vote_average": 7.5, "media_type": "movie"},
+            {"id": 3, "title": "movie 3", "vote_average": 7.5, "media_type": "movie"},
+            {"id": 7, "title": "tv 7", "vote_average": 7.5, "media_type": "tv"},
+        ]
+        assert data["missing"] == [{"id": 404, "media_type": "movie"}]
+
+    def test_cached_ids_skip_tmdb(self, client):
+        with tmdb_details() as mock_get:
+            client.get("/api/movie/1")
+            client.get("/api/batch?movie=1,1,2&fields=title")
+        assert mock_get.call_count == 2
+
+    def test_limits(self, client):
+        too_many = ",".join(str(i) for i in range(51))
+        assert client.get(f"/api/batch?movie={too_many}").status_code == 400
+        assert client.get("/api/batch?movie=1,abc").status_code == 400
+
+
+TMDB_TV_RESULT = {
+    "id": 1399, "media_type": "tv", "name": "Game of Thrones", "original_name": "Game of Thrones",
+    "first_air_date": "2011-04-17", "poster_path": "/got.jpg", "backdrop_path": "/gotb.jpg",
+    "overview": "x" * 1000, "vote_average": 8.456, "vote_count": 22000, "popularity": 300.5,
+    "genre_ids": [18, 10765], "origin_country": ["US"], "original_language": "en", "adult": False,
+}
+
+
+class TestCompactResults:
+    """Search and list results keep only the fields the pages read, in one shape"""
+
+    def test_tv_result_is_normalized(self):
+        item = projection.compact_result(TMDB_TV_RESULT)
+        assert item == {
+            "id": 1399, "media_type": "tv", "title": "Game of Thrones", "release_date": "2011-04-17",
+            "poster_path": "/got.jpg", "backdrop_path": "/gotb.jpg",
+            "overview": "x" * projection.OVERVIEW_MAX_CHARS, "vote_average": 8.5,
+        }
+        assert projection.compact_result({"id": 1, "title": "Untagged"}, "movie")["media_type"] == "movie"
+
+    def test_search_response_is_the_cached_shape(self, client):
+        person = {"id": 5, "media_type": "person", "name": "Someone"}
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"results": [TMDB_TV_RESULT, person]}
+        with patch("app.requests.get", return_value=response) as mock_get:
+            first = client.get("/api/search?q=thrones").get_json()["results"]
+            second = client.get("/api/search?q=thrones").get_json()["results"]
+
+        assert mock_get.call_count == 1
+        assert first == second == [projection.compact_result(TMDB_TV_RESULT)]
+        cached = [value for (kind, _), (_, value) in tmdbcache._entries.items() if kind == "tmdb_search"]
+        assert cached == [first]
+
+    def test_catalog_pages_are_compact(self, client):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"page": 1, "results": [TMDB_TV_RESULT], "total_pages": 1}
+        with patch("app.requests.get", return_value=response):
+            results = client.get("/api/tv/trending").get_json()["results"]
+        assert set(results[0]) == set(projection.compact_result(TMDB_TV_RESULT))
@@ -15,6 +15,7 @@ from database import (
     get_user, create_user
 )
 import app
+import tasks
 
 
 @pytest.fixture(autouse=True)
@@ -117,6 +118,9 @@ class TestPasswordSecurity:
         # Login (should trigger auto-upgrade)
         login_success = check_password("upgradeuser", "oldpassword")
         assert login_success == True
+
+        # The upgrade runs on the background task queue - wait for it to finish
+        assert tasks.background.wait_idle(timeout=10)
         
         # Verify password was upgraded to hash
         user_after = get_user("upgradeuser")
@@ -178,3 +182,49 @@ class TestPasswordHashingUtilities:
         assert hash1 != hash2, "Same password should produce different hashes (salt)"
         assert hash1.startswith('$2b$')
         assert hash2.startswith('$2b$')
+
+
+class TestPasswordPool:
+    """Test bcrypt offloading, calibration and backpressure"""
+
+    def test_calibration_reports_cost_and_timing(self):
+        """Startup calibration returns the bcrypt cost in use and its measured latency"""
+        import database
+        rounds, ms = database.calibrate_password_hashing()
+        assert 4 <= rounds <= 31
+        assert ms > 0
+        assert hash_password("Calibrated1").startswith(f"$2b${rounds:02d}$")
+
+    def test_saturated_pool_raises(self, monkeypatch):
+        """When every slot is taken, hashing fails fast instead of queueing"""
+        import database
+        _, slots = database._get_password_pool()
+        monkeypatch.setattr(slots, "acquire", lambda blocking=True: False)
+
+        with pytest.raises(database.PasswordPoolSaturated) as exc_info:
+            hash_password("Busy123")
+        assert exc_info.value.retry_after >= 1
+
+    def test_saturated_login_returns_503_with_retry_after(self, monkeypatch):
+        """A login during a hashing burst gets 503 + Retry-After rather than hanging"""
+        import database
+
+        def saturated(*args):
+            raise database.PasswordPoolSaturated(3)
+
+        monkeypatch.setattr(database, "_run_password_job", saturated)
+        execute_query("DELETE FROM users WHERE username = ?", ("busyuser",))
+        execute_query(
+            "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+            ("busyuser", "busy@example.com", "$2b$04$" + "a" * 53)  # Never verified: the pool is "full"
+        )
+
+        app.app.config["TESTING"] = True
+        with app.app.test_client() as client:
+            response = client.post("/login", data={"username": "busyuser", "password": "whatever"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert b"Server is busy" in response.data
+
+        execute_query("DELETE FROM users WHERE username = ?", ("busyuser",))
@@ -0,0 +1,100 @@
+"""
+DevOps Flix - Startup Test Suite
+pytest tests for deferred schema setup, lazy imports and the startup-time report
+"""
+
+import logging
+import subprocess
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import startup
+from app import app
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestColdStart:
+    """Importing the app does no database or hashing work"""
+
+    def test_import_does_not_touch_database_or_heavy_modules(self, tmp_path):
+        db_path = tmp_path / "cold.db"
+        script = (
+            "import sys, app, database\n"
+            "print(database._schema_ready, database._bcrypt_rounds, "
+            "'requests' in sys.modules, 'bcrypt' in sys.modules)\n"
+        )
+        env = dict(os.environ, DB_PATH=str(db_path))
+        env.pop("DB_HOST", None)
+        result = subprocess.run(
+            [sys.executable, "-c", script], cwd=REPO_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.split() == ["False", "None", "False", "False"]
+        assert not db_path.exists()
+
+    def test_first_query_sets_up_schema(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "fresh.db"))
+        monkeypatch.setattr(database, "_schema_ready", False)
+        # The admin user is seeded by the guard before this query runs
+        assert database._load_user("admin")["username"] == "admin"
+        assert database._schema_ready is True
+        assert "schema" in startup.report()["phases"]
+
+    def test_init_db_cli_command(self):
+        result = app.test_cli_runner().invoke(args=["init-db"])
+        assert result.exit_code == 0
+
+
+class TestLazyModule:
+    """Heavy dependencies load on first attribute use"""
+
+    def test_loads_on_first_use(self, monkeypatch):
+        monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+        monkeypatch.delitem(startup._deferred, "colorsys", raising=False)
+        lazy = startup.lazy_module("colorsys")
+        assert "not loaded" in repr(lazy)
+        assert lazy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in startup._deferred
+
+    def test_patching_the_stand_in(self):
+        lazy = startup.LazyModule("json")
+        with patch.object(lazy, "dumps", return_value="patched"):
+            assert lazy.dumps({}) == "patched"
+        assert lazy.dumps({}) == "{}"
+
+    def test_already_imported_module_is_returned_as_is(self):
+        assert startup.lazy_module("os") is os
+
+
+class TestReport:
+    """Startup report and import-time parsing"""
+
+    def test_first_request_logs_once(self, monkeypatch, caplog):
+        monkeypatch.setattr(startup, "_reported", False)
+        with caplog.at_level(logging.INFO, logger="startup"):
+            startup.first_request()
+            startup.first_request()
+        lines = [r for r in caplog.records if r.getMessage().startswith("STARTUP:")]
+        assert len(lines) == 1
+        assert "first request" in lines[0].startup["marks"]
+
+    def test_parse_importtime(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       500 |        500 | site",
+            "import time:      2000 |       2000 |     werkzeug.urls",
+            "import time:      1000 |       3000 |   werkzeug",
+            "import time:      4000 |       4000 |   requests",
+            "import time:       500 |       7500 | app",
+        ])
+        total_ms, packages = startup.parse_importtime(output, "app")
+        assert total_ms == 7.5
+        assert packages == {"werkzeug": 3.0, "requests": 4.0, "app": 0.5}
+        with pytest.raises(ValueError):
+            startup.parse_importtime(output, "missing")
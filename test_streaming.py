@@ -0,0 +1,87 @@
+"""
+DevOps Flix - Streamed Homepage Test Suite
+pytest tests for concurrent homepage lookups and block-by-block streaming
+"""
+
+import threading
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import app
+
+MOVIES = {
+    "trending": [{"id": 1, "title": "Trending One", "overview": "A film", "poster_path": "/t1.jpg",
+                  "backdrop_path": "/b1.jpg", "vote_average": 8.1, "release_date": "2024-01-01",
+                  "media_type": "movie"}],
+    "top_rated": [{"id": 2, "title": "Top Rated Two", "poster_path": "/t2.jpg", "vote_average": 9.0,
+                   "release_date": "1994-09-23"}],
+}
+
+
+@pytest.fixture
+def client():
+    """A test client without a `with` block, so streamed bodies can be read at any pace"""
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def tmdb_returning(gate=None, barrier=None):
+    """Mock TMDB: the trending list waits for `gate`; with `barrier`, every list waits for the others"""
+    def fake_get(url, params=None, timeout=None):
+        name = "trending" if "trending" in url else "top_rated"
+        if gate is not None and name == "trending":
+            gate.wait(5)
+        if barrier is not None and (params or {}).get("page", 1) == 1:  # Not the background prefetches
+            barrier.wait()
+        return MagicMock(status_code=200, json=MagicMock(return_value={"results": MOVIES[name]}))
+    return patch("app.requests.get", side_effect=fake_get)
+
+
+class TestConcurrentLookups:
+    """The homepage waits for its slowest lookup, not the sum of them"""
+
+    def test_lists_are_fetched_side_by_side(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_HOMEPAGE", False)
+        # Neither list returns until both are being fetched at the same time
+        with tmdb_returning(barrier=threading.Barrier(2, timeout=5)):
+            response = client.get("/")
+
+        assert response.status_code == 200
+        assert b"Trending One" in response.data and b"Top Rated Two" in response.data
+
+
+class TestStreamedHomepage:
+    """STREAM_HOMEPAGE=true sends the shell first, then each row as its data arrives"""
+
+    def test_same_html_as_a_single_render(self, client, monkeypatch):
+        with tmdb_returning():
+            monkeypatch.setattr(app_module, "STREAM_HOMEPAGE", False)
+            whole = client.get("/").get_data(as_text=True)
+            monkeypatch.setattr(app_module, "STREAM_HOMEPAGE", True)
+            response = client.get("/")
+            chunks = [chunk.decode() for chunk in response.response]
+
+        assert response.is_streamed
+        assert response.headers["X-Accel-Buffering"] == "no"
+        assert len(chunks) == 5
+        assert "".join(chunks) == whole
+
+    def test_shell_is_sent_before_a_slow_list(self, client, monkeypatch):
+        monkeypatch.setattr(app_module, "STREAM_HOMEPAGE", True)
+        gate = threading.Event()
+        with tmdb_returning(gate=gate):
+            response = client.get("/")  # Returns while the trending list is still pending
+            chunks = iter(response.response)
+            shell = next(chunks).decode()
+            assert 'class="navbar"' in shell and "Trending One" not in shell
+            gate.set()
+            rest = b"".join(chunks).decode()
+
+        assert "Trending One" in rest and "Top Rated Two" in rest
+        assert rest.rstrip().endswith("</html>")
@@ -0,0 +1,111 @@
+"""
+DevOps Flix - Background Task Queue Test Suite
+pytest tests for retries, backpressure, draining and monitoring stats
+"""
+
+import contextvars
+import pytest
+import threading
+import time
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tasks
+from tasks import TaskQueue
+
+
+@pytest.fixture
+def task_queue():
+    """A private queue so tests don't interfere with the app's shared one"""
+    q = TaskQueue("test", workers=2, maxsize=10, max_retries=2, retry_delay=0.01)
+    yield q
+    q.shutdown(timeout=5)
+
+
+class TestTaskQueue:
+    """Test the in-process background task queue"""
+
+    def test_tasks_run_in_background(self, task_queue):
+        """Submitted tasks run on worker threads, not the caller's"""
+        ran_on = []
+        assert task_queue.submit(lambda: ran_on.append(threading.current_thread().name))
+        assert task_queue.wait_idle(timeout=5)
+        assert ran_on and ran_on[0].startswith("test-")
+        assert task_queue.stats()["completed"] == 1
+
+    def test_failing_task_is_retried_then_succeeds(self, task_queue):
+        """A task that fails once is retried with backoff"""
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise RuntimeError("temporary failure")
+
+        task_queue.submit(flaky)
+        assert task_queue.wait_idle(timeout=5)
+        stats = task_queue.stats()
+        assert len(attempts) == 2
+        assert stats["retried"] == 1 and stats["completed"] == 1 and stats["failed"] == 0
+
+    def test_task_gives_up_after_max_retries(self, task_queue):
+        """A task that always fails is attempted 1 + max_retries times"""
+        attempts = []
+
+        def broken():
+            attempts.append(1)
+            raise RuntimeError("permanent failure")
+
+        task_queue.submit(broken)
+        assert task_queue.wait_idle(timeout=5)
+        assert len(attempts) == 3
+        assert task_queue.stats()["failed"] == 1
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Submitting to a full queue returns False immediately"""
+        release = threading.Event()
+        q = TaskQueue("full", workers=1, maxsize=1, max_retries=0)
+        q.submit(release.wait)          # Occupies the only worker
+        while q.stats()["running"] == 0:
+            time.sleep(0.01)
+        assert q.submit(lambda: None)   # Fills the queue
+        assert q.submit(lambda: None) is False
+        assert q.stats()["dropped"] == 1
+        release.set()
+        assert q.shutdown(timeout=5)
+
+    def test_shutdown_drains_queued_tasks(self, task_queue):
+        """Shutdown waits for queued work and then rejects new tasks"""
+        done = []
+        for i in range(5):
+            task_queue.submit(done.append, i)
+        assert task_queue.shutdown(timeout=5)
+        assert sorted(done) == [0, 1, 2, 3, 4]
+        assert task_queue.submit(done.append, 99) is False
+
+    def test_stats_report_depth_and_latency(self, task_queue):
+        """Monitoring stats include queue depth and latency summaries"""
+        task_queue.submit(lambda: None)
+        task_queue.wait_idle(timeout=5)
+        stats = task_queue.stats()
+        for key in ("depth", "running", "pending", "wait_ms_avg", "wait_ms_p95", "run_ms_avg", "run_ms_p95"):
+            assert key in stats
+        assert stats["pending"] == 0
+
+
+class TestFanOut:
+    """fan_out() runs lookups concurrently in the caller's context"""
+
+    def test_lookups_overlap(self):
+        # Each lookup only returns once all three are running at the same time
+        barrier = threading.Barrier(3, timeout=5)
+        futures = [tasks.fan_out(barrier.wait) for _ in range(3)]
+        assert sorted(future.result(timeout=10) for future in futures) == [0, 1, 2]
+
+    def test_context_is_carried_over(self):
+        var = contextvars.ContextVar("fanout_test", default="unset")
+        var.set("request value")
+        assert tasks.fan_out(var.get).result(timeout=5) == "request value"
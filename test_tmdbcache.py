@@ -0,0 +1,171 @@
+"""
+DevOps Flix - TMDB Cache Test Suite
+pytest tests for the shared TMDB cache and the paged catalog APIs it backs
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+import tasks
+import tmdbcache
+from app import app
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def tmdb_pages(total_pages=5):
+    """Mock TMDB list endpoints: page N holds ids N*100 .. N*100+19"""
+    def fake_get(url, params=None, timeout=None):
+        page = params.get("page", 1)
+        results = [{"id": page * 100 + i, "title": f"Movie {page}-{i}"} for i in range(20)]
+        return MagicMock(status_code=200, json=MagicMock(return_value={
+            "page": page, "results": results, "total_pages": total_pages
+        }))
+    return patch("app.requests.get", side_effect=fake_get)
+
+
+def pages_requested(mock_get):
+    return sorted(call.kwargs["params"]["page"] for call in mock_get.call_args_list)
+
+
+class TestTMDBCache:
+    """One upstream call per key, failures never cached"""
+
+    def test_hit_after_miss(self):
+        loader = MagicMock(return_value={"results": []})
+        assert tmdbcache.get_or_load("test", "a", loader) == {"results": []}
+        assert tmdbcache.get_or_load("test", "a", loader) == {"results": []}
+        assert loader.call_count == 1
+        assert tmdbcache.is_cached("test", "a") and not tmdbcache.is_cached("test", "b")
+
+    def test_failures_are_not_cached(self):
+        loader = MagicMock(return_value=None)
+        tmdbcache.get_or_load("test", "down", loader)
+        tmdbcache.get_or_load("test", "down", loader)
+        assert loader.call_count == 2
+
+    def test_expired_entries_are_reloaded(self, monkeypatch):
+        monkeypatch.setattr(tmdbcache, "TMDB_CACHE_TTL", 0.05)
+        loader = MagicMock(return_value="value")
+        tmdbcache.get_or_load("test", "ttl", loader)
+        time.sleep(0.1)
+        tmdbcache.get_or_load("test", "ttl", loader)
+        assert loader.call_count == 2
+
+    def test_concurrent_misses_load_once(self):
+        release = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            release.wait(2)
+            return "value"
+
+        threads = [threading.Thread(target=tmdbcache.get_or_load, args=("test", "same", slow_loader)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+
+    def test_concurrent_misses_share_a_failure(self):
+        release = threading.Event()
+        calls, results = [], []
+
+        def failing_loader():
+            calls.append(1)
+            release.wait(2)
+            return None
+
+        def get():
+            results.append(tmdbcache.get_or_load("test", "down", failing_loader))
+
+        threads = [threading.Thread(target=get) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        # Fail the leader's load once the three followers are waiting on it
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            future = tmdbcache._inflight.get(("test", "down"))
+            if future is not None and len(future._condition._waiters) == 3:
+                break
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1 and results == [None] * 4
+        assert not tmdbcache.is_cached("test", "down")  # The next request retries
+
+
+class TestCatalogPages:
+    """/api/trending?page=N and friends, with the next pages prefetched"""
+
+    def test_page_and_prefetch(self, client):
+        with tmdb_pages() as mock_get:
+            response = client.get("/api/trending?page=2")
+            assert app_module.prefetch_queue.wait_idle(timeout=5)
+
+            data = response.get_json()
+            assert response.status_code == 200
+            assert data["page"] == 2 and data["next_page"] == 3 and data["total_pages"] == 5
+            assert data["results"][0]["id"] == 200
+            assert pages_requested(mock_get) == [2, 3, 4]
+
+            # The reader scrolls on: page 3 is already cached, only page 5 is new
+            assert client.get("/api/trending?page=3").get_json()["results"][0]["id"] == 300
+            assert app_module.prefetch_queue.wait_idle(timeout=5)
+            assert pages_requested(mock_get) == [2, 3, 4, 5]
+
+    def test_last_page_and_tv_lists(self, client):
+        with tmdb_pages(total_pages=1) as mock_get:
+            data = client.get("/api/tv/top_rated").get_json()
+            assert app_module.prefetch_queue.wait_idle(timeout=5)
+        assert data["page"] == 1 and data["next_page"] is None
+        assert mock_get.call_args.args[0].endswith("/tv/top_rated")
+        assert pages_requested(mock_get) == [1]
+
+    def test_queued_prefetches_are_not_queued_twice(self, client, monkeypatch):
+        """A page waiting on the prefetch queue isn't queued again, and the background queue is left alone"""
+        queue = tasks.TaskQueue("prefetch-test", workers=1, max_retries=0)
+        monkeypatch.setattr(app_module, "prefetch_queue", queue)
+        gate = threading.Event()
+        with tmdb_pages() as mock_get:
+            fake_get = mock_get.side_effect
+
+            def gated_get(url, params=None, timeout=None):
+                if params.get("page") == 2:
+                    gate.wait(5)  # Holds the only prefetch worker, so page 3 stays queued
+                return fake_get(url, params, timeout)
+
+            mock_get.side_effect = gated_get
+            client.get("/api/trending?page=1")
+            client.get("/api/trending?page=1")
+            assert queue.stats()["pending"] == 2  # Pages 2 and 3, once each
+            assert tasks.background.stats()["pending"] == 0
+
+            gate.set()
+            assert queue.wait_idle(timeout=5)
+        assert pages_requested(mock_get) == [1, 2, 3]
+        assert not app_module._prefetch_queued
+
+    def test_rejects_bad_pages(self, client):
+        with tmdb_pages() as mock_get:
+            for page in ("0", "501", "abc", "-1"):
+                assert client.get(f"/api/top_rated?page={page}").status_code == 400
+        mock_get.assert_not_called()
@@ -0,0 +1,104 @@
+"""
+DevOps Flix - Tracing Test Suite
+pytest tests for trace IDs, timing spans, the slow log and request summary lines
+"""
+
+import logging
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import database
+import tracing
+from app import app
+
+
+@pytest.fixture
+def client():
+    """Create a test client for the Flask application"""
+    app.config["TESTING"] = True
+    with app.test_client() as client:
+        yield client
+
+
+def capture_spans():
+    """Patch tracing.record to also collect every span into a list"""
+    spans = []
+    original = tracing.record
+
+    def record(kind, name, seconds, **attrs):
+        spans.append((kind, name, attrs))
+        return original(kind, name, seconds, **attrs)
+    return spans, patch("tracing.record", side_effect=record)
+
+
+class TestTracing:
+    """Test per-request traces and spans"""
+
+    def test_request_id_is_reused_or_generated(self, client):
+        """A well-formed X-Request-ID is echoed back; junk is replaced with a fresh ID"""
+        assert client.get("/health", headers={"X-Request-ID": "lb-1234"}).headers["X-Request-ID"] == "lb-1234"
+        generated = client.get("/health", headers={"X-Request-ID": "bad id;<script>"}).headers["X-Request-ID"]
+        assert generated != "bad id;<script>" and len(generated) == 16
+
+    def test_log_lines_carry_trace_id_and_summary(self, client, caplog):
+        """Every log line of a request has its trace ID, and the last one summarizes timings"""
+        with caplog.at_level(logging.INFO):
+            client.get("/api/search?q=", headers={"X-Request-ID": "trace-abc"})
+        summary = [r for r in caplog.records if r.getMessage().startswith("REQUEST: GET /api/search")]
+        assert summary and summary[0].trace_id == "trace-abc"
+        assert "db " in summary[0].getMessage() and "upstream " in summary[0].getMessage()
+
+    def test_query_spans_record_fingerprint_shape_rows_and_cache(self):
+        """Database spans carry the statement, parameter types, row count and cache status"""
+        spans, patcher = capture_spans()
+        database.invalidate_cache("user", "admin")
+        with patcher:
+            database.get_user("admin")
+            database.get_user("admin")
+        db_spans = [s for s in spans if s[0] == "db"]
+        assert db_spans[0][1] == "get_user"
+        assert db_spans[0][2]["params"] == "(str)"
+        assert db_spans[0][2]["rows"] == 1
+        assert db_spans[0][2]["cache"] in ("miss", "bypass")
+        assert "SELECT" in db_spans[0][2]["sql"]
+
+    def test_slow_upstream_goes_to_slow_log(self, client, caplog, monkeypatch):
+        """TMDB calls over the threshold are logged to devopsflix.slow with endpoint and params"""
+        monkeypatch.setitem(tracing.SLOW_THRESHOLDS_MS, "upstream", 10)
+
+        def slow_get(url, params=None, timeout=None):
+            time.sleep(0.02)
+            response = MagicMock(status_code=200)
+            response.json.return_value = {"results": []}
+            return response
+
+        with caplog.at_level(logging.WARNING, logger="devopsflix.slow"), \
+                patch("app.requests.get", side_effect=slow_get):
+            client.get("/movie/550")
+        slow = [r.getMessage() for r in caplog.records if r.name == "devopsflix.slow"]
+        assert any("SLOW UPSTREAM: /movie/{id}" in line and "fetcher=fetch_movie_details" in line for line in slow)
+
+    def test_upstream_spans_record_bytes_and_cache(self, client):
+        """TMDB spans carry the response size and whether the TMDB cache missed"""
+        response = MagicMock(status_code=200, content=b'{"results": []}')
+        response.json.return_value = {"results": []}
+        spans, patcher = capture_spans()
+        with patcher, patch("app.requests.get", return_value=response):
+            client.get("/api/search?q=dune")
+            client.get("/api/search?q=dune")
+        upstream = [s[2] for s in spans if s[0] == "upstream"]
+        assert len(upstream) == 1  # The second search was a cache hit
+        assert upstream[0]["bytes"] == 15 and upstream[0]["cache"] == "miss"
+        assert [s[2]["cache"] for s in spans if s[0] == "cache" and s[1] == "tmdb_search"] == ["hit"]
+
+    def test_fingerprint_strips_literals(self):
+        """Literal values never reach the logs; one query shape is one fingerprint"""
+        assert tracing.fingerprint("SELECT *  FROM users\n WHERE id = 42 AND name = 'bob'") == \
+            "SELECT * FROM users WHERE id = ? AND name = ?"
+        assert tracing.param_shape((1, "x", None)) == "(int, str, NoneType)"
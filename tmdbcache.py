@@ -0,0 +1,136 @@
+"""
+TMDB response cache for DevOps Flix
+Catalog pages and title details change slowly, so every fetcher shares one in-process
+cache instead of calling TMDB on every page view:
+- Entries live TMDB_CACHE_TTL seconds; past TMDB_CACHE_MAX_ENTRIES the oldest insertion goes
+- One upstream call per key: concurrent misses (a user and a background prefetch of the
+  same page) wait for the first one and share its result instead of calling TMDB again
+- Failures (the loader returns None) are shared with those waiters but never cached, so
+  the next request after them retries
+
+TMDB_CACHE_TTL=0 turns the cache off.
+"""
+
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import tracing
+from metrics import CACHE_REQUESTS
+
+TMDB_CACHE_TTL = float(os.environ.get("TMDB_CACHE_TTL", 600))
+TMDB_CACHE_MAX_ENTRIES = int(os.environ.get("TMDB_CACHE_MAX_ENTRIES", 5000))
+
+_MISS = object()
+_entries = {}  # (kind, key) -> (expires_at, value)
+_inflight = {}  # (kind, key) -> Future of the load in progress
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+# Cache status of the load running in this context ("miss" / "bypass"), for the upstream span
+_load_status = contextvars.ContextVar("tmdbcache_load_status", default=None)
+
+
+def get_or_load(kind, key, loader):
+    """
+    Cached value for (kind, key), calling loader() on a miss. None is never cached, but
+    callers that waited on a failed load get its None too instead of loading again.
+    """
+    if TMDB_CACHE_TTL <= 0:
+        CACHE_REQUESTS.labels(kind, "bypass").inc()
+        return _load(loader, "bypass")
+
+    cache_key = (kind, str(key))
+    while True:
+        value = _fresh(cache_key)
+        if value is not _MISS:
+            return value
+        with _lock:
+            future = _inflight.get(cache_key)
+            entry = _entries.get(cache_key)
+            if future is None and (entry is None or entry[0] <= time.monotonic()):
+                future = _inflight[cache_key] = Future()
+                _stats["misses"] += 1
+                break  # We load it
+        if future is not None:
+            return future.result()  # Another thread is loading it: share its result, failures included
+        # Otherwise it was stored since our first look: go round again for the hit
+
+    CACHE_REQUESTS.labels(kind, "miss").inc()
+    try:
+        value = _load(loader, "miss")
+    except BaseException as e:
+        with _lock:
+            _inflight.pop(cache_key, None)
+        future.set_exception(e)
+        raise
+    with _lock:
+        if value is not None:
+            if len(_entries) >= TMDB_CACHE_MAX_ENTRIES:
+                _entries.pop(next(iter(_entries)))  # Evict the oldest insertion
+            _entries[cache_key] = (time.monotonic() + TMDB_CACHE_TTL, value)
+        _inflight.pop(cache_key, None)
+    future.set_result(value)
+    return value
+
+
+def _load(loader, status):
+    token = _load_status.set(status)
+    try:
+        return loader()
+    finally:
+        _load_status.reset(token)
+
+
+def load_status():
+    """"miss" or "bypass" while a loader runs, None outside one (uncached calls)."""
+    return _load_status.get()
+
+
+def cached(kind, key):
+    """Decorator: cache func(*args) under (kind, key(*args)). Callers must not mutate the result."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            return get_or_load(kind, key(*args), lambda: func(*args))
+        return wrapper
+    return decorate
+
+
+def _fresh(cache_key):
+    with _lock:
+        entry = _entries.get(cache_key, _MISS)
+        if entry is _MISS or entry[0] <= time.monotonic():
+            return _MISS
+        _stats["hits"] += 1
+    CACHE_REQUESTS.labels(cache_key[0], "hit").inc()
+    tracing.record("cache", cache_key[0], 0.0, cache="hit")
+    return entry[1]
+
+
+def peek(kind, key):
+    """Fresh cached value for (kind, key), or None. Never loads."""
+    value = _fresh((kind, str(key)))
+    return None if value is _MISS else value
+
+
+def is_cached(kind, key):
+    """True if (kind, key) is fresh in the cache or being loaded right now."""
+    cache_key = (kind, str(key))
+    with _lock:
+        entry = _entries.get(cache_key)
+        return cache_key in _inflight or (entry is not None and entry[0] > time.monotonic())
+
+
+def clear():
+    """Drop every entry (tests, or after changing TMDB_BASE_URL)."""
+    with _lock:
+        _entries.clear()
+
+
+def stats():
+    """Snapshot of cache counters (hits, misses, size)."""
+    with _lock:
+        return dict(_stats, size=len(_entries))
@@ -0,0 +1,153 @@
+"""
+Request tracing for DevOps Flix
+Every request gets a trace ID (X-Request-ID, echoed back) that is stamped on every log
+line it produces. Database queries, TMDB calls, cache hits and template renders record
+timing spans on the trace:
+- spans over SLOW_DB_MS / SLOW_UPSTREAM_MS / SLOW_RENDER_MS go to the "devopsflix.slow"
+  logger (or SLOW_LOG_FILE) with the SQL fingerprint / endpoint, parameter shape,
+  rows / bytes and cache status
+- one summary line per request: total, database, upstream and render time
+
+Spans are only kept while a trace is active; outside requests (startup, background
+tasks) they still feed the slow log.
+"""
+
+import contextvars
+import functools
+import logging
+import os
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SLOW_THRESHOLDS_MS = {
+    "db": float(os.environ.get("SLOW_DB_MS", 100)),
+    "upstream": float(os.environ.get("SLOW_UPSTREAM_MS", 1000)),
+    "render": float(os.environ.get("SLOW_RENDER_MS", 100)),
+}
+SLOW_LOG_FILE = os.environ.get("SLOW_LOG_FILE")  # Default: the normal log stream
+MAX_SPANS = 200  # Per trace; a runaway loop must not grow a request without bound
+SUMMARY_KINDS = ("db", "upstream", "render")
+
+slow_logger = logging.getLogger("devopsflix.slow")
+if SLOW_LOG_FILE:
+    _slow_handler = logging.FileHandler(SLOW_LOG_FILE)
+    _slow_handler.setFormatter(logging.Formatter("%(asctime)s [%(trace_id)s] %(message)s"))
+    slow_logger.addHandler(_slow_handler)
+    slow_logger.propagate = False
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class Trace:
+    def __init__(self, trace_id=None):
+        self.id = trace_id or uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.spans = []
+        self.totals = {}  # kind -> [count, seconds]
+        self.render_started = None
+        self.status = None
+
+    def add(self, kind, name, seconds, attrs):
+        totals = self.totals.setdefault(kind, [0, 0.0])
+        totals[0] += 1
+        totals[1] += seconds
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((kind, name, seconds, attrs))
+
+    def summary(self, method, path):
+        """One line: total, and time/count per span kind."""
+        total_ms = (time.perf_counter() - self.started) * 1000
+        parts = []
+        for kind in SUMMARY_KINDS:
+            count, seconds = self.totals.get(kind, (0, 0.0))
+            parts.append(f"{kind} {seconds * 1000:.1f}ms/{count}")
+        cache_hits = self.totals.get("cache", (0, 0.0))[0]
+        return f"REQUEST: {method} {path} -> {self.status} in {total_ms:.1f}ms ({', '.join(parts)}, cache hits {cache_hits})"
+
+
+_current = contextvars.ContextVar("devopsflix_trace", default=None)
+
+
+def start_trace(request_id=None):
+    """Begin a trace for this request; a well-formed incoming X-Request-ID is reused."""
+    trace = Trace(request_id if request_id and _REQUEST_ID.match(request_id) else None)
+    _current.set(trace)
+    return trace
+
+
+def end_trace():
+    trace = _current.get()
+    _current.set(None)
+    return trace
+
+
+def current():
+    return _current.get()
+
+
+def record(kind, name, seconds, **attrs):
+    """Attach a finished span to the current trace, and log it if it is slow."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(kind, name, seconds, attrs)
+    threshold = SLOW_THRESHOLDS_MS.get(kind)
+    if threshold is not None and seconds * 1000 >= threshold:
+        details = " ".join(f"{key}={value}" for key, value in attrs.items() if value is not None)
+        slow_logger.warning(
+            "SLOW %s: %s %.1fms %s", kind.upper(), name, seconds * 1000, details, extra={"event": "slow"}
+        )
+
+
+# ============================================================
+# SPAN ATTRIBUTES
+# ============================================================
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=512)
+def fingerprint(sql):
+    """SQL with literals replaced by ? and whitespace collapsed, so one query shape = one string."""
+    return _WHITESPACE.sub(" ", _LITERALS.sub("?", sql)).strip()[:200]
+
+
+def param_shape(params):
+    """Types of the query parameters, e.g. "(int, str)" - never the values themselves."""
+    if not params:
+        return "()"
+    return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+
+
+_IDS = re.compile(r"/\d+")
+
+
+def endpoint_shape(path):
+    """/movie/550/watch/providers -> /movie/{id}/watch/providers"""
+    return _IDS.sub("/{id}", path)
+
+
+# ============================================================
+# LOGGING
+# ============================================================
+
+def install_log_record_factory():
+    """Give every log record a trace_id attribute ("-" outside a request) for formatters."""
+    base_factory = logging.getLogRecordFactory()
+    if getattr(base_factory, "adds_trace_id", False):
+        return
+
+    def factory(*args, **kwargs):
+        record = base_factory(*args, **kwargs)
+        trace = _current.get()
+        record.trace_id = trace.id if trace is not None else "-"
+        return record
+
+    factory.adds_trace_id = True
+    logging.setLogRecordFactory(factory)
+
+
+install_log_record_factory()